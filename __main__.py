@@ -0,0 +1,5 @@
+from connect_four import main
+
+# Entry point of the project directory: "python <project directory>" starts a Connect Four game, with the same command line
+# options as "python connect_four.py".
+main()
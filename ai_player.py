@@ -0,0 +1,34 @@
+from evaluation import ThreatEvaluator
+from evaluation_cache import get_evaluation_cache
+from player import Player
+from search import Search
+
+# Class that represents a computer player in a Connect Four game. It takes turns like any other Player instance, but its
+# moves are chosen by a negamax search of the current board, instead of being read from the terminal.
+class AIPlayer(Player):
+  __slots__ = ("time_budget", "node_limit", "search", "last_search")
+  is_computer = True
+
+  # Instantiates an AI player object, with the symbol it plays with. Each move is searched for at most "time_budget" seconds
+  # and, optionally, at most "node_limit" positions. The transposition table of the search has "table_size" slots and is
+  # kept from one move to the next. Search results are shared through the process-wide evaluation cache, unless another
+  # "cache" (EvaluationCache instance) is given. The positions where the search stops are scored by a ThreatEvaluator.
+  def __init__(self, id_count, symbol, time_budget=1.0, node_limit=None, table_size=1 << 20, cache=None):
+    Player.__init__(self, id_count, symbol)
+    self.time_budget = time_budget
+    self.node_limit = node_limit
+    self.search = Search(
+      table_size, cache=cache if cache is not None else get_evaluation_cache(), evaluator=ThreatEvaluator()
+    )
+    self.last_search = None
+
+  # Returns the c-column value (from "1" to "7") of the move chosen for the current board, as a player would type it.
+  def get_move(self, board):
+    current, mask = Search.get_position(board)
+    self.last_search = self.search.search(current, mask, self.time_budget, self.node_limit)
+    column_value = str(self.last_search["column"] + 1)
+    print(
+      "Player " + str(self.id) + " plays column " + column_value + " (depth " + str(self.last_search["depth"]) + ", " +
+      str(self.last_search["nodes"]) + " nodes, " + format(self.last_search["nodes_per_second"], ".0f") + " nodes/s)."
+    )
+    return column_value
@@ -0,0 +1,207 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from board import Board as br
+from board import ensure_standard_geometry
+
+# Vectorized evaluation of many Connect Four boards at once, using NumPy.
+#
+# A batch of N boards is held as an (N, 6, 7) array of 8-bit integers, with the same orientation as the rows and columns of
+# a Board instance (row index 0 is the top row): 0 for an empty coordinate, 1 for a symbol of player 1 and 2 for a symbol of
+# player 2. The checks gather every group of four consecutive coordinates (window) of every board in a single operation,
+# using the window table of the Board class, so each check costs a handful of array operations for the whole batch.
+# The results match the checks of the Board class for each board: a player has four aligned symbols in a row, column or
+# diagonal exactly when the corresponding Board check reports it for his moves, and a board is tied exactly when
+# Board.check_ties() reports a tie. (Board.check_diagonals() only looks at the diagonals through the last move of a player,
+# so both diagonal checks only agree on positions where the game was stopped at its first alignment, as in a real game.)
+
+
+# Function that returns the flat coordinate indexes (row_index * 7 + column_index) of the cells of a bitboard window mask.
+def get_window_coordinates(window):
+  window_coordinates = []
+  for cell in range(br.columns * br.column_height):
+    if window >> cell & 1:
+      row_index = br.rows - 1 - cell % br.column_height
+      window_coordinates.append(row_index * br.columns + cell // br.column_height)
+  return window_coordinates
+
+
+# Flat coordinate indexes of the four cells of each window of the board, shaped (69, 4), and the line type of each window.
+ensure_standard_geometry()
+window_coordinates = np.array([get_window_coordinates(window) for window in br.windows], dtype=np.intp)
+window_types = np.array([br.line_keys[line_index][0] for line_index in br.window_lines])
+
+
+# Class that represents a batch of Connect Four boards.
+class BoardBatch:
+
+  # Initializes a BoardBatch object with "count" empty boards.
+  def __init__(self, count):
+    self.cells = np.zeros((count, br.rows, br.columns), dtype=np.int8)
+    self.heights = np.zeros((count, br.columns), dtype=np.int8)
+    self.plies = np.zeros(count, dtype=np.int16)
+
+  # Function that returns a BoardBatch object with the positions of a list of Board instances. The first symbol registered
+  # on each board is player 1.
+  @staticmethod
+  def from_boards(boards):
+    batch = BoardBatch(len(boards))
+    for board_index in range(len(boards)):
+      board = boards[board_index]
+      for player_index in range(2):
+        for cell in range(br.columns * br.column_height):
+          if board.masks[player_index] >> cell & 1:
+            row_value, column_value = board.get_cell_coordinates(cell)
+            batch.cells[board_index, row_value - 1, column_value - 1] = player_index + 1
+      batch.heights[board_index] = board.heights
+      batch.plies[board_index] = sum(board.heights)
+    return batch
+
+  # Function that returns an (N, 7) boolean array, True for every column that still accepts a move on each board.
+  def legal_moves(self):
+    return self.heights < br.rows
+
+  # Plays one move on every board, for the player holding the turn on that board. "columns" holds the c-column value (1 to 7)
+  # played on each board, or 0 to leave a board unchanged. Every played column must be legal: a ValueError is raised, before
+  # any board is changed, if a value is not between 0 and 7 or if a played column is full.
+  def play(self, columns):
+    columns = np.asarray(columns)
+    if columns.shape != (len(self.cells),):
+      raise ValueError("One c-column value is needed for each of the " + str(len(self.cells)) + " boards.")
+    if not np.all((columns >= 0) & (columns <= br.columns)):
+      raise ValueError("Every c-column value must be between 1 and " + str(br.columns) + ", or 0 to leave a board unchanged.")
+    board_indexes = np.nonzero(columns)[0]
+    column_indexes = columns[board_indexes] - 1
+    column_heights = self.heights[board_indexes, column_indexes]
+    if np.any(column_heights >= br.rows):
+      raise ValueError("Every played column must still have empty rows.")
+    self.cells[board_indexes, br.rows - 1 - column_heights, column_indexes] = self.plies[board_indexes] % 2 + 1
+    self.heights[board_indexes, column_indexes] += 1
+    self.plies[board_indexes] += 1
+
+  # Function that returns the contents of every window of every board, as an (N, 69, 4) array.
+  def get_windows(self):
+    return self.cells.reshape(len(self.cells), -1)[:, window_coordinates]
+
+  # Function that returns an (N, 69) boolean array, True for every window fully taken by a given player (1 or 2).
+  def get_aligned_windows(self, player, windows=None):
+    if windows is None:
+      windows = self.get_windows()
+    return np.all(windows == player, axis=2)
+
+  # Function that returns an (N,) boolean array, True for every board where a given player (1 or 2) has four symbols aligned
+  # in a window of a given line type ("row", "column" or "diagonal").
+  def check_alignment(self, player, line_type, windows=None):
+    return np.any(self.get_aligned_windows(player, windows)[:, window_types == line_type], axis=1)
+
+  # Function that returns an (N,) boolean array, True for every board where a given player has four symbols aligned in a row.
+  def check_rows(self, player, windows=None):
+    return self.check_alignment(player, "row", windows)
+
+  # Function that returns an (N,) boolean array, True for every board where a given player has four symbols aligned in a column.
+  def check_columns(self, player, windows=None):
+    return self.check_alignment(player, "column", windows)
+
+  # Function that returns an (N,) boolean array, True for every board where a given player has four symbols aligned in a diagonal.
+  def check_diagonals(self, player, windows=None):
+    return self.check_alignment(player, "diagonal", windows)
+
+  # Function that returns an (N,) array with the winner of each board: 1 or 2 when that player has four aligned symbols, or
+  # 0 when none of the players has.
+  def get_winners(self, windows=None):
+    if windows is None:
+      windows = self.get_windows()
+    winners = np.zeros(len(self.cells), dtype=np.int8)
+    winners[np.any(self.get_aligned_windows(2, windows), axis=1)] = 2
+    winners[np.any(self.get_aligned_windows(1, windows), axis=1)] = 1
+    return winners
+
+  # Function that returns an (N,) boolean array, True for every tied board: a board where every window holds both players'
+  # symbols, so that none of them can still be won.
+  def check_ties(self, windows=None):
+    if windows is None:
+      windows = self.get_windows()
+    return np.all(np.any(windows == 1, axis=2) & np.any(windows == 2, axis=2), axis=1)
+
+
+# Function that returns a list of random Board positions, from games played at random up to a random number of moves. As in
+# a real game, a game is stopped as soon as a move completes an alignment or ties the board.
+def get_random_boards(count, seed):
+  rng = random.Random(seed)
+  boards = []
+  while len(boards) < count:
+    board = br()
+    board.get_player_index("X")
+    board.get_player_index("O")
+    for ply in range(rng.randrange(br.rows * br.columns + 1)):
+      cell = board.play_column(rng.choice(board.legal_moves()))
+      if board.last_move_wins(cell) or board.check_ties():
+        break
+    boards.append(board)
+  return boards
+
+
+# Function that evaluates each position with the scalar Board checks, returning for each board the results of check_rows(),
+# check_columns() and check_diagonals() for player 1 and for player 2, followed by the result of check_ties().
+def evaluate_boards(boards):
+  results = []
+  for board in boards:
+    board_results = []
+    for player_index in range(2):
+      symbol = board.symbols[player_index]
+      player_moves = [cell for cell in board.move_stack if board.masks[player_index] >> cell & 1]
+      if not player_moves:
+        board_results.extend([False, False, False])
+        continue
+      board_results.append(board.check_rows(player_moves, symbol))
+      board_results.append(board.check_columns(player_moves, symbol))
+      board_results.append(board.check_diagonals(player_moves, symbol))
+    board_results.append(board.check_ties())
+    results.append(tuple(board_results))
+  return results
+
+
+# Function that evaluates every position of a batch with the vectorized checks, returning the same results as
+# evaluate_boards(), as an (N, 7) boolean array.
+def evaluate_batch(batch):
+  windows = batch.get_windows()
+  board_results = []
+  for player in (1, 2):
+    board_results.append(batch.check_rows(player, windows))
+    board_results.append(batch.check_columns(player, windows))
+    board_results.append(batch.check_diagonals(player, windows))
+  board_results.append(batch.check_ties(windows))
+  return np.stack(board_results, axis=1)
+
+
+# Benchmark comparing the time per position of the scalar Board checks with the vectorized batch checks, and verifying that
+# both give the same results.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Compare scalar and vectorized evaluation of Connect Four positions.")
+  parser.add_argument("--positions", type=int, default=10000, help="number of random positions")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the random positions")
+  options = parser.parse_args(arguments)
+
+  boards = get_random_boards(options.positions, options.seed)
+
+  start_time = time.perf_counter()
+  scalar_results = evaluate_boards(boards)
+  scalar_time = time.perf_counter() - start_time
+
+  batch = BoardBatch.from_boards(boards)
+  start_time = time.perf_counter()
+  batch_results = evaluate_batch(batch)
+  batch_time = time.perf_counter() - start_time
+
+  if [tuple(bool(result) for result in board_results) for board_results in batch_results] != scalar_results:
+    raise RuntimeError("Batch results differ from the scalar Board checks.")
+  print("Scalar checks: " + format(scalar_time / len(boards) * 1e6, ".2f") + " us/position")
+  print("Batch checks:  " + format(batch_time / len(boards) * 1e6, ".2f") + " us/position")
+  print("Speedup:       " + format(scalar_time / batch_time, ".1f") + "x on " + str(len(boards)) + " positions")
+
+
+if __name__ == "__main__":
+  main()
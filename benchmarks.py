@@ -0,0 +1,221 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from board import Board as br
+
+# Benchmark suite of the Board hot paths. Run it with "python -m benchmarks".
+#
+# Every Board function called on each game turn is timed on positions taken from a fixed corpus of recorded games, at three
+# stages of the game: early (after 6 moves), mid (after 18 moves) and late (after 30 moves). For each function and stage,
+# the time of one call is sampled many times, and the number of calls per second and the 50th, 90th and 99th percentiles of
+# the call time are reported. Results can be saved as a JSON baseline, and compared with a previous baseline: the run fails
+# when the median call time of any benchmark grew by more than the given threshold. Each time sample is followed by a sample
+# of a fixed piece of plain Python code (the calibration), and baseline times are scaled by the ratio between the calibration
+# times of the run and of the baseline, so that a baseline recorded on another machine, or under another load, can still be
+# compared. The baseline of the repository is "benchmarks_baseline.json".
+
+# Recorded games (c-column values of each move, from the first move), played between two greedy simulator policies.
+corpus = (
+  "74375157662132177523163353115576626244",
+  "2735753233355111246375561677716661444",
+  "526613627441552771173225517713434446533266",
+  "1466176727725126524441311536332244355",
+  "444612635424432332751372111755536257666177",
+  "265116341177645155744224371677656233334522",
+  "436663445743335415171124773177656622",
+  "4533546545123314763171311277466226255774",
+)
+
+# Number of moves played on each corpus game to obtain the position of each game stage.
+stages = (("early", 6), ("mid", 18), ("late", 30))
+
+player_symbols = ("X", "O")
+
+
+# Function that returns a Board instance with the first "plies" moves of a recorded game, registered as in a real game, along
+# with the history of each player's moves (cell indexes, as kept by Player instances).
+def get_position(game, plies):
+  board = br()
+  player_moves = (bytearray(), bytearray())
+  for ply in range(plies):
+    valid_move = board.get_valid_move_cell(int(game[ply]))
+    board.register_cell(valid_move, board.get_player_index(player_symbols[ply % 2]))
+    player_moves[ply % 2].append(valid_move)
+  board.check_ties()
+  return board, player_moves
+
+
+# Function that returns the benchmarked calls for a position, as a dictionary from the benchmark name to a function with no
+# arguments. Calls that change the board take their changes back, so that every sample starts from the same position.
+def get_calls(board, player_moves, next_move):
+  last_player = (len(board.move_stack) - 1) % 2
+  moves = player_moves[last_player]
+  symbol = player_symbols[last_player]
+  next_symbol = player_symbols[1 - last_player]
+  next_valid_move = board.get_valid_move_coordinates(next_move)
+
+  def register_move():
+    board.register_move(next_valid_move, next_symbol)
+    board.undo()
+
+  return {
+    "is_valid_play": lambda: board.is_valid_play(next_move),
+    "legal_moves": board.legal_moves,
+    "get_valid_move_coordinates": lambda: board.get_valid_move_coordinates(next_move),
+    "register_move": register_move,
+    "check_rows": lambda: board.check_rows(moves, symbol),
+    "check_columns": lambda: board.check_columns(moves, symbol),
+    "check_diagonals": lambda: board.check_diagonals(moves, symbol),
+    "check_ties": board.check_ties,
+    "__repr__": board.__repr__,
+  }
+
+
+# Runs the calibration code: integer operations with attribute and list accesses, as in the Board functions.
+def run_calibration(board):
+  total = 0
+  for column_index in range(20):
+    total += board.heights[column_index % 7] + (column_index << 3 & 0xff)
+  return total
+
+
+# Function that returns the value of a given percentile (0 to 100) of a sorted list of samples.
+def get_percentile(sorted_samples, percentile):
+  index = min(len(sorted_samples) - 1, int(len(sorted_samples) * percentile / 100))
+  return sorted_samples[index]
+
+
+# Runs every benchmark and returns a dictionary from the benchmark name ("function/stage") to its metrics. Each sample is
+# the average time of "batch" consecutive calls, so that the timer resolution does not weigh on very fast calls. The suite is
+# run "rounds" times and, for each benchmark, the round with the lowest median call time relative to its calibration time
+# (the value compared with baselines) is kept, which filters out most of the noise caused by other processes.
+def run_benchmarks(samples=200, batch=20, name_filter=None, rounds=3):
+  results = {}
+  for round_index in range(rounds):
+    for benchmark_name, metrics in run_benchmarks_round(samples, batch, name_filter).items():
+      if benchmark_name not in results or get_relative_time(metrics) < get_relative_time(results[benchmark_name]):
+        results[benchmark_name] = metrics
+  return results
+
+
+# Function that returns the median call time of a benchmark divided by its median calibration time.
+def get_relative_time(metrics):
+  return metrics["p50_ns"] / metrics["calibration_ns"] if metrics["calibration_ns"] else metrics["p50_ns"]
+
+
+# Runs every benchmark once and returns a dictionary from the benchmark name to its metrics.
+def run_benchmarks_round(samples, batch, name_filter):
+  timer = time.perf_counter_ns
+  calibration_board = br()
+  results = {}
+  for stage_name, plies in stages:
+    positions = []
+    for game in corpus:
+      board, player_moves = get_position(game, plies)
+      positions.append(get_calls(board, player_moves, game[plies]))
+    for function_name in positions[0]:
+      benchmark_name = function_name + "/" + stage_name
+      if name_filter is not None and name_filter not in benchmark_name:
+        continue
+      call_times = []
+      calibration_times = []
+      for sample in range(samples):
+        call = positions[sample % len(positions)][function_name]
+        start_time = timer()
+        for repetition in range(batch):
+          call()
+        call_times.append((timer() - start_time) / batch)
+        start_time = timer()
+        run_calibration(calibration_board)
+        calibration_times.append(timer() - start_time)
+      call_times.sort()
+      calibration_times.sort()
+      median_time = get_percentile(call_times, 50)
+      results[benchmark_name] = {
+        "ops_per_sec": 1e9 / median_time if median_time else 0.0,
+        "p50_ns": median_time,
+        "p90_ns": get_percentile(call_times, 90),
+        "p99_ns": get_percentile(call_times, 99),
+        "calibration_ns": get_percentile(calibration_times, 50),
+      }
+  return results
+
+
+# Function that returns the median call time of a baseline benchmark, scaled to the speed of the current run: multiplied by
+# the ratio between the calibration times of the current run and of the baseline, when both have one.
+def get_scaled_time(metrics, baseline_metrics):
+  if metrics.get("calibration_ns") and baseline_metrics.get("calibration_ns"):
+    return baseline_metrics["p50_ns"] * metrics["calibration_ns"] / baseline_metrics["calibration_ns"]
+  return baseline_metrics["p50_ns"]
+
+
+# Function that compares benchmark results with a baseline and returns the list of regressions: the benchmarks whose median
+# call time grew by more than "threshold" (0.25 meaning 25%) from the scaled baseline time, as (name, scaled baseline time,
+# current time) tuples.
+def find_regressions(results, baseline, threshold):
+  regressions = []
+  for benchmark_name, metrics in results.items():
+    baseline_metrics = baseline.get(benchmark_name)
+    if baseline_metrics is None:
+      continue
+    baseline_time = get_scaled_time(metrics, baseline_metrics)
+    if metrics["p50_ns"] > baseline_time * (1 + threshold):
+      regressions.append((benchmark_name, baseline_time, metrics["p50_ns"]))
+  return regressions
+
+
+# Prints the benchmark results as a table, with the change of the median call time from the scaled baseline time, when there
+# is a baseline.
+def print_results(results, baseline=None):
+  print(format("benchmark", "<36") + format("ops/sec", ">12") + format("p50 ns", ">10") + format("p90 ns", ">10") +
+    format("p99 ns", ">10") + ("" if baseline is None else format("vs base", ">10")))
+  for benchmark_name, metrics in results.items():
+    line = format(benchmark_name, "<36") + format(metrics["ops_per_sec"], ">12,.0f") + format(metrics["p50_ns"], ">10.0f") + \
+      format(metrics["p90_ns"], ">10.0f") + format(metrics["p99_ns"], ">10.0f")
+    if baseline is not None and benchmark_name in baseline:
+      line += format(metrics["p50_ns"] / get_scaled_time(metrics, baseline[benchmark_name]) - 1, ">+10.1%")
+    print(line)
+
+
+# Command line interface of the benchmark suite.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the Board hot paths.")
+  parser.add_argument("--samples", type=int, default=200, help="number of time samples of each benchmark")
+  parser.add_argument("--batch", type=int, default=20, help="number of calls timed together in each sample")
+  parser.add_argument("--rounds", type=int, default=3, help="number of runs of the suite; the fastest one is kept")
+  parser.add_argument("--filter", help="only run the benchmarks whose name contains this text")
+  parser.add_argument("--save", help="write the results to this JSON baseline file")
+  parser.add_argument("--compare", help="compare the results with this JSON baseline file")
+  parser.add_argument("--threshold", type=float, default=0.25, help="allowed growth of the median call time (0.25 = 25%%)")
+  options = parser.parse_args(arguments)
+
+  baseline = None
+  if options.compare:
+    with open(options.compare) as baseline_file:
+      baseline = json.load(baseline_file)["benchmarks"]
+
+  results = run_benchmarks(options.samples, options.batch, options.filter, options.rounds)
+  print_results(results, baseline)
+
+  if options.save:
+    with open(options.save, "w") as baseline_file:
+      json.dump({"python": platform.python_version(), "benchmarks": results}, baseline_file, indent=2)
+      baseline_file.write("\n")
+
+  if baseline is not None:
+    regressions = find_regressions(results, baseline, options.threshold)
+    for benchmark_name, baseline_time, current_time in regressions:
+      print(
+        "REGRESSION: " + benchmark_name + " median call time went from " + format(baseline_time, ".0f") + " ns (scaled) to " +
+        format(current_time, ".0f") + " ns.", file=sys.stderr
+      )
+    if regressions:
+      return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
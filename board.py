@@ -1,9 +1,36 @@
+import random
+
 # Class that represents a board in a Connect Four game.
+#
+# Internally, the board is stored as a bitboard: each player owns one integer mask and every column of the board is
+# given seven consecutive bits of that mask (the six playable coordinates, from the bottom to the top of the column,
+# followed by one sentinel bit that is never filled, so that alignments can not wrap from one column into the next).
+# The "(r, c)" coordinate strings used by the rest of the game are still accepted and returned by every function, but
+# they are only converted into integer cell indexes at the edges; no hot path builds or parses coordinate strings.
+#
+#   Cell index of a "(r, c)" coordinate: (c - 1) * 7 + (6 - r)
+#
+#        c=1 c=2 c=3 c=4 c=5 c=6 c=7
+#   r=1 [ 5][12][19][26][33][40][47]
+#   r=2 [ 4][11][18][25][32][39][46]
+#   r=3 [ 3][10][17][24][31][38][45]
+#   r=4 [ 2][ 9][16][23][30][37][44]
+#   r=5 [ 1][ 8][15][22][29][36][43]
+#   r=6 [ 0][ 7][14][21][28][35][42]
+#
+# Boards of any other size, where any other number of symbols must be aligned to win, are created with Board(rows, columns,
+# connect). The class attributes below describe the standard 6x7 board with four symbols to align; a board of another
+# geometry holds the same attributes for its own geometry, built once per geometry and shared by all of its boards, so that
+# every function costs the same on any board. Each column then uses "rows + 1" bits, and the window tables hold the groups of
+# "connect" consecutive coordinates. The tables of the standard board are only built by the first Board() call, so importing
+# the module does not build them; modules that read them on the class before creating any board call
+# ensure_standard_geometry() first.
 class Board:
   # class attributes
-  rows = 6 
+  rows = 6
   columns = 7
-  
+  connect = 4
+
   # type 1 diagonals: from the leftmost coordinate to the rightmost coordinate in the board, for each new coordinate,
   # both the row value and the column value will increase;
   type_1_diagonal_starting_coordinates = ["(1, 4)", "(3, 1)", "(1, 3)", "(2, 1)", "(1, 2)", "(1, 1)"]
@@ -11,290 +38,340 @@ class Board:
   # type 2 diagonals: from the leftmost coordinate to the rightmost coordinate in the board, for each new coordinate,
   # the row value will decrease and the column value will increase;
   type_2_diagonal_starting_coordinates = ["(4, 1)", "(6, 4)", "(5, 1)", "(6, 3)", "(6, 1)", "(6, 2)"]
-  
-  # Initializes a Board object.
-  def __init__(self):
-  # The game board consists on a matrix of rows and columns.
-  # We treat the game matrix as a list containing row sublists, wich each row sublist contaning column sublists.
-    game_matrix = []
-    for i in range(Board.rows):
-      current_row = []
-      for j in range(Board.columns):
-        current_row.append([])
-      game_matrix.append(current_row)
-  # The information for that Board instance is stored in a "view" instance attribute.
-    self.view = game_matrix
+
+  # Number of bits used by each column in the bitboard: the playable rows plus the sentinel bit.
+  column_height = rows + 1
+
+  # Distance, in bits, between two adjacent coordinates of a column, a row, a type 1 diagonal and a type 2 diagonal.
+  column_shift = 1
+  row_shift = column_height
+  type_1_diagonal_shift = column_height - 1
+  type_2_diagonal_shift = column_height + 1
+  line_shifts = (column_shift, row_shift, type_1_diagonal_shift, type_2_diagonal_shift)
+
+  # Initializes a Board object, with "rows" rows and "columns" columns, where "connect" symbols must be aligned to win.
+  def __init__(self, rows=6, columns=7, connect=4):
+    if (rows, columns, connect) != (Board.rows, Board.columns, Board.connect):
+      for attribute_name, value in get_geometry(rows, columns, connect).items():
+        setattr(self, attribute_name, value)
+    else:
+      ensure_standard_geometry()
+
+  # Each player has a bitboard mask with the cells holding his symbol. Players are indexed by the order in which their
+  # symbols are first registered on the board, which is also the order in which they play.
+    self.symbols = []
+    self.masks = [0, 0]
+
+  # The number of filled coordinates of each column. Since a "Connect Four" column is filled upwards, the height of a column
+  # is also the index of its next empty coordinate, counted from the bottom of the column.
+    self.heights = [0] * self.columns
 
   # Due to the nature of a "Connect Four" game, we need to keep track of the already filled columns (that is, all the
-  # columns that no longer have any empty coordinate left).
+  # columns that no longer have any empty coordinate left), in the order in which they were filled. The columns that still
+  # accept a move are also kept as a mask, with one bit per column (bit 0 for the c-column value 1), so that validating and
+  # listing the legal moves never scans the board.
     self.filled_columns = []
-    
+    self.legal_columns_mask = (1 << self.columns) - 1
+
   # Finally, we need to keep track of the rows, columns and diagonals where there can no longer be a winner (tie).
-    self.tied_rows = []  # max 6 length elements (6 rows to check)
-    self.tied_columns = []  # max 7 length elements (7 columns to check)
+    self.tied_rows = []  # max 6 length elements (6 rows to check, on the standard board)
+    self.tied_columns = []  # max 7 length elements (7 columns to check, on the standard board)
     self.tied_diagonals = []  # max 12 length elements (12 diagonals to check: 6 for type 1), and 6 for type 2) diagonals)
 
+  # To detect ties without sweeping the board, the number of symbols of each player in each window of four consecutive
+  # coordinates is counted. A window is still open for a player while it holds no symbol of his opponent, and a row, column
+  # or diagonal is tied once none of its windows is still open for any of the players.
+    self.window_counts = [[0] * len(self.windows), [0] * len(self.windows)]
+    self.open_windows = [len(self.windows), len(self.windows)]
+    self.line_open_windows = list(self.line_window_totals)
+    self.newly_tied_lines = []
+
+  # Every registered move is kept on a stack, so that moves can be taken back with undo(). Since cell indexes are lower than
+  # 256, the stack is a bytearray holding one byte per move. The Zobrist hashes of the position and of its mirror image are
+  # updated along with each move.
+    self.move_stack = bytearray()
+    self.hash = 0
+    self.mirror_hash = 0
+
+  # Snapshots returned by snapshot(), kept in step with the move stack: "snapshot_stack[i]" is the snapshot after the first "i"
+  # moves. The stack is only extended by snapshot() and is cut back by undo(), so the moves themselves never build snapshots.
+    self.snapshot_stack = []
+
+  # Compatibility view of the board, as a list containing row sublists, with each row sublist containing either the symbol
+  # found on each coordinate or an empty list, for empty coordinates. The view is rebuilt from the bitboards on every access,
+  # so it must only be used for reading.
+  @property
+  def view(self):
+    game_matrix = []
+    for i in range(self.rows):
+      current_row = []
+      for j in range(self.columns):
+        symbol = self.get_symbol(self.get_cell_index(i + 1, j + 1))
+        current_row.append(symbol if symbol is not None else [])
+      game_matrix.append(current_row)
+    return game_matrix
+
+  # Function that returns the cell index of the coordinate in the r-row and c-column of the board.
+  def get_cell_index(self, row_value, column_value):
+    return (column_value - 1) * self.column_height + self.rows - row_value
+
+  # Function that returns the (r, c) row and column values of a cell index.
+  def get_cell_coordinates(self, cell):
+    return (self.rows - cell % self.column_height, cell // self.column_height + 1)
+
+  # Function that returns the cell index of a coordinate, which may be given either as a cell index or as a "(r, c)" string.
+  def get_cell(self, coordinate):
+    if isinstance(coordinate, int):
+      return coordinate
+    row_value, column_value = coordinate[1:-1].split(",")
+    return self.get_cell_index(int(row_value), int(column_value))
+
+  # Function that returns the "(r, c)" string of a cell index.
+  def get_coordinate_string(self, cell):
+    row_value, column_value = self.get_cell_coordinates(cell)
+    return "(" + str(row_value) + ", " + str(column_value) + ")"
+
+  # Function that returns the index of the player using a given symbol. Symbols that are still not on the board are
+  # registered for the next player, so the first symbol to be played belongs to player index 0 and the second to index 1.
+  def get_player_index(self, symbol):
+    if symbol not in self.symbols:
+      self.symbols.append(symbol)
+    return self.symbols.index(symbol)
+
+  # Function that returns the bitboard mask of a given symbol (0, if that symbol has never been played on the board).
+  def get_symbol_mask(self, symbol):
+    if symbol in self.symbols:
+      return self.masks[self.symbols.index(symbol)]
+    return 0
+
+  # Function that returns the symbol found on a given cell index, or None when that cell is still empty.
+  def get_symbol(self, cell):
+    bit = 1 << cell
+    if self.masks[0] & bit:
+      return self.symbols[0]
+    if self.masks[1] & bit:
+      return self.symbols[1]
+    return None
+
   # Verifies if the player does a valid move. Only valid moves are accepted in the game.
-  # For a move to be valid, the user must type a c-column value where 0 < c < 8, and the column must still have empty rows.
-  # If those conditions are met, the function returns True. Otherwise, False is returned.
+  # For a move to be valid, the user must type a c-column value where 0 < c < 8 (on the standard board), and the column must
+  # still have empty rows. If those conditions are met, the function returns True. Otherwise, False is returned.
   def is_valid_play(self, move):
     play_valid = False
     error_message = "Invalid move. "
     move_args = len(move)
-    # The game will only move forward if the user supplies a c-column value, where 0 c < 8.
-    if move_args != 1 or (move_args == 1 and move[0] == " "):
-      print(error_message+ "\nMake sure you only supply one c-column value, where 0 < c < 8.\n")
+    # The game will only move forward if the user supplies a c-column value, where 0 c < 8. On boards of 10 or more columns,
+    # the c-column value may have as many digits as the number of columns.
+    if move_args < 1 or move_args > len(str(self.columns)) or move[0] == " ":
+      print(error_message+ "\nMake sure you only supply one c-column value, where 0 < c < " + str(self.columns + 1) + ".\n")
       return play_valid
 
     # 1) Verify if the given c-column input is a digit. If so, convert it to a number.
-    column_value = move[0]
+    column_value = move
     if not column_value.isdigit():
-      print(error_message+ '\n The c-column value must be a number between 1 and 7 (booth included). For i.e.:"3".')
+      print(error_message+ '\n The c-column value must be a number between 1 and ' + str(self.columns) + ' (booth included). For i.e.:"3".')
       return play_valid
-  
+
     # 2) Verify if "c" is in the required ranges.
     column_value = int(column_value)
-    if (column_value < 1 or column_value > 7):
-      print(error_message + "Make sure the the column number between 1 and 7.")
+    if (column_value < 1 or column_value > self.columns):
+      print(error_message + "Make sure the the column number between 1 and " + str(self.columns) + ".")
       return play_valid
-  
-    # 3) Verify if the given c-column is already in the list of filled columns. If that is the case, it means the given column
-    # is already full and the player must chose a different column value.
-    if column_value in self.filled_columns:
+
+    # 3) Verify if the given c-column is already full. If that is the case, the player must chose a different column value.
+    if not self.legal_columns_mask >> (column_value - 1) & 1:
       print(error_message + "The given column is already full! Supply a new column value.")
       return play_valid
-    
-    # Each of the seven c-columns in the board will contain six coordinates, top to bottom. Considering our game implementation
-    # has row values increasing in a direction from top to bottom, then row values will be decreasing on the opposite direction.
-    # We will be using this second type of design, since, in a "Connect Four" game, the columns must be filled upwards.
-    for row_value in range(6, 0, -1):
-      if row_value == 1:
-      # When an empty coordinate was found for the given column, at the top (row_value = 1), it means all the remaining column
-      # coordinates have already been filled. Thus, accepting the player move means that there won't be any empty coordinates
-      # left for the given column. In that scenario, the designated column needs to be appended to the list of filled columns.
-        if self.view[row_value - 1][column_value - 1] == []:
-          play_valid = True
-          self.filled_columns.append(column_value)
-      elif self.view[row_value - 1][column_value - 1] == []:
-        play_valid = True
-        break
-      else:
-        continue   
-    return play_valid
-  
+
+    # The validation does not change the board: a column is only added to the list of filled columns once the move that
+    # fills it is registered.
+    return True
+
+  # Function that returns the c-column values (from 1 to 7, on the standard board) that still accept a move, in increasing
+  # order, as a tuple. Tuples are shared by every board with the same legal columns and come from a cache, so no column is
+  # scanned.
+  def legal_moves(self):
+    legal_moves = Board.legal_moves_cache.get(self.legal_columns_mask)
+    if legal_moves is None:
+      legal_moves = tuple(
+        column_index + 1 for column_index in range(self.columns) if self.legal_columns_mask >> column_index & 1
+      )
+      # Boards with many columns could reach a very large number of masks, so the cache stops growing at 4096 entries.
+      if len(Board.legal_moves_cache) < 4096:
+        Board.legal_moves_cache[self.legal_columns_mask] = legal_moves
+    return legal_moves
+
   # Function that returns a string representing the coordinates of a valid player move, in the form of "(r, c)",
   # where "r" is the row value and "c", the column value, respectively.
   def get_valid_move_coordinates(self, valid_move):
-    # First, get the c-column value.
     column_value = int(valid_move)
-    # Then, traversing c-column from the bottom up, obtain its first available empty coordinate, with its applicable r-row value. 
-    for row_value in range(6, 0, -1):
-      if self.view[row_value - 1][column_value - 1] == []:
-        move_coordinates = "(" + str(row_value) + "," + " " + valid_move + ")"
-        break
-        # Since "move_coordinates" is a string, the string representation of column_value ("valid_move") will be used.
-      else:
-        continue
-    return move_coordinates
-  
+    # The first available empty coordinate of the column is given by the column height, counted from the bottom up.
+    row_value = self.rows - self.heights[column_value - 1]
+    return "(" + str(row_value) + "," + " " + valid_move + ")"
+
+  # Function that returns the cell index of the first available empty coordinate of a given c-column.
+  def get_valid_move_cell(self, column_value):
+    return (column_value - 1) * self.column_height + self.heights[column_value - 1]
+
+  # Function that returns a mask with all the cells taken by a list of moves (cell indexes or "(r, c)" strings).
+  def get_moves_mask(self, moves):
+    moves_mask = 0
+    for move in moves:
+      moves_mask |= 1 << self.get_cell(move)
+    return moves_mask
+
+  # Function that returns a mask with every cell that is part of "connect" consecutively aligned cells of a mask, in a given
+  # direction (0 for columns, 1 for rows, 2 for type 1 diagonals and 3 for type 2 diagonals, as in "line_shifts"). Each "&"
+  # below doubles the length of the alignments found, as far as possible (first pairs of adjacent cells, then pairs of pairs),
+  # and each "|" then spreads the start of every alignment over its cells the same way.
+  def get_aligned_cells(self, mask, direction):
+    first_shift, second_shift, other_shifts = self.alignment_shifts[direction]
+    alignments = mask & (mask >> first_shift)
+    alignments &= alignments >> second_shift
+    for alignment_shift in other_shifts:
+      alignments &= alignments >> alignment_shift
+    aligned_cells = alignments | (alignments << first_shift)
+    aligned_cells |= aligned_cells << second_shift
+    for alignment_shift in other_shifts:
+      aligned_cells |= aligned_cells << alignment_shift
+    return aligned_cells
+
+  # Function that returns True when a mask of the standard board holds four consecutively aligned cells, in any direction.
+  @staticmethod
+  def has_alignment(mask):
+    for shift in Board.line_shifts:
+      pairs = mask & (mask >> shift)
+      if pairs & (pairs >> (2 * shift)):
+        return True
+    return False
+
+  # Verifies if the move that has just been registered on a given cell (cell index or "(r, c)" string) completed four
+  # consecutively aligned symbols. Only the row, column and both diagonals crossing that cell are examined, so the cost
+  # of the verification does not depend on the number of moves already made in the game.
+  def last_move_wins(self, move):
+    cell = self.get_cell(move)
+    player_mask = self.masks[0] if self.masks[0] >> cell & 1 else self.masks[1]
+    for line_mask, (first_shift, second_shift, other_shifts) in zip(self.cell_lines[cell], self.alignment_shifts):
+      line = player_mask & line_mask
+      line &= line >> first_shift
+      line &= line >> second_shift
+      if other_shifts:
+        for alignment_shift in other_shifts:
+          line &= line >> alignment_shift
+      if line:
+        return True
+    return False
+
+  # Verifies if a given player has (or would have, if the cell is still empty) "connect" consecutively aligned symbols
+  # through a given cell index, in the row, column or diagonals crossing it.
+  def is_winning_cell(self, cell, player_index):
+    player_mask = self.masks[player_index] | (1 << cell)
+    for line_mask, (first_shift, second_shift, other_shifts) in zip(self.cell_lines[cell], self.alignment_shifts):
+      line = player_mask & line_mask
+      line &= line >> first_shift
+      line &= line >> second_shift
+      if other_shifts:
+        for alignment_shift in other_shifts:
+          line &= line >> alignment_shift
+      if line:
+        return True
+    return False
+
   # Verifies if the current player holding the turn has four symbols consecutively aligned in a row. If such outcome
   # takes place, True is returned. Otherwise, the function returns False.
   def check_rows(self, current_player_moves, current_player_symbol):
-    alignment_detected = False
-    for valid_move in current_player_moves:
-      base_coordinate = valid_move
-    # Verify 4 symbol alignment in that row
-      current_row = self.get_row_coordinates(base_coordinate)
-      alignment_detected = self.check_four_symbol_alignment(current_player_symbol, current_row, base_coordinate)
-      if alignment_detected:
-        break
-    return alignment_detected
-
-  # Function that checks if a tie has been obtained on the game board. 
+    aligned_cells = self.get_aligned_cells(self.get_symbol_mask(current_player_symbol), 1)
+    return aligned_cells & self.get_moves_mask(current_player_moves) != 0
+
+  # Verifies if the current player holding the turn has four symbols consecutively aligned in a column. If such outcome
+  # takes place, True is returned. Otherwise, the function returns False.
+  def check_columns(self, current_player_moves, current_player_symbol):
+    aligned_cells = self.get_aligned_cells(self.get_symbol_mask(current_player_symbol), 0)
+    return aligned_cells & self.get_moves_mask(current_player_moves) != 0
+
+  # Verifies if the current player holding the turn has four symbols consecutively aligned in a diagonal. If such outcome
+  # takes place, True is returned. Otherwise, the function returns False.
+  # As in the original implementation, only the diagonals crossing the last move of the current player are verified.
+  def check_diagonals(self, current_player_moves, current_player_symbol):
+    symbol_mask = self.get_symbol_mask(current_player_symbol)
+    aligned_cells = self.get_aligned_cells(symbol_mask, 2) | self.get_aligned_cells(symbol_mask, 3)
+    return aligned_cells & (1 << self.get_cell(current_player_moves[-1])) != 0
+
+  # Function that checks if a tie has been obtained on the game board.
   # If a tie has been found, the function will return True. Otherwise, it will return False.
+  # A row, column or diagonal is tied when every group of four consecutive coordinates (window) in it holds both player
+  # symbols, and the game is a tie when no window can still be won by either of the players. Since the number of windows
+  # still open for each player is kept up to date by register_cell(), this verification no longer sweeps the board.
   def check_ties(self):
-    
-    # First, check all rows. "i" is used to represent the row index.
-    for i in range(1, 7):
-      if i in self.tied_rows:
-        continue
-      else:
-        # If the row in not on the tied row list, get all the coordinates for that row.
-        # For convenience purposes, the leftmost coordinate of each row (i, 1) will be used as
-        # base coordinate to extract all the current row's coordinates.
-        base_coordinate = "(" + str(i) + "," + " " + "1)"
-        all_row_coordinates = self.get_row_coordinates(base_coordinate)
-        if self.lookup_list_is_tied(all_row_coordinates):
-          self.tied_rows.append(i) 
-    
-    # Then, check all columns. "j" is used to represent the column index.  
-    for j in range(1, 8):
-      if j in self.tied_columns:
-        continue
-      else:
-        # If the column in not on the tied row list, get all the coordinates for that column.
-        # For convenience purposes, the upmost coordinate of each row (1, j) will be used as
-        # base coordinate to extract all the current column's coordinates.
-        base_coordinate = "(1," + " " + str(j) + ")"
-        all_column_coordinates = self.get_column_coordinates(base_coordinate)
-        if self.lookup_list_is_tied(all_column_coordinates):
-          self.tied_columns.append(j) 
-    
-    # Finally, check all diagonals. 
-    # For convenience, we add all diagonal types start coordinates into one single list.
-    all_start_coordinates = self.get_all_diagonals_starting_coordinates()
-    for base_coordinate in all_start_coordinates:
-      if base_coordinate in self.tied_diagonals:
-        continue
-      else:
-        # If the starting coordinate of the applicable diagonal is not on the tied diagonals
-        # list, obtain all that diagonal's coordinates.
-        all_diagonal_coordinates = self.get_diagonal_coordinates(base_coordinate)
-        if self.lookup_list_is_tied(all_diagonal_coordinates):
-          self.tied_diagonals.append(base_coordinate)
-    
-    return (len(self.tied_rows) == 6 and len(self.tied_columns) == 7 and len(self.tied_diagonals) == 12)
-  
+    # The lines tied since the last verification are added to the applicable tied list type, in the same order in which
+    # a sweep of all rows, then all columns and then all diagonals would have found them.
+    if self.newly_tied_lines:
+      self.newly_tied_lines.sort()
+      for line_index in self.newly_tied_lines:
+        line_type, line_key = self.line_keys[line_index]
+        if line_type == "row":
+          self.tied_rows.append(line_key)
+        elif line_type == "column":
+          self.tied_columns.append(line_key)
+        else:
+          self.tied_diagonals.append(line_key)
+      self.newly_tied_lines.clear()
+    return self.open_windows[0] == 0 and self.open_windows[1] == 0
+
+  # Function that verifies if every group of four consecutive cells (window) of a line holds both player symbols.
+  @staticmethod
+  def line_is_tied(line_windows, first_mask, second_mask):
+    for window in line_windows:
+      if not (window & first_mask and window & second_mask):
+        return False
+    return True
+
+  # Function that returns the masks of every group of four ("connect") consecutive cells in a list of cell indexes.
+  def get_line_windows(self, line_cells):
+    line_windows = []
+    for start_index in range(len(line_cells) - self.connect + 1):
+      window = 0
+      for cell in line_cells[start_index:start_index + self.connect]:
+        window |= 1 << cell
+      line_windows.append(window)
+    return line_windows
+
   # Function that returns a list of all the starting coordinates from every diagonal in the game board, first, with the
   # coordinates corresponding to type 1 diagonals, then, with those corresponding to type 2 diagoanals, as per the way
   # they appear in Board attributes "type_1_diagonal_starting_coordinates" and "type_1_diagonal_starting_coordinates",
-  # respectively. 
+  # respectively.
   def get_all_diagonals_starting_coordinates(self):
-    all_diagonals_starting_coordinates = []
-    for start_index in range(len(Board.type_1_diagonal_starting_coordinates)):
-      all_diagonals_starting_coordinates.append(Board.type_1_diagonal_starting_coordinates[start_index])
-    for start_index in range(len(Board.type_2_diagonal_starting_coordinates)):
-      all_diagonals_starting_coordinates.append(Board.type_2_diagonal_starting_coordinates[start_index])
-    return all_diagonals_starting_coordinates
-    
-  # Function that implements the tie mechanism of check_ties() function, that is, it verifies if in any given list of lookup
-  # coordinates (be it row, column and diagonal of the current game board), any tie has been detected. When a tie is detected
-  # in the applicable lookup list type, that list is added to the respective tied list type. The function will only check ties 
-  # on rows, columns or diagonals that still have not been added to the applicable tied list type.The game will only proceed if
-  # no tie has been found. 
+    return self.type_1_diagonal_starting_coordinates + self.type_2_diagonal_starting_coordinates
+
+  # Function that implements the tie mechanism of check_ties() function for any given list of lookup coordinates (be it row,
+  # column and diagonal of the current game board). The list is tied when at least two different symbols are found in it and
+  # neither of the players can still obtain four alignable coordinates (coordinates that are empty or hold his symbol) in it.
   def lookup_list_is_tied(self, lookup_coordinates):
-    lookup_list_is_tied = False
-
-    # First, check if there are at least two different symbols in the applicable group of lookup coordinates. Where there are less
-    # than two symbols found, it means that a tie can not take place in the given list of coordinates.
-    two_symbols_found = self.two_symbols_found(lookup_coordinates)
-    
-    # Where at least two symbols have been found in the applicable type of lookup coordinates, check for any potential ties in
-    # that given list type. Since we want to check each group of four adjacent coordinates to the base coordinate, every time
-    # a group of coordinates can not constitute a potential group of four alignable coordinates, each of those coordinates are
-    # removed from the list of traversable coordinates.
-    if two_symbols_found:
-      # By hypothesis, there can be a tie in the lookup group of coordinates every time where exactly two symbols are found.
-      lookup_list_is_tied = True
-      for base_coordinate in lookup_coordinates:    
-        current_row = int(base_coordinate[1])
-        current_column = int(base_coordinate[4])
-      
-      # In case a player symbol is found on the base coordinate, check all the adjacent coordinates to that coordinate until - and if -
-      # a group of four consecutive coordinates, with the appicable player symbol, can still be obtained for subsequent game turns. All 
-      # potential groups of four consecutive coordinates where a symbol alignment for each of the players may still take place will be
-      # checked, combining all applicable directions from the given coordinate's lookup list(1st direction, stemming on a right to
-      # leftwise motion from the base coordinate; 2nd direction, stemming on a left to rightwise motion from the base coordinate).
-        if self.view[current_row - 1][current_column - 1] != []:
-          applicable_player_symbol = self.view[current_row - 1][current_column - 1] 
-          alignable_coordinates = 1
-          current_base_index = lookup_coordinates.index(base_coordinate)
-        # A counter will keep track of all potential four consecutive coordinates that can still be obtained for subsequent turns, for
-        # each base coordinate that bears an applicable player symbol. If, after traversing the given list of lookup coordinates, that
-        # counter never reached four, it means neither of the players can no longer obtain a four symbol alignment, within the given
-        # list of lookup coordinates. In such scneario, a tie has been obtained for the applicable list type of lookup coordinates
-        # (which can be a row, a column or a diagonal in the game board).
-        else:
-          # If a player symbol is not found, continue to iterate in the lookup coordinates until it is found.
-          continue
-      
-        # First, check all existing adjacent coordinates to the base coordinate, in the 1st direction (-).
-        while current_base_index != -1 and alignable_coordinates != 4:
-          if current_base_index - 1 == -1:
-            current_base_index = -1
-          else:
-            current_base_index-= 1
-            if self.view[int(lookup_coordinates[current_base_index][1]) - 1][int(lookup_coordinates[current_base_index][4]) - 1] \
-             == applicable_player_symbol\
-              or self.view[int(lookup_coordinates[current_base_index][1]) - 1][int(lookup_coordinates[current_base_index][4]) - 1] \
-                == []:
-              alignable_coordinates+= 1
-            else:
-              # When a symbol that is not the applicable player symbol is detected, the 1st direction "while" cycle stops.
-              current_base_index = -1
-              
-        # Then, check all existing adjacent coordinates to the base coordinate, in the 2nd direction (+).
-        current_base_index = lookup_coordinates.index(base_coordinate)
-        while current_base_index != len(lookup_coordinates) and alignable_coordinates != 4:
-          if current_base_index + 1 == len(lookup_coordinates):
-            current_base_index = len(lookup_coordinates)
-          else:
-            current_base_index+= 1
-            if self.view[int(lookup_coordinates[current_base_index][1]) - 1][int(lookup_coordinates[current_base_index][4]) - 1] \
-            == applicable_player_symbol\
-            or self.view[int(lookup_coordinates[current_base_index][1]) - 1][int(lookup_coordinates[current_base_index][4]) - 1] \
-            == []:
-              alignable_coordinates+= 1
-            else:
-              #  When a symbol that is not the applicable player symbol is detected, the 2nd direction "while" cycle stops.
-              current_base_index = len(lookup_coordinates)
-        
-          # When at least four alignable coordinates are found for one player, it means that lookup group of coordinates is not tied.
-        if alignable_coordinates == 4:
-          lookup_list_is_tied = False
-          break
-    return lookup_list_is_tied
-    
+    lookup_cells = [self.get_cell(coordinate) for coordinate in lookup_coordinates]
+    if not self.two_symbols_found(lookup_cells):
+      return False
+    return self.line_is_tied(self.get_line_windows(lookup_cells), self.masks[0], self.masks[1])
+
   # Function that verifies if at least two different player symbols are present in a given list of lookup coordinates. When that
   # outcome takes place, the function returns True. Otherwise, False is returned.
   def two_symbols_found(self, lookup_coordinates):
-    two_symbols_found = False
-    symbols_detected = []
-    for base_coordinate in lookup_coordinates:
-      current_row = int(base_coordinate[1])
-      current_column = int(base_coordinate[4])
-      # Check if any of the two players's respective symbols are present in the current base coordinate. If yes, in case that
-      # symbol is still not present in the list of detected symbols, add it.
-      if self.view[current_row - 1][current_column - 1] != []:
-        applicable_player_symbol = self.view[current_row - 1][current_column - 1]
-        if applicable_player_symbol not in symbols_detected:
-          symbols_detected.append(applicable_player_symbol)
-          # If two symbols have been detected, a tie can no longer be ruled out in the applicable list of lookup coordinates.
-          if len(symbols_detected) == 2:
-            two_symbols_found = True
-            break
-      else:
-        continue
-    # Should the "for" cycle end with less than two symbols detected, a tie is excluded within the list of lookup coordinates.  
-    return two_symbols_found
-      
+    lookup_mask = self.get_moves_mask(lookup_coordinates)
+    return lookup_mask & self.masks[0] != 0 and lookup_mask & self.masks[1] != 0
+
   # Function that returns all the row coordinates in a row from the current player.
   def get_row_coordinates(self, base_coordinate):
+    row_value = self.get_cell_coordinates(self.get_cell(base_coordinate))[0]
     all_row_coordinates = []
-    for i in range(7):
-      current_coordinate = "(" + base_coordinate[1] + "," + " " + str(i + 1) + ")"
-      all_row_coordinates.append(current_coordinate)
+    for i in range(self.columns):
+      all_row_coordinates.append("(" + str(row_value) + "," + " " + str(i + 1) + ")")
     return all_row_coordinates
 
-  # Verifies if the current player holding the turn has four symbols consecutively aligned in a column. If such outcome
-  # takes place, True is returned. Otherwise, the function returns False.
-  def check_columns(self, current_player_moves, current_player_symbol):
-    alignment_detected = False
-    for valid_move in current_player_moves:
-      base_coordinate = valid_move
-      # Verify 4 symbol alignment in that column
-      current_column = self.get_column_coordinates(base_coordinate)
-      alignment_detected = self.check_four_symbol_alignment(current_player_symbol, current_column, base_coordinate)
-      if alignment_detected:
-        break
-    return alignment_detected
-
   # Function that returns all the column coordinates in a column from the current player.
   def get_column_coordinates(self, base_coordinate):
+    column_value = self.get_cell_coordinates(self.get_cell(base_coordinate))[1]
     all_column_coordinates = []
-    for i in range(6):
-      current_coordinate = "(" + str(i + 1) + "," + " " + base_coordinate[4] + ")"
-      all_column_coordinates.append(current_coordinate)
+    for i in range(self.rows):
+      all_column_coordinates.append("(" + str(i + 1) + "," + " " + str(column_value) + ")")
     return all_column_coordinates
 
   # Function that returns the diagonal type for a given diagonal, spanning from the leftmost starting coordinate.
@@ -303,7 +380,7 @@ class Board:
   # - type 2 diagonal (integer 2): from the rightmost coordinate to the leftmost coordinate, for each new coordinate,
   #                                   the row value will decrease and the column value will increase.
   def get_diagonal_type(self, leftmost_coordinate):
-    if leftmost_coordinate in Board.type_1_diagonal_starting_coordinates:
+    if leftmost_coordinate in self.type_1_diagonal_starting_coordinates:
       return 1
     else:
       return 2
@@ -311,21 +388,19 @@ class Board:
   # Function that returns the leftmost coordinate in the diagonal with, at least, one coordinate taken by the current player.
   def get_all_leftmost_coordinates(self, valid_move):
     all_leftmost_coordinates = []
-    current_row = int(valid_move[1])
-    current_column = int(valid_move[4])
+    current_row, current_column = self.get_cell_coordinates(self.get_cell(valid_move))
     # Verify if the diagonal candidate is contained in a type 1 diagonal.
     while current_row > 0 and current_column > 0:
       last_coordinate_found = ("(" + str(current_row) + "," + " " + str(current_column) + ")")
-      if last_coordinate_found in Board.type_1_diagonal_starting_coordinates:
+      if last_coordinate_found in self.type_1_diagonal_starting_coordinates:
         all_leftmost_coordinates.append(last_coordinate_found)
       current_row -= 1
       current_column -= 1
     # Verify if the diagonal candidate is contained in a type 2 diagonal.
-    current_row = int(valid_move[1])
-    current_column = int(valid_move[4])
-    while current_row < 7 and current_column > 0:
+    current_row, current_column = self.get_cell_coordinates(self.get_cell(valid_move))
+    while current_row <= self.rows and current_column > 0:
       last_coordinate_found = ("(" + str(current_row) + "," + " " + str(current_column) + ")")
-      if last_coordinate_found in Board.type_2_diagonal_starting_coordinates:
+      if last_coordinate_found in self.type_2_diagonal_starting_coordinates:
         all_leftmost_coordinates.append(last_coordinate_found)
       current_row += 1
       current_column -= 1
@@ -334,29 +409,22 @@ class Board:
   # Function that returns a list with all the diagonal coordinates, knowing that diagonal's type (1 or 2) and its leftmost starting coordinate.
   def get_diagonal_coordinates(self, leftmost_coordinate):
     diagonal_coordinates = []
-    diagonal_coordinates.append(leftmost_coordinate)
-    current_row = int(leftmost_coordinate[1])
-    current_column = int(leftmost_coordinate[4])
-    # Get the diagonal's type.
-    diagonal_type = self.get_diagonal_type(leftmost_coordinate)
-    # For a type 1 diagonal.
-    if diagonal_type == 1:
-      while current_row < 6 and current_column < 7:
-        current_row += 1
-        current_column += 1
-        # Obtain the current diagonal's coordinate.
-        current_coordinate = ("(" + str(current_row) + "," + " " + str(current_column) + ")")
-        diagonal_coordinates.append(current_coordinate)
-    # For a type 2 diagonal.
-    else:
-      while current_row > 1 and current_column < 7:
-        current_row -= 1
-        current_column += 1
-        # Obtain the current diagonal's coordinate.
-        current_coordinate = ("(" + str(current_row) + "," + " " + str(current_column) + ")")
-        diagonal_coordinates.append(current_coordinate)
+    for cell in self.get_diagonal_cells(leftmost_coordinate):
+      diagonal_coordinates.append(self.get_coordinate_string(cell))
     return diagonal_coordinates
-  
+
+  # Function that returns the list of cell indexes of a diagonal, knowing its leftmost starting coordinate.
+  def get_diagonal_cells(self, leftmost_coordinate):
+    current_row, current_column = self.get_cell_coordinates(self.get_cell(leftmost_coordinate))
+    # For a type 1 diagonal, the row value increases with the column value. For a type 2 diagonal, it decreases.
+    row_step = 1 if leftmost_coordinate in self.type_1_diagonal_starting_coordinates else -1
+    diagonal_cells = []
+    while 0 < current_row <= self.rows and current_column <= self.columns:
+      diagonal_cells.append(self.get_cell_index(current_row, current_column))
+      current_row += row_step
+      current_column += 1
+    return diagonal_cells
+
   # Function that returns the list with tied rows for a Board instance.
   def get_tied_rows(self):
     return self.tied_rows
@@ -377,81 +445,21 @@ class Board:
   #  - First direction: all the coordinates of the lookup coordinates to the leftside(-) of the base coordinate.
   #  - Second direction: all the coordinates of the lookup coordinates to the rightside(+) of the base coordinate.
   def check_four_symbol_alignment(self, current_player_symbol, lookup_coordinates, base_coordinate):
+    symbol_mask = self.get_symbol_mask(current_player_symbol)
+    lookup_cells = [self.get_cell(coordinate) for coordinate in lookup_coordinates]
+    base_index = lookup_cells.index(self.get_cell(base_coordinate))
     aligned_coordinates = 1
-    first_direction_current_index = lookup_coordinates.index(base_coordinate)
-    second_direction_current_index = first_direction_current_index
-
-    first_direction_current_row = int(lookup_coordinates[first_direction_current_index][1])
-    first_direction_current_column = int(lookup_coordinates[first_direction_current_index][4])
-    first_direction_checked = False
-
-    second_direction_current_row = first_direction_current_row
-    second_direction_current_column = first_direction_current_column
-    second_direction_checked = first_direction_checked
-
-    while not first_direction_checked or not second_direction_checked:
-    # First, verify if the next-would-be coordinate of first/and second direction is within the lookup coordinates index bound.
-    # If the next would-be coordinate is within bounds, everytime an opponent symbol is detected in the applicable direction,
-    # alignment is no longer checked in that direction.
-
     # First direction check(-).
-      if first_direction_current_index - 1 == -1 or\
-          (self.view[int(lookup_coordinates[first_direction_current_index - 1][1]) - 1][int(lookup_coordinates[first_direction_current_index - 1][4]) - 1]
-                != current_player_symbol):
-        first_direction_checked = True
-      else:
-        first_direction_current_index = first_direction_current_index - 1
-    
+    current_index = base_index - 1
+    while current_index >= 0 and symbol_mask >> lookup_cells[current_index] & 1:
+      aligned_coordinates += 1
+      current_index -= 1
     # Second direction check(+).
-      if second_direction_current_index + 1 == len(lookup_coordinates) or\
-          (self.view[int(lookup_coordinates[second_direction_current_index + 1][1]) - 1][int(lookup_coordinates[second_direction_current_index + 1][4]) - 1]
-                != current_player_symbol):
-        second_direction_checked = True
-      else:
-        second_direction_current_index = second_direction_current_index + 1
-        
-      # Then, if the next-would-be-coordinate in first/and second direction is within bounds, get its row and column values.
-      # Everytime the current player symbol is detected in the current coordinate, in each applicable direction, increment
-      # "aligned coordinates" value. Should four aligned coordinates be found, immediately stop the "while" cycle.
-      
-      # First direction check.
-      if not first_direction_checked:
-        first_direction_current_row = int(lookup_coordinates[first_direction_current_index][1])
-        first_direction_current_column = int(lookup_coordinates[first_direction_current_index][4])
-        if (self.view[first_direction_current_row - 1][first_direction_current_column - 1] == current_player_symbol):
-          aligned_coordinates += 1
-          if aligned_coordinates == 4:
-            first_direction_checked = True
-            second_direction_checked = True
-
-      # Second direction check.
-      if not second_direction_checked:
-        second_direction_current_row = int(lookup_coordinates[second_direction_current_index][1])
-        second_direction_current_column = int(lookup_coordinates[second_direction_current_index][4])
-        if (self.view[second_direction_current_row - 1][second_direction_current_column - 1] == current_player_symbol):
-          aligned_coordinates += 1
-          if aligned_coordinates == 4:
-            first_direction_checked = True
-            second_direction_checked = True
-
-    return aligned_coordinates == 4
-
-  # Verifies if the current player holding the turn has four symbols consecutively aligned in a diagonal. If such outcome
-  # takes place, True is returned. Otherwise, the function returns False.
-  def check_diagonals(self, current_player_moves, current_player_symbol):
-    alignment_detected = False
-    diagonal_start_coordinates_checked = []
-    for valid_move in current_player_moves:
-      leftmost_coordinates_list = self.get_all_leftmost_coordinates(valid_move)
-    for lefmost_coordinate in leftmost_coordinates_list:
-      all_diagonal_coordinates = self.get_diagonal_coordinates(lefmost_coordinate)
-      diagonal_start_coordinates_checked.append(lefmost_coordinate)
-      # Verify 4 symbol alignment in that diagonal
-      base_coordinate = current_player_moves[len(current_player_moves)-1]
-      alignment_detected = self.check_four_symbol_alignment(current_player_symbol, all_diagonal_coordinates, base_coordinate)
-      if alignment_detected:
-        break
-    return alignment_detected
+    current_index = base_index + 1
+    while current_index < len(lookup_cells) and symbol_mask >> lookup_cells[current_index] & 1:
+      aligned_coordinates += 1
+      current_index += 1
+    return aligned_coordinates >= self.connect
 
   # Visual representation of the Board object.
   def __repr__(self):
@@ -459,29 +467,383 @@ class Board:
     game_matrix = ""
     # Then, generate the rows of the board. In each row, generate the columns of the board.
     # ROW START
-    for i in range(Board.rows):
+    for i in range(self.rows):
       # COLUMN START
       if i != 0:
         game_matrix += "\n| "
       else:
         game_matrix += "| "
       # When a player has already used a particular coordinate, the coordinate location will display the applicable player symbol.
-      for j in range(Board.columns):
-        if self.view[i][j] != []:
-          game_matrix += "["
-          game_matrix += self.view[i][j]
+      for j in range(self.columns):
+        symbol = self.get_symbol(self.get_cell_index(i + 1, j + 1))
+        if symbol is not None:
+          game_matrix += "[" + symbol + "] "
         else:
-          game_matrix += "[ "
-        if j != Board.columns:
-          game_matrix += "] "
-        else:
-          game_matrix += "|"
+          game_matrix += "[ ] "
       game_matrix += "|"
-        # Finally, show the current status of the board, containing updated information of all previous player's moves until present turn.
+    # Finally, show the current status of the board, containing updated information of all previous player's moves until present turn.
     return game_matrix
 
   # Registers a valid board play.
   def register_move(board, valid_move, current_player_symbol):
-    row_input = int(valid_move[1])
-    column_input = int(valid_move[4])
-    board.view[row_input - 1][column_input - 1] = current_player_symbol
+    board.register_cell(board.get_cell(valid_move), board.get_player_index(current_player_symbol))
+
+  # Plays a move on a given c-column value (1 to 7), for the player holding the turn, and returns the cell index of the move.
+  # Together with undo(), it allows walking through the possible moves of a game without copying Board objects: every move
+  # and its reversal only update the bitboards and counters of the board in place. A ValueError is raised if the c-column
+  # value is not a column of the board, or if the column does not accept any more moves.
+  def play_column(self, column_value):
+    if not 0 < column_value <= self.columns:
+      raise ValueError("The c-column value " + str(column_value) + " is not between 1 and " + str(self.columns) + ".")
+    if not self.legal_columns_mask >> (column_value - 1) & 1:
+      raise ValueError("The c-column value " + str(column_value) + " does not accept any more moves.")
+    cell = (column_value - 1) * self.column_height + self.heights[column_value - 1]
+    self.register_cell(cell, len(self.move_stack) & 1)
+    return cell
+
+  # Registers a valid board play, given its cell index and the index of the player who made it.
+  def register_cell(self, cell, player_index):
+    self.masks[player_index] |= 1 << cell
+    column_index = cell // self.column_height
+    self.heights[column_index] = cell % self.column_height + 1
+    if self.heights[column_index] == self.rows:
+      self.filled_columns.append(column_index + 1)
+      self.legal_columns_mask ^= 1 << column_index
+    self.move_stack.append(cell)
+    self.hash ^= self.zobrist_keys[player_index][cell]
+    self.mirror_hash ^= self.mirror_zobrist_keys[player_index][cell]
+    # Only the windows containing the cell have to be updated.
+    player_counts = self.window_counts[player_index]
+    opponent_counts = self.window_counts[1 - player_index]
+    for window_index in self.cell_windows[cell]:
+      player_counts[window_index] += 1
+      # The first symbol of a player in a window closes that window for his opponent.
+      if player_counts[window_index] == 1:
+        self.open_windows[1 - player_index] -= 1
+        if opponent_counts[window_index]:
+          line_index = self.window_lines[window_index]
+          self.line_open_windows[line_index] -= 1
+          if self.line_open_windows[line_index] == 0:
+            self.newly_tied_lines.append(line_index)
+
+  # Takes back the last move registered on the board, restoring the bitboards, column heights, filled columns, hashes and tie
+  # bookkeeping exactly as they were before that move. Returns the cell index of the move taken back.
+  def undo(self):
+    cell = self.move_stack.pop()
+    player_index = 0 if self.masks[0] >> cell & 1 else 1
+    self.masks[player_index] ^= 1 << cell
+    column_index = cell // self.column_height
+    # Moves are taken back in the reverse order of registration, so a full column is always the last filled column.
+    if self.heights[column_index] == self.rows:
+      self.filled_columns.pop()
+      self.legal_columns_mask ^= 1 << column_index
+    self.heights[column_index] = cell % self.column_height
+    self.hash ^= self.zobrist_keys[player_index][cell]
+    self.mirror_hash ^= self.mirror_zobrist_keys[player_index][cell]
+    if len(self.snapshot_stack) > len(self.move_stack) + 1:
+      self.snapshot_stack.pop()
+    player_counts = self.window_counts[player_index]
+    opponent_counts = self.window_counts[1 - player_index]
+    for window_index in self.cell_windows[cell]:
+      player_counts[window_index] -= 1
+      # Removing the only symbol of a player from a window opens that window again for his opponent.
+      if player_counts[window_index] == 0:
+        self.open_windows[1 - player_index] += 1
+        if opponent_counts[window_index]:
+          line_index = self.window_lines[window_index]
+          self.line_open_windows[line_index] += 1
+          if self.line_open_windows[line_index] == 1:
+            self.untie_line(line_index)
+    return cell
+
+  # Removes a line that is no longer tied from the tied lines, whether it has already been reported by check_ties() or not.
+  def untie_line(self, line_index):
+    if line_index in self.newly_tied_lines:
+      self.newly_tied_lines.remove(line_index)
+      return
+    line_type, line_key = self.line_keys[line_index]
+    if line_type == "row":
+      self.tied_rows.remove(line_key)
+    elif line_type == "column":
+      self.tied_columns.remove(line_key)
+    else:
+      self.tied_diagonals.remove(line_key)
+
+  # Function that returns the Zobrist hash of the position: a 64-bit number combining one random number for each filled
+  # cell and the player holding it. It is updated with one "xor" per move, and does not depend on the order of the moves.
+  def get_hash(self):
+    return self.hash
+
+  # Function that returns the canonical key of the position: the lowest of the hashes of the position and of its left-right
+  # mirror image. Both mirror positions have the same outcome (with mirrored moves), so they share the same canonical key.
+  def get_canonical_key(self):
+    return self.hash if self.hash <= self.mirror_hash else self.mirror_hash
+
+  # Function that verifies if the canonical key of the position is the hash of its mirror image, in which case the columns of
+  # any move stored under that key must be mirrored (column c becomes column 8 - c) to be used on this board.
+  def is_canonical_mirrored(self):
+    return self.mirror_hash < self.hash
+
+  # Function that returns a BoardSnapshot of the board: a frozen and hashable copy of its position and move history. Only the
+  # moves registered since the last snapshot are added to it, so every snapshot of a game shares the snapshots of its earlier
+  # positions, and taking a snapshot after each move costs one new snapshot per move.
+  def snapshot(self):
+    snapshot_stack = self.snapshot_stack
+    symbols = tuple(self.symbols)
+    # The symbols of the players are registered with their first move, so snapshots taken before that are not reused.
+    if not snapshot_stack or snapshot_stack[0].symbols != symbols:
+      snapshot_stack[:] = [BoardSnapshot(None, None, (0, 0), (self.rows, self.columns, self.connect), symbols)]
+    snapshot = snapshot_stack[-1]
+    for cell in self.move_stack[len(snapshot_stack) - 1:]:
+      snapshot = snapshot.get_child(cell, 0 if self.masks[0] >> cell & 1 else 1)
+      snapshot_stack.append(snapshot)
+    return snapshot
+
+  # Function that returns a new Board instance with the geometry, symbols and moves of a BoardSnapshot. The moves are
+  # registered again one by one, so the board can take them back with undo(). Ties are reported by the next check_ties() call.
+  # The snapshots of the board start as the given snapshot and its parents.
+  @staticmethod
+  def from_snapshot(snapshot):
+    board = Board(*snapshot.geometry)
+    board.symbols = list(snapshot.symbols)
+    for cell in snapshot.get_moves():
+      board.register_cell(cell, 0 if snapshot.masks[0] >> cell & 1 else 1)
+    while snapshot is not None:
+      board.snapshot_stack.append(snapshot)
+      snapshot = snapshot.parent
+    board.snapshot_stack.reverse()
+    return board
+
+# Class that represents a frozen snapshot of a board, returned by Board.snapshot(): the masks of both players, the geometry and
+# symbols of the board, and the last move, linked to the snapshot of the board before that move ("parent"). A child snapshot
+# only adds its own move and masks to its parent, which it shares with every other child, so the snapshots of a whole game
+# tree take about 200 bytes per position, whatever the length of its games. Two snapshots are equal, and have the same hash,
+# when they hold the same position (geometry, symbols and masks), whatever the order of their moves. Snapshots are pickled as
+# their moves, packed in bytes.
+class BoardSnapshot:
+  __slots__ = ("parent", "cell", "masks", "geometry", "symbols", "plies", "key")
+
+  # Initializes a BoardSnapshot object. Snapshots are obtained with Board.snapshot() and BoardSnapshot.play_column().
+  def __init__(self, parent, cell, masks, geometry, symbols):
+    object.__setattr__(self, "parent", parent)
+    object.__setattr__(self, "cell", cell)
+    object.__setattr__(self, "masks", masks)
+    object.__setattr__(self, "geometry", geometry)
+    object.__setattr__(self, "symbols", symbols)
+    object.__setattr__(self, "plies", 0 if parent is None else parent.plies + 1)
+    object.__setattr__(self, "key", hash((geometry, symbols, masks)))
+
+  # Snapshots can not be modified.
+  def __setattr__(self, name, value):
+    raise AttributeError("Board snapshots can not be modified.")
+
+  def __hash__(self):
+    return self.key
+
+  def __eq__(self, other):
+    if not isinstance(other, BoardSnapshot):
+      return NotImplemented
+    return self.key == other.key and self.masks == other.masks and self.geometry == other.geometry and \
+      self.symbols == other.symbols
+
+  def __reduce__(self):
+    return (load_snapshot, (self.geometry, self.symbols, self.get_moves(), self.masks[0]))
+
+  # Function that returns the snapshot of the position after a move of a player, given its cell index and player index.
+  def get_child(self, cell, player_index):
+    bit = 1 << cell
+    masks = (self.masks[0] | bit, self.masks[1]) if player_index == 0 else (self.masks[0], self.masks[1] | bit)
+    return BoardSnapshot(self, cell, masks, self.geometry, self.symbols)
+
+  # Function that returns the snapshot of the position after a move on a given c-column value, for the player holding the
+  # turn. A ValueError is raised if the c-column value is not a column of the board, or if the column does not accept any more
+  # moves.
+  def play_column(self, column_value):
+    rows, columns, connect = self.geometry
+    if not 1 <= column_value <= columns:
+      raise ValueError("The c-column value " + str(column_value) + " is not between 1 and " + str(columns) + ".")
+    column_height = rows + 1
+    filled_cells = (self.masks[0] | self.masks[1]) >> ((column_value - 1) * column_height) & ((1 << rows) - 1)
+    if filled_cells.bit_length() == rows:
+      raise ValueError("The c-column value " + str(column_value) + " does not accept any more moves.")
+    return self.get_child((column_value - 1) * column_height + filled_cells.bit_length(), self.plies & 1)
+
+  # Function that returns the cell indexes of the moves of the snapshot, from the first move, as bytes.
+  def get_moves(self):
+    moves = bytearray(self.plies)
+    snapshot = self
+    while snapshot.parent is not None:
+      moves[snapshot.plies - 1] = snapshot.cell
+      snapshot = snapshot.parent
+    return bytes(moves)
+
+# Function that returns the BoardSnapshot of a pickled snapshot: the moves are played again from an empty board, each one by
+# the player whose mask ("first_mask" being the mask of the first player) holds its cell.
+def load_snapshot(geometry, symbols, moves, first_mask):
+  snapshot = BoardSnapshot(None, None, (0, 0), geometry, symbols)
+  for cell in moves:
+    snapshot = snapshot.get_child(cell, 0 if first_mask >> cell & 1 else 1)
+  return snapshot
+
+# Function that returns the cells of every row, column and diagonal of a board (first all rows, then all columns and then
+# all diagonals, in the order in which check_ties() reports them), along with the type and key of each of those lines in
+# the tied lists of a Board instance. Lines shorter than the number of symbols to align are left out.
+def get_lines(board):
+  lines = []
+  line_keys = []
+  if board.columns >= board.connect:
+    for i in range(1, board.rows + 1):
+      lines.append([board.get_cell_index(i, j) for j in range(1, board.columns + 1)])
+      line_keys.append(("row", i))
+  if board.rows >= board.connect:
+    for j in range(1, board.columns + 1):
+      lines.append([board.get_cell_index(i, j) for i in range(1, board.rows + 1)])
+      line_keys.append(("column", j))
+  for start_coordinate in board.type_1_diagonal_starting_coordinates + board.type_2_diagonal_starting_coordinates:
+    lines.append(board.get_diagonal_cells(start_coordinate))
+    line_keys.append(("diagonal", start_coordinate))
+  return lines, line_keys
+
+# Function that returns the table of all the windows of four consecutive cells of a board (69, for a 6x7 board): the mask
+# of each window, the index of the line it belongs to, the number of windows in each line and, for each cell, the indexes
+# of the windows containing it.
+def get_windows(board, lines):
+  windows = []
+  window_lines = []
+  line_window_totals = []
+  cell_windows = [[] for cell in range(board.columns * board.column_height)]
+  for line_index in range(len(lines)):
+    line_windows = board.get_line_windows(lines[line_index])
+    line_window_totals.append(len(line_windows))
+    for window in line_windows:
+      for cell in range(len(cell_windows)):
+        if window >> cell & 1:
+          cell_windows[cell].append(len(windows))
+      windows.append(window)
+      window_lines.append(line_index)
+  return windows, window_lines, line_window_totals, [tuple(cell_window_indexes) for cell_window_indexes in cell_windows]
+
+# Function that returns, for each cell of a board, the masks of the column, row, type 1 diagonal and type 2 diagonal
+# crossing that cell, in the same order as "line_shifts". They restrict the alignment verification of a move to the four
+# lines through it.
+def get_cell_lines(board):
+  cell_lines = []
+  for cell in range(board.columns * board.column_height):
+    cell_row, cell_column = board.get_cell_coordinates(cell)
+    cell_line_masks = [0, 0, 0, 0]
+    # Sentinel bits are not part of any line.
+    if cell_row >= 1:
+      for line_row in range(1, board.rows + 1):
+        for line_column in range(1, board.columns + 1):
+          line_cell = 1 << board.get_cell_index(line_row, line_column)
+          if line_column == cell_column:
+            cell_line_masks[0] |= line_cell
+          if line_row == cell_row:
+            cell_line_masks[1] |= line_cell
+          if line_row - cell_row == line_column - cell_column:
+            cell_line_masks[2] |= line_cell
+          if line_row - cell_row == cell_column - line_column:
+            cell_line_masks[3] |= line_cell
+    cell_lines.append(tuple(cell_line_masks))
+  return cell_lines
+
+# Function that returns the Zobrist keys of a board: one random 64-bit number for each player and cell. The numbers are
+# drawn from a fixed seed, so hashes are the same in every process and every run. The mirror keys give each cell the number
+# of the cell in the same row of the mirrored column, so that the mirror hash of a position is the hash of its mirror image.
+def get_zobrist_keys(board):
+  rng = random.Random(20241113)
+  total_cells = board.columns * board.column_height
+  zobrist_keys = [[rng.getrandbits(64) for cell in range(total_cells)] for player_index in range(2)]
+  mirror_zobrist_keys = []
+  for player_keys in zobrist_keys:
+    mirror_zobrist_keys.append([
+      player_keys[(board.columns - 1 - cell // board.column_height) * board.column_height + cell % board.column_height]
+      for cell in range(total_cells)
+    ])
+  return zobrist_keys, mirror_zobrist_keys
+
+# Function that returns the starting coordinates of the type 1 and type 2 diagonals of a board that are long enough to hold
+# "connect" symbols. They are listed from the shortest to the longest diagonal, in the same order as the starting coordinates
+# of the standard board.
+def get_diagonal_starting_coordinates(rows, columns, connect):
+  # Type 1 diagonals start on the top row or on the leftmost column, and go down to the right.
+  type_1_coordinates = [(1, j) for j in range(1, columns + 1)] + [(i, 1) for i in range(2, rows + 1)]
+  type_1_coordinates = [
+    (min(rows - i, columns - j) + 1, 0 if i == 1 else 1, -j, i, j) for i, j in type_1_coordinates
+    if min(rows - i, columns - j) + 1 >= connect
+  ]
+  # Type 2 diagonals start on the leftmost column or on the bottom row, and go up to the right.
+  type_2_coordinates = [(i, 1) for i in range(1, rows)] + [(rows, j) for j in range(1, columns + 1)]
+  type_2_coordinates = [
+    (min(i - 1, columns - j) + 1, 0 if i != rows else 1, j, i, j) for i, j in type_2_coordinates
+    if min(i - 1, columns - j) + 1 >= connect
+  ]
+  return tuple(
+    ["(" + str(i) + ", " + str(j) + ")" for length, side, order, i, j in sorted(diagonal_coordinates)]
+    for diagonal_coordinates in (type_1_coordinates, type_2_coordinates)
+  )
+
+# Function that returns the shifts to apply, one after the other, to a mask of aligned cells in the direction given by
+# "shift", to keep only the cells starting "connect" consecutively aligned cells. Each shift doubles the length of the
+# alignments as far as possible: for four cells, pairs of adjacent cells and then pairs of pairs. Up to four cells, two
+# shifts are enough (the second one is 0 for two cells), so the shifts are returned as (first shift, second shift, tuple of
+# the other shifts), which lets the alignment verifications apply the first two without any loop.
+def get_alignment_shifts(shift, connect):
+  alignment_shifts = []
+  alignment_length = 1
+  while alignment_length < connect:
+    step = min(alignment_length, connect - alignment_length)
+    alignment_shifts.append(step * shift)
+    alignment_length += step
+  if len(alignment_shifts) == 1:
+    alignment_shifts.append(0)
+  return (alignment_shifts[0], alignment_shifts[1], tuple(alignment_shifts[2:]))
+
+# Function that returns the attributes of the boards of a given geometry (rows, columns and number of symbols to align): its
+# dimensions, bit shifts, diagonals, lines, windows and Zobrist keys. They are built on the first request for each geometry
+# and kept in "Board.geometries", so every board of a geometry shares the same tables.
+def get_geometry(rows, columns, connect):
+  geometry_key = (rows, columns, connect)
+  if geometry_key in Board.geometries:
+    return Board.geometries[geometry_key]
+  if rows < 1 or columns < 1 or not 1 < connect <= max(rows, columns):
+    raise ValueError("A board needs at least one row and one column, and between 2 and " + str(max(rows, columns)) + " symbols to align.")
+  # Cell indexes are stored one byte each, in the move stack and in the history of each player.
+  if columns * (rows + 1) > 256:
+    raise ValueError("A board can not have more than 256 cells, counting one sentinel cell per column.")
+  column_height = rows + 1
+  geometry = {
+    "rows": rows,
+    "columns": columns,
+    "connect": connect,
+    "column_height": column_height,
+    "row_shift": column_height,
+    "type_1_diagonal_shift": column_height - 1,
+    "type_2_diagonal_shift": column_height + 1,
+    "line_shifts": (1, column_height, column_height - 1, column_height + 1),
+  }
+  geometry["alignment_shifts"] = tuple(get_alignment_shifts(shift, connect) for shift in geometry["line_shifts"])
+  geometry["type_1_diagonal_starting_coordinates"], geometry["type_2_diagonal_starting_coordinates"] = \
+    get_diagonal_starting_coordinates(rows, columns, connect)
+  # The tables are built with the coordinate functions of a board that only holds the attributes of the geometry so far.
+  board = Board.__new__(Board)
+  for attribute_name, value in geometry.items():
+    setattr(board, attribute_name, value)
+  geometry["lines"], geometry["line_keys"] = get_lines(board)
+  geometry["windows"], geometry["window_lines"], geometry["line_window_totals"], geometry["cell_windows"] = \
+    get_windows(board, geometry["lines"])
+  geometry["cell_lines"] = get_cell_lines(board)
+  geometry["zobrist_keys"], geometry["mirror_zobrist_keys"] = get_zobrist_keys(board)
+  Board.geometries[geometry_key] = geometry
+  return geometry
+
+# Sets the attributes of the standard geometry (6 rows, 7 columns and four symbols to align) on the Board class, unless they
+# are already set.
+def ensure_standard_geometry():
+  if "windows" in Board.__dict__:
+    return
+  for attribute_name, value in get_geometry(Board.rows, Board.columns, Board.connect).items():
+    setattr(Board, attribute_name, value)
+
+Board.geometries = {}
+Board.legal_moves_cache = {}
@@ -1,17 +1,37 @@
+import os
+import sys
+
 from board import Board as br
 from player import Player as pl
 
-# Registers players in a Connect Four game.
-def register_players():
+# Connect Four game, played on the terminal by two players, or by a player and the computer.
+#
+# Importing this module has no side effects: the game only starts when main() is called, which is done by executing
+# "connect_four.py" (or the project directory, through "__main__.py"). The modules only needed by some of the command line
+# options (opening books, evaluation cache files, metrics and game archives) are imported by main() when those options are
+# given, so a process that only uses the game functions, or plays a game without them, does not pay for their import. The
+# computer players and the renderer are imported the same way, by the functions that create them.
+
+# Registers players in a Connect Four game. When "ai_opponent" is True, player 2 is played by the computer, using a symbol
+# different from the one chosen by player 1, as an instance of "ai_class" (AIPlayer, by default, or MCTSPlayer).
+def register_players(ai_opponent=False, ai_class=None):
+  if ai_opponent and ai_class is None:
+    from ai_player import AIPlayer as ai_class
   players = []
   id_count = 1
   while id_count < 3:
-    players.append(pl(id_count))
+    if ai_opponent and id_count == 2:
+      players.append(ai_class(id_count, "O" if players[0].get_player_symbol() != "O" else "X"))
+    else:
+      symbol = input("Player " + str(id_count) + " choose your symbol.\n")
+      if symbol == "exit":
+        raise TypeError("Program stopped.")
+      players.append(pl(id_count, symbol))
     id_count += 1
   return players
 
-# Obtains the current Player instance, bearing "current_player_id" value for "id" attribute.
-def get_current_player(current_player_id):
+# Obtains the current Player instance of a list of players, bearing "current_player_id" value for "id" attribute.
+def get_current_player(players, current_player_id):
   return players[current_player_id - 1]
 
 # Allows to change the player, at the start of a new game turn.
@@ -21,8 +41,37 @@ def change_player(current_player_id):
   else:
     return 1
 
-# Allows for players to execute a valid play, registering in in the board object.
-def play(board):
+# Registers a valid move of a player on the board, and in the history of the player's moves, and returns its cell index.
+def register_valid_move(board, current_player, move):
+  valid_move = br.get_valid_move_cell(board, int(move))
+  board.register_cell(valid_move, board.get_player_index(pl.get_player_symbol(current_player)))
+  pl.add_valid_move(current_player, valid_move)
+  return valid_move
+
+# Function that verifies if the history of a player's moves holds an alignment, with the full checks of the board.
+def check_all_alignments(board, current_player_moves, current_player_symbol):
+  diagonal_check = br.check_diagonals(board, current_player_moves, current_player_symbol)
+  row_check = br.check_rows(board, current_player_moves, current_player_symbol)
+  column_check = br.check_columns(board, current_player_moves, current_player_symbol)
+  return diagonal_check or row_check or column_check
+
+# Calls a function with the given arguments and returns its result, without measuring it. Used in place of Metrics.measure
+# when there are no metrics to record.
+def run_phase(phase, function, *arguments):
+  return function(*arguments)
+
+# Allows for players to execute a valid play, registering in in the board object. Player 1 and player 2 are the first and
+# second Player instances of "players", respectively.
+# When "verify_alignment" is True, every alignment result is also confirmed against the history of the current player's moves.
+# When an "opening_book" (OpeningBook instance) is given, computer players play the book move of every position found in it.
+# When "metrics" (Metrics instance) is given, the duration of every phase of each turn is recorded in it.
+# The board is drawn after every move by "renderer" (Renderer instance), which draws the whole board by default.
+def play(board, players, verify_alignment=False, opening_book=None, metrics=None, renderer=None):
+  if renderer is None:
+    from renderer import Renderer
+    renderer = Renderer()
+  # Every phase of a turn is run through "measure", which only times it when there are metrics to record.
+  measure = metrics.measure if metrics is not None else run_phase
   print("Game start.\n")
   is_valid_move = False
   alignment = False
@@ -30,38 +79,44 @@ def play(board):
   # Contains information about the current player holding the turn. By default, the first player holding the first turn will be player 1.
   current_player_id = 1
   while not alignment and not tie: 
+    current_player = get_current_player(players, current_player_id)
     while not is_valid_move:
-      move = input("Player " + str(current_player_id) + " make your move.\n")
+      move = None
+      # Computer players look the position up in the opening book first, and only search it when it is not in the book.
+      if opening_book is not None and current_player.is_computer:
+        move = measure("game.opening_book", opening_book.get_move, board)
+        if move is not None:
+          print("Player " + str(current_player_id) + " plays column " + move + " (opening book).")
+      if move is None:
+        move = measure("game.input", current_player.get_move, board)
       if move == "exit":
         raise TypeError("Program stopped.")
       # While the player does not provide a valid mode, the user will be displayed a notification saying he still has not provided a valid move.
-      is_valid_move = br.is_valid_play(board, move)
+      is_valid_move = measure("game.validation", br.is_valid_play, board, move)
       
     # Only and once if it has been successfully verified that a player supplied a valid move, his play is registered on the board.
-    valid_move = br.get_valid_move_coordinates(board, move)
-    current_player = get_current_player(current_player_id)
-    current_player_symbol = pl.get_player_symbol(current_player)
-    br.register_move(board, valid_move, current_player_symbol)
-        
-    # The move is also added in the applicable list containing the history all moves from the current player, for that Board instance.
-    pl.add_valid_move(current_player, valid_move)
-    print(board)
-    current_player_moves = pl.get_player_moves(current_player)
-      
-    # Check if a four coordinate alignment has occured, in any row, column or diagonal where the current player has made a valid move.
-    diagonal_check = br.check_diagonals(board, current_player_moves, current_player_symbol)
-    row_check = br.check_rows(board, current_player_moves, current_player_symbol)
-    column_check = br.check_columns(board, current_player_moves, current_player_symbol)
-    
-    alignment = diagonal_check or row_check or column_check
-    
+    # The move is handled as the cell index of its coordinate from here on. The move is also added in the applicable history of
+    # all moves from the current player, for that Board instance.
+    valid_move = measure("game.registration", register_valid_move, board, current_player, move)
+    measure("game.render", renderer.draw, board)
+
+    # Check if a four coordinate alignment has occured in the row, column or diagonals crossing the move that has just been made.
+    alignment = measure("game.win_check", br.last_move_wins, board, valid_move)
+
+    # When requested, confirm that result with the full checks over the history of all the current player's moves.
+    if verify_alignment:
+      current_player_moves = pl.get_player_moves(current_player)
+      current_player_symbol = pl.get_player_symbol(current_player)
+      if alignment != measure("game.verification", check_all_alignments, board, current_player_moves, current_player_symbol):
+        raise RuntimeError("Alignment verification failed after move " + board.get_coordinate_string(valid_move) + ".")
+
     # If an alignment has been detected, the game ends and the player holding the turn wins it.
     if alignment:
       print("Player " + str(current_player_id) + " is the winner.")
       break
           
     # If no alignment was found, verify if the game is still untied. If a tie has been detected, the game ends.
-    tie = br.check_ties(board)
+    tie = measure("game.tie_check", br.check_ties, board)
     if tie:
       print("Game is a tie.")
       break
@@ -70,8 +125,9 @@ def play(board):
     current_player_id = change_player(current_player_id)
     is_valid_move = False
 
-# Generates board to start the game.
-print("""\n
+# Prints the game banner and the game rules.
+def print_introduction():
+  print("""\n
          * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * *
          *     _ _ _ _ _       _ _ _ _ _        _ _ _ _ _        _ _ _ _ _        _ _ _ _ _       _ _ _ _ _     _ _ _ _ _ _  *  
          *    |               |         |      |         |      |         |      |               |                   |       *
@@ -91,21 +147,110 @@ print("""\n
          * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * *
       """)
 
-print("----------------------------------------------------------Game Rules:--------------------------------------------------------\n")
-print("Align four symbols consecutively, before your opponent does, to win the game.")
-print('Moves must be written with a c-column number, where 1 < c < 7. For example:"3".\n')
-print("Should a four-symbol alignment no longer becomes possible, the game is a tie.")
-print('Program will terminate if either of the players write "exit".')
-print("------------------------------------------------------------:------------------------------------------------------------------\n")
-board = br()
-print(board)
+  print("----------------------------------------------------------Game Rules:--------------------------------------------------------\n")
+  print("Align four symbols consecutively, before your opponent does, to win the game.")
+  print('Moves must be written with a c-column number, where 1 < c < 7. For example:"3".\n')
+  print("Should a four-symbol alignment no longer becomes possible, the game is a tie.")
+  print('Program will terminate if either of the players write "exit".')
+  print("------------------------------------------------------------:------------------------------------------------------------------\n")
+
+
+# Function that returns the value of a "--<name>=<value>" command line option, or None when the option is not given. When
+# the option is given more than once, the last value is returned.
+def get_option(arguments, name):
+  value = None
+  for argument in arguments:
+    if argument.startswith("--" + name + "="):
+      value = argument[len("--" + name + "="):]
+  return value
+
+
+# Starts a Connect Four game, with the given command line options (the options of the program, by default).
+def main(arguments=None):
+  if arguments is None:
+    arguments = sys.argv[1:]
+  print_introduction()
+  # Generates board to start the game.
+  board = br()
+  print(board)
+
+  #  [ [  [][][][] ]
+  #    [  [][][][] ]
+  #    [  [][][][] ]  ]
+
+  # Creates the players 1 and 2 within a Connect Four game, with their symbols, respectively.
+  # Running the program with the "--ai" option makes player 2 a computer player. With the "--mcts" option, the computer
+  # player chooses its moves with a Monte Carlo tree search instead (see mcts.py).
+  if "--mcts" in arguments:
+    from mcts import MCTSPlayer
+    players = register_players(True, MCTSPlayer)
+  else:
+    players = register_players("--ai" in arguments)
+
+  # Running the program with the "--book=<path>" option gives the computer player (search or Monte Carlo) an opening book
+  # file.
+  opening_book = None
+  book_path = get_option(arguments, "book")
+  if book_path is not None:
+    from opening_book import OpeningBook
+    opening_book = OpeningBook(book_path)
+
+  # Running the program with the "--cache=<path>" option loads the evaluation cache of the computer player from a file, if it
+  # exists, and saves it back to that file when the game is over, so its search results are kept from one game to the next.
+  cache_path = get_option(arguments, "cache")
+  if cache_path is not None:
+    from evaluation_cache import get_evaluation_cache
+    if os.path.exists(cache_path):
+      get_evaluation_cache().load(cache_path)
+
+  # Running the program with the "--metrics=<path>" option records the duration of every phase of the game and of every Board
+  # function, and writes them to a file when the game is over (as JSON if the path ends with ".json", in the Prometheus text
+  # format otherwise). The "--metrics-port=<port>" option also serves them over HTTP while the game is played, and the
+  # "--profile=<path>" option runs the game under cProfile, saving the profile to a file.
+  metrics = None
+  metrics_path = get_option(arguments, "metrics")
+  metrics_port = get_option(arguments, "metrics-port")
+  profile_path = get_option(arguments, "profile")
+  if metrics_path is not None or metrics_port is not None:
+    from instrumentation import Metrics, instrument_board, uninstrument_board
+    metrics = Metrics()
+    if metrics_port is not None:
+      metrics.serve(port=int(metrics_port))
+    instrument_board(metrics)
+  profiler = None
+  if profile_path is not None:
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+  # Established that 1st player to play is player 1. Player 1 makes his move. Then, turn goes to player 2, who makes his move.
+  # Running the program with the "--verify" option enables the verification of every alignment result.
+  # Running the program with the "--render=diff" option only redraws the cells changed by each move, and "--render=none" does
+  # not draw the board during the game (see renderer.py).
+  from renderer import Renderer
+  render_mode = get_option(arguments, "render")
+  renderer = Renderer(render_mode) if render_mode is not None else Renderer()
+
+  try:
+    play(board, players, "--verify" in arguments, opening_book, metrics, renderer)
+  finally:
+    if profiler is not None:
+      profiler.disable()
+      profiler.dump_stats(profile_path)
+    if metrics is not None:
+      uninstrument_board()
+      if metrics_path is not None:
+        metrics.write(metrics_path)
+    if cache_path is not None:
+      get_evaluation_cache().save(cache_path)
 
-#  [ [  [][][][] ]
-#    [  [][][][] ]
-#    [  [][][][] ]  ]
+  # Running the program with the "--record=<path>" option appends the finished game to a game archive file (see
+  # game_records.py).
+  record_path = get_option(arguments, "record")
+  if record_path is not None:
+    from game_records import append_game
+    append_game(record_path, [cell // br.column_height + 1 for cell in board.move_stack])
 
-# Creates the players 1 and 2 within a Connect Four game, with their symbols, respectively.
-players = register_players()
 
-# Established that 1st player to play is player 1. Player 1 makes his move. Then, turn goes to player 2, who makes his move.
-play(board)
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,195 @@
+import argparse
+import contextlib
+import importlib
+import io
+import random
+import sys
+
+import legacy_board
+
+# Differential correctness harness of the Board class, against its original implementation (legacy_board.py).
+#
+# Randomized games are played on a legacy board and on a board of the tested backend (the current Board class, by default,
+# or the Board class of any other module) side by side, through the functions of the game loop: is_valid_play() with the
+# typed move (a legal column most of the time, otherwise a full column or text that is not a column), then
+# get_valid_move_coordinates() and register_move(), the alignment checks of the current player's moves (check_rows(),
+# check_columns() and check_diagonals()) and check_ties(). After every call, its result and anything it printed must be the
+# same on both boards, and so must the board itself: its text ("__repr__"), its view and its filled and tied lines. Each game
+# only depends on the seed and its index, so the first position where both boards diverge is reported with everything needed
+# to play it again.
+
+player_symbols = ("X", "O")
+
+# Typed moves that are not c-column values of the standard board.
+invalid_moves = ("0", "8", "9", "a", "", " ", "12", "-1", "3 ", " 3")
+
+
+# Function that returns the Board class of a backend, given as a module name, optionally followed by ":" and a class name
+# (for i.e.: "board" or "board:Board").
+def load_backend(backend):
+  module_name, _, class_name = backend.partition(":")
+  return getattr(importlib.import_module(module_name), class_name or "Board")
+
+
+# Function that calls a function and returns what it did, to be compared: its result (or the type and message of the
+# exception it raised) and the text it printed.
+def get_outcome(function, *arguments):
+  output = io.StringIO()
+  with contextlib.redirect_stdout(output):
+    try:
+      result = function(*arguments)
+    except Exception as error:
+      result = (type(error).__name__, str(error))
+  return result, output.getvalue()
+
+
+# Function that returns the state of a board that must be the same on both boards after every move.
+def get_board_state(board):
+  return {
+    "__repr__": repr(board),
+    "view": [list(row) for row in board.view],
+    "filled_columns": list(board.filled_columns),
+    "tied_rows": list(board.get_tied_rows()),
+    "tied_columns": list(board.get_tied_columns()),
+    "tied_diagonals": list(board.get_tied_diagonals()),
+  }
+
+
+# Function that returns the typed move of a turn: a legal column most of the time, otherwise any column (possibly full) or
+# an invalid move.
+def get_typed_move(rng, board):
+  draw = rng.random()
+  if draw < 0.8:
+    legal_columns = [column_value for column_value in range(1, 8) if column_value not in board.filled_columns]
+    return str(rng.choice(legal_columns))
+  if draw < 0.9:
+    return str(rng.randint(1, 7))
+  return rng.choice(invalid_moves)
+
+
+# Plays a randomized game on a legacy board and on a board of a backend, and returns the first divergence between them, as a
+# dictionary with the name of the diverging call, the outcome of that call on each board and the c-column values of the moves
+# registered before it, or None when both boards agree until the end of the game. Also returns the number of positions
+# compared.
+def compare_game(backend_class, rng):
+  legacy = legacy_board.Board()
+  backend = backend_class()
+  moves = []
+  histories = ([], [])
+  player_index = 0
+  positions = 0
+
+  def get_divergence(name, legacy_outcome, backend_outcome):
+    if legacy_outcome == backend_outcome:
+      return None
+    return {
+      "call": name,
+      "moves": "".join(moves),
+      "legacy": legacy_outcome,
+      "backend": backend_outcome,
+      "legacy_board": repr(legacy),
+      "backend_board": get_outcome(repr, backend)[0],
+    }
+
+  while True:
+    move = get_typed_move(rng, legacy)
+    legacy_outcome = get_outcome(legacy.is_valid_play, move)
+    divergence = get_divergence("is_valid_play(" + repr(move) + ")", legacy_outcome, get_outcome(backend.is_valid_play, move))
+    if divergence is not None:
+      return divergence, positions
+    if not legacy_outcome[0]:
+      continue
+
+    legacy_outcome = get_outcome(legacy.get_valid_move_coordinates, move)
+    divergence = get_divergence(
+      "get_valid_move_coordinates(" + repr(move) + ")", legacy_outcome, get_outcome(backend.get_valid_move_coordinates, move)
+    )
+    if divergence is not None:
+      return divergence, positions
+    coordinate = legacy_outcome[0]
+    symbol = player_symbols[player_index]
+    divergence = get_divergence(
+      "register_move(" + repr(coordinate) + ", " + repr(symbol) + ")",
+      get_outcome(legacy.register_move, coordinate, symbol),
+      get_outcome(backend.register_move, coordinate, symbol),
+    )
+    if divergence is not None:
+      return divergence, positions
+    moves.append(move)
+    histories[player_index].append(coordinate)
+    positions += 1
+
+    alignment = False
+    for check_name in ("check_rows", "check_columns", "check_diagonals"):
+      legacy_outcome = get_outcome(getattr(legacy, check_name), histories[player_index], symbol)
+      divergence = get_divergence(
+        check_name + "(<moves of player " + str(player_index + 1) + ">, " + repr(symbol) + ")", legacy_outcome,
+        get_outcome(getattr(backend, check_name), histories[player_index], symbol)
+      )
+      if divergence is not None:
+        return divergence, positions
+      alignment = alignment or legacy_outcome[0]
+    tie = False
+    if not alignment:
+      legacy_outcome = get_outcome(legacy.check_ties)
+      divergence = get_divergence("check_ties()", legacy_outcome, get_outcome(backend.check_ties))
+      if divergence is not None:
+        return divergence, positions
+      tie = legacy_outcome[0]
+    legacy_state = get_board_state(legacy)
+    backend_state = get_outcome(get_board_state, backend)[0]
+    if not isinstance(backend_state, dict):
+      return get_divergence("board state", legacy_state, backend_state), positions
+    for state_name, legacy_value in legacy_state.items():
+      divergence = get_divergence(state_name, legacy_value, backend_state[state_name])
+      if divergence is not None:
+        return divergence, positions
+    if alignment or tie:
+      return None, positions
+    player_index = 1 - player_index
+
+
+# Function that plays "games" randomized games on both boards, stopping at the first divergence, and returns a dictionary
+# with the number of games played, the number of positions compared and the divergence (None if there was none), along with
+# the index of its game.
+def run_harness(backend_class, games, seed):
+  positions = 0
+  for game_index in range(games):
+    rng = random.Random(str(seed) + ":" + str(game_index))
+    divergence, game_positions = compare_game(backend_class, rng)
+    positions += game_positions
+    if divergence is not None:
+      divergence["game"] = game_index
+      return {"games": game_index + 1, "positions": positions, "divergence": divergence}
+  return {"games": games, "positions": positions, "divergence": None}
+
+
+# Command line interface: compares a backend with the legacy board, and reports the first divergence. The exit status is 1
+# when the boards diverged.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Compare a Board backend with the original Board class on random games.")
+  parser.add_argument("--backend", default="board", help='module of the tested Board class, for i.e.: "board" or "board:Board"')
+  parser.add_argument("--games", type=int, default=1000, help="number of randomized games")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the games")
+  options = parser.parse_args(arguments)
+
+  result = run_harness(load_backend(options.backend), options.games, options.seed)
+  divergence = result["divergence"]
+  if divergence is None:
+    print(
+      "No divergence in " + str(result["games"]) + " games (" + str(result["positions"]) + " positions) between " +
+      options.backend + " and the legacy board."
+    )
+    return 0
+  print(
+    "Divergence in game " + str(divergence["game"]) + " (seed " + str(options.seed) + "), after the moves \"" +
+    divergence["moves"] + "\", on " + divergence["call"] + ":"
+  )
+  print("  legacy board: " + repr(divergence["legacy"]))
+  print("  " + options.backend + ": " + repr(divergence["backend"]))
+  print("Legacy board:\n" + divergence["legacy_board"] + "\n" + options.backend + ":\n" + str(divergence["backend_board"]))
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
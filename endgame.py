@@ -0,0 +1,267 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+
+import simulator
+from board import Board as br
+from search import Search
+
+# Perfect-play endgame solver of Connect Four, with an on-disk tablebase of proven outcomes.
+#
+# Positions with at most "max_empty_cells" empty cells are solved exactly: the search of the Search class is run to the end
+# of the game with null windows (alpha, alpha + 1), each of which only tells if the score is above or below alpha, first
+# around 0 (to know if the position is won, drawn or lost) and then by binary search, until the exact score is known. The
+# score gives the outcome of the game for the player holding the turn and its distance to the end (the number of moves still
+# played when the winner wins as soon as possible and the loser loses as late as possible).
+#
+# Solved positions are kept in a tablebase file, identified by their canonical key (Board.get_canonical_key()) like the
+# positions of an opening book, so a position and its mirror image share one record. The file is a 16-byte header followed
+# by fixed-size records sorted by key:
+#
+#   header: magic "C4TB", format version (2 bytes), record size (2 bytes), number of records (8 bytes)
+#   record: canonical key (8 bytes), outcome (1 byte, signed: 1 win, 0 draw, -1 loss), distance to the end (1 byte),
+#           best column index (1 byte, 0 for the leftmost column, on the canonical side), padding
+#
+# At runtime, the tablebase is opened with mmap and searched with a binary search on the records.
+
+tablebase_magic = b"C4TB"
+tablebase_version = 1
+header_format = struct.Struct("<4sHHQ")
+record_format = struct.Struct("<QbBBx")
+
+outcome_names = {1: "win", 0: "draw", -1: "loss"}
+
+
+# Class that represents a tablebase file, opened for lookups.
+class Tablebase:
+
+  # Opens the tablebase file at "path".
+  def __init__(self, path):
+    self.file = open(path, "rb")
+    self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, record_size, self.size = header_format.unpack_from(self.data, 0)
+    if magic != tablebase_magic or version != tablebase_version or record_size != record_format.size:
+      self.close()
+      raise ValueError(path + " is not a tablebase file.")
+
+  # Closes the tablebase file.
+  def close(self):
+    self.data.close()
+    self.file.close()
+
+  # Returns the (outcome, distance, column index) record stored for a canonical key, or None if the key is not stored.
+  def get_record(self, key):
+    low = 0
+    high = self.size
+    while low < high:
+      middle = (low + high) // 2
+      offset = header_format.size + middle * record_format.size
+      record_key = struct.unpack_from("<Q", self.data, offset)[0]
+      if record_key < key:
+        low = middle + 1
+      elif record_key > key:
+        high = middle
+      else:
+        return record_format.unpack_from(self.data, offset)[1:]
+    return None
+
+  # Returns the (outcome, distance, c-column value of the best move) of the position of a Board instance, seen from the player
+  # holding the turn, or None if the position is not in the tablebase.
+  def lookup(self, board):
+    record = self.get_record(board.get_canonical_key())
+    if record is None:
+      return None
+    outcome, distance, column_index = record
+    if board.is_canonical_mirrored():
+      column_index = br.columns - 1 - column_index
+    return outcome, distance, column_index + 1
+
+
+# Class that represents an endgame solver, for positions with at most "max_empty_cells" empty cells. When a tablebase is
+# given, positions are looked up in it before being solved.
+class EndgameSolver:
+
+  # Initializes an EndgameSolver object, with a transposition table of "table_size" slots kept from one solve to the next.
+  def __init__(self, max_empty_cells=16, table_size=1 << 20, tablebase=None):
+    self.max_empty_cells = max_empty_cells
+    self.search = Search(table_size)
+    self.tablebase = tablebase
+
+  # Function that returns the exact score of a position, where the game is not over, as scored by the Search class.
+  def get_score(self, current, mask):
+    search = self.search
+    empty_cells = Search.total_cells - mask.bit_count()
+    discs = mask.bit_count()
+    for column_index in Search.move_order:
+      if not mask & Search.top_cells[column_index] and Search.is_winning_move(current, mask, column_index):
+        return Search.win_score - discs - 1
+    # The score is between the quickest loss and the quickest win still possible.
+    low = -(Search.win_score - discs - 2)
+    high = Search.win_score - discs - 3
+    while low < high:
+      # The first windows tell a win from a draw, and a draw from a loss.
+      if low <= 0 < high:
+        middle = 0
+      elif low <= -1 < high:
+        middle = -1
+      else:
+        middle = (low + high) // 2
+      score = search.negamax(current, mask, empty_cells, middle, middle + 1)
+      if score <= middle:
+        high = score
+      else:
+        low = score
+    return low
+
+  # Function that returns the best column index of a position of a known exact score: the column stored for the position by
+  # a last null-window search, just below that score, which can only succeed with a column reaching the score.
+  def get_best_column(self, current, mask, score):
+    legal_columns = [column_index for column_index in Search.move_order if not mask & Search.top_cells[column_index]]
+    for column_index in legal_columns:
+      if Search.is_winning_move(current, mask, column_index):
+        return column_index
+    self.search.negamax(current, mask, Search.total_cells - mask.bit_count(), score - 1, score)
+    entry = self.search.table.get(Search.get_key(current, mask))
+    if entry is not None and entry[3] in legal_columns:
+      return entry[3]
+    # Without a stored column (its slot was taken by another position), every column is scored.
+    opponent = current ^ mask
+    for column_index in legal_columns:
+      if -self.get_score(opponent, mask | (mask + Search.bottom_cells[column_index])) == score:
+        return column_index
+    return legal_columns[0]
+
+  # Function that returns the (outcome, distance) of a position with a given exact score, where "discs" is the number of discs
+  # on the board.
+  @staticmethod
+  def get_outcome(score, discs):
+    if score > 0:
+      return 1, Search.win_score - score - discs
+    if score < 0:
+      return -1, Search.win_score + score - discs
+    return 0, Search.total_cells - discs
+
+  # Solves a position, where the game is not over, and returns its (outcome, distance, best column index, score).
+  def solve_position(self, current, mask):
+    self.search.table.new_search()
+    score = self.get_score(current, mask)
+    outcome, distance = EndgameSolver.get_outcome(score, mask.bit_count())
+    return outcome, distance, self.get_best_column(current, mask, score), score
+
+  # Solves the position of a Board instance, where the game is not over, and returns a dictionary with the outcome ("win",
+  # "draw" or "loss", for the player holding the turn), the distance to the end (in moves), the best c-column value and the
+  # score, or None when the position has more than "max_empty_cells" empty cells and is not in the tablebase.
+  def solve(self, board):
+    if self.tablebase is not None:
+      record = self.tablebase.lookup(board)
+      if record is not None:
+        outcome, distance, column_value = record
+        discs = len(board.move_stack)
+        score = outcome * (Search.win_score - distance - discs) if outcome else 0
+        return {
+          "outcome": outcome_names[outcome], "distance": distance, "column": column_value, "score": score, "tablebase": True
+        }
+    current, mask = Search.get_position(board)
+    if Search.total_cells - mask.bit_count() > self.max_empty_cells:
+      return None
+    outcome, distance, column_index, score = self.solve_position(current, mask)
+    return {
+      "outcome": outcome_names[outcome],
+      "distance": distance,
+      "column": column_index + 1,
+      "score": score,
+      "tablebase": False,
+    }
+
+
+# Function that solves the positions of simulated games that have at most "max_empty_cells" empty cells, where the game is
+# not over, and returns a dictionary from their canonical key to their (outcome, distance, column index) record, with the
+# column seen on the canonical side.
+def solve_positions(solver, games, seed, records=None, progress=None):
+  if records is None:
+    records = {}
+  for result in simulator.simulate(games, "greedy", "greedy", seed):
+    board = br()
+    for column_value in result["moves"]:
+      cell = board.play_column(int(column_value))
+      if board.last_move_wins(cell) or board.check_ties():
+        break
+      key = board.get_canonical_key()
+      if key in records or br.rows * br.columns - len(board.move_stack) > solver.max_empty_cells:
+        continue
+      outcome, distance, column_index, score = solver.solve_position(*Search.get_position(board))
+      if board.is_canonical_mirrored():
+        column_index = br.columns - 1 - column_index
+      records[key] = (outcome, distance, column_index)
+      if progress is not None:
+        progress(len(records))
+  return records
+
+
+# Writes a dictionary of records to a tablebase file, sorted by key.
+def write_tablebase(path, records):
+  with open(path, "wb") as tablebase_file:
+    tablebase_file.write(header_format.pack(tablebase_magic, tablebase_version, record_format.size, len(records)))
+    for key in sorted(records):
+      outcome, distance, column_index = records[key]
+      tablebase_file.write(record_format.pack(key, outcome, distance, column_index))
+
+
+# Shows the number of positions solved so far while a tablebase is being built.
+def print_progress(count):
+  if count % 100 == 0:
+    print("\r" + str(count) + " positions solved", end="", file=sys.stderr)
+
+
+# Command line interface to build a tablebase from the endgames of simulated games, or to solve a position.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Solve Connect Four endgames and build endgame tablebases.")
+  subparsers = parser.add_subparsers(dest="command", required=True)
+  build_parser = subparsers.add_parser("build", help="solve the endgame positions of simulated games and write a tablebase")
+  build_parser.add_argument("--games", type=int, default=200, help="number of simulated games")
+  build_parser.add_argument("--seed", type=int, default=0, help="seed of the simulated games")
+  build_parser.add_argument("--empty", type=int, default=16, help="maximum number of empty cells of the solved positions")
+  build_parser.add_argument("--output", default="endgame.bin", help="path of the tablebase file")
+  solve_parser = subparsers.add_parser("solve", help="print the outcome of a position")
+  solve_parser.add_argument("--tablebase", help="path of a tablebase file, looked up before solving")
+  solve_parser.add_argument("--empty", type=int, default=16, help="maximum number of empty cells of a solved position")
+  solve_parser.add_argument("moves", help='c-column values played since the start, for i.e.: "4453"')
+  options = parser.parse_args(arguments)
+
+  start_time = time.perf_counter()
+  if options.command == "build":
+    records = solve_positions(EndgameSolver(options.empty), options.games, options.seed, progress=print_progress)
+    write_tablebase(options.output, records)
+    print(
+      "\rWrote " + str(len(records)) + " positions to " + options.output + " in " +
+      format(time.perf_counter() - start_time, ".1f") + "s.", file=sys.stderr
+    )
+    return
+
+  board = br()
+  for column_value in options.moves:
+    try:
+      cell = board.play_column(int(column_value))
+    except ValueError:
+      solve_parser.error('"' + column_value + '" is not a legal c-column value in the position of the previous moves.')
+    if board.last_move_wins(cell) or board.check_ties():
+      print("The game is over.")
+      return
+  tablebase = Tablebase(options.tablebase) if options.tablebase else None
+  solution = EndgameSolver(options.empty, tablebase=tablebase).solve(board)
+  if tablebase is not None:
+    tablebase.close()
+  if solution is None:
+    print("The position has more than " + str(options.empty) + " empty cells.")
+  else:
+    print(
+      "Player " + str(len(board.move_stack) % 2 + 1) + " to play: " + solution["outcome"] + " in " +
+      str(solution["distance"]) + " moves, best column " + str(solution["column"]) + " (" +
+      ("tablebase" if solution["tablebase"] else "solved in " + format(time.perf_counter() - start_time, ".2f") + "s") + ")."
+    )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,200 @@
+import random
+import time
+
+from board import Board as br
+from board import ensure_standard_geometry
+from search import Search
+
+# Threat-space static evaluator of Connect Four positions, to score the positions where a search stops.
+#
+# The evaluator follows the windows of four consecutive cells of the board (the window tables of the Board class). For each
+# player, it counts the windows still open for him (holding none of his opponent's symbols) by number of his symbols: open
+# 2s and open 3s (threats). A threat whose empty cell is on an odd row (counted from the bottom) is worth more to the first
+# player, and one on an even row is worth more to the second player, since those are the threats that the parity of the
+# remaining moves ("zugzwang") eventually lets each player complete. Center control counts, for every symbol, the number of
+# windows through its cell.
+#
+# The counts are updated incrementally: each move only updates the windows containing its cell, and is taken back the same
+# way, so the Search class keeps an evaluator in step with the positions it walks through and scores its leaves without
+# scanning the board.
+
+
+# The weights of the cells below are read from the window tables of the Board class.
+ensure_standard_geometry()
+
+
+# Class that represents an incremental evaluator of the positions of the standard board.
+class ThreatEvaluator:
+  # Weight of a window open for a player, by number of symbols of the player in it.
+  open_window_weights = (0, 1, 4, 12)
+  # Additional weight of a threat on a row of the player's parity.
+  parity_threat_weight = 16
+  # Scores are kept well below the scores of won and lost positions.
+  max_score = 500
+
+  # Number of windows containing each cell, and mask of the cells on the odd rows of the board, counted from the bottom.
+  cell_weights = [len(cell_window_indexes) for cell_window_indexes in br.cell_windows]
+  odd_row_cells = sum(
+    1 << (column_index * br.column_height + row_index) for column_index in range(br.columns) for row_index in range(0, br.rows, 2)
+  )
+
+  # Initializes a ThreatEvaluator object, for an empty board.
+  def __init__(self):
+    self.set_position(0, 0)
+
+  # Function that returns the key of the weights of the evaluator: a 64-bit number that the Search class mixes into the keys of
+  # the evaluation cache, so that a search never reuses the scores of a search with other weights, or with no evaluator. It is
+  # drawn from a seed made of the weights, so it is the same in every process and in saved cache files.
+  def get_cache_key(self):
+    weights = (type(self).__name__, self.open_window_weights, self.parity_threat_weight, self.max_score)
+    return random.Random(repr(weights)).getrandbits(64)
+
+  # Sets the position of the evaluator, from the masks of the first and of the second player.
+  def set_position(self, first_mask, second_mask):
+    self.masks = [0, 0]
+    self.window_counts = [[0] * len(br.windows), [0] * len(br.windows)]
+    # Number of windows open for each player, by number of symbols of the player in them (0 to 4, for a completed window).
+    self.open_counts = [[len(br.windows), 0, 0, 0, 0], [len(br.windows), 0, 0, 0, 0]]
+    self.parity_threats = [0, 0]
+    self.center_control = [0, 0]
+    for player_index, player_mask in enumerate((first_mask, second_mask)):
+      while player_mask:
+        cell_bit = player_mask & -player_mask
+        player_mask ^= cell_bit
+        self.play(cell_bit.bit_length() - 1, player_index)
+
+  # Function that verifies if the empty cell of a threat (given as a mask) is on a row of a player's parity.
+  @staticmethod
+  def is_parity_cell(cell_bit, player_index):
+    return bool(cell_bit & ThreatEvaluator.odd_row_cells) == (player_index == 0)
+
+  # Registers a move of a player on a given cell index.
+  def play(self, cell, player_index):
+    player_counts = self.window_counts[player_index]
+    opponent_counts = self.window_counts[1 - player_index]
+    player_open_counts = self.open_counts[player_index]
+    opponent_open_counts = self.open_counts[1 - player_index]
+    self.masks[player_index] |= 1 << cell
+    for window_index in br.cell_windows[cell]:
+      count = player_counts[window_index]
+      player_counts[window_index] = count + 1
+      opponent_count = opponent_counts[window_index]
+      if opponent_count == 0:
+        player_open_counts[count] -= 1
+        player_open_counts[count + 1] += 1
+        if count == 0:
+          opponent_open_counts[0] -= 1
+        elif count == 2 and ThreatEvaluator.is_parity_cell(br.windows[window_index] & ~self.masks[player_index], player_index):
+          self.parity_threats[player_index] += 1
+        elif count == 3 and ThreatEvaluator.is_parity_cell(1 << cell, player_index):
+          self.parity_threats[player_index] -= 1
+      elif count == 0:
+        # The first symbol of a player in a window closes it for his opponent, and fills the empty cell of a threat.
+        opponent_open_counts[opponent_count] -= 1
+        if opponent_count == 3 and ThreatEvaluator.is_parity_cell(1 << cell, 1 - player_index):
+          self.parity_threats[1 - player_index] -= 1
+    self.center_control[player_index] += ThreatEvaluator.cell_weights[cell]
+
+  # Takes back a move of a player on a given cell index, registered with play().
+  def undo(self, cell, player_index):
+    player_counts = self.window_counts[player_index]
+    opponent_counts = self.window_counts[1 - player_index]
+    player_open_counts = self.open_counts[player_index]
+    opponent_open_counts = self.open_counts[1 - player_index]
+    for window_index in br.cell_windows[cell]:
+      count = player_counts[window_index]
+      player_counts[window_index] = count - 1
+      opponent_count = opponent_counts[window_index]
+      if opponent_count == 0:
+        player_open_counts[count] -= 1
+        player_open_counts[count - 1] += 1
+        if count == 1:
+          opponent_open_counts[0] += 1
+        elif count == 3 and ThreatEvaluator.is_parity_cell(br.windows[window_index] & ~self.masks[player_index], player_index):
+          self.parity_threats[player_index] -= 1
+        elif count == 4 and ThreatEvaluator.is_parity_cell(1 << cell, player_index):
+          self.parity_threats[player_index] += 1
+      elif count == 1:
+        opponent_open_counts[opponent_count] += 1
+        if opponent_count == 3 and ThreatEvaluator.is_parity_cell(1 << cell, 1 - player_index):
+          self.parity_threats[1 - player_index] += 1
+    self.masks[player_index] ^= 1 << cell
+    self.center_control[player_index] -= ThreatEvaluator.cell_weights[cell]
+
+  # Function that returns the heuristic value of the position for one player, without taking his opponent into account.
+  def get_player_value(self, player_index):
+    open_counts = self.open_counts[player_index]
+    weights = ThreatEvaluator.open_window_weights
+    return weights[1] * open_counts[1] + weights[2] * open_counts[2] + weights[3] * open_counts[3] + \
+      ThreatEvaluator.parity_threat_weight * self.parity_threats[player_index] + self.center_control[player_index]
+
+  # Function that returns the score of the position for a player: his value minus the value of his opponent, within
+  # (-max_score, max_score).
+  def evaluate(self, player_index):
+    score = self.get_player_value(player_index) - self.get_player_value(1 - player_index)
+    return max(-ThreatEvaluator.max_score, min(ThreatEvaluator.max_score, score))
+
+  # Function that returns the features of the position for a player, as a dictionary.
+  def get_features(self, player_index):
+    return {
+      "open_2s": self.open_counts[player_index][2],
+      "open_3s": self.open_counts[player_index][3],
+      "parity_threats": self.parity_threats[player_index],
+      "center_control": self.center_control[player_index],
+    }
+
+
+# Plays a game between two searches, each with a node limit per move, from a position given by its first moves, and returns
+# the index of the winner (0 for the first player) or None for a tie.
+def play_match_game(searches, node_limits, opening):
+  board = br()
+  for column_value in opening:
+    board.play_column(column_value)
+  while True:
+    player_index = len(board.move_stack) & 1
+    current, mask = Search.get_position(board)
+    result = searches[player_index].search(current, mask, node_limit=node_limits[player_index])
+    cell = board.play_column(result["column"] + 1)
+    if board.last_move_wins(cell):
+      return player_index
+    if board.check_ties():
+      return None
+
+
+# Command line interface: plays games between a search scoring its leaves with the evaluator and a search without it, each
+# side playing both colors from the same random openings, and reports the points of each side (1 per win, 0.5 per tie).
+def main(arguments=None):
+  import argparse
+  parser = argparse.ArgumentParser(description="Compare searches with and without the threat evaluator.")
+  parser.add_argument("--games", type=int, default=20, help="number of openings (each one is played with both colors)")
+  parser.add_argument("--nodes", type=int, default=500, help="node limit per move of the search with the evaluator")
+  parser.add_argument("--baseline-nodes", type=int, default=2000, help="node limit per move of the search without it")
+  parser.add_argument("--opening-plies", type=int, default=2, help="number of random moves of each opening")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the openings")
+  options = parser.parse_args(arguments)
+
+  rng = random.Random(options.seed)
+  points = [0.0, 0.0]
+  start_time = time.perf_counter()
+  for game in range(options.games):
+    opening = [rng.randrange(1, br.columns + 1) for ply in range(options.opening_plies)]
+    for evaluator_side in (0, 1):
+      searches = [Search(1 << 16), Search(1 << 16)]
+      searches[evaluator_side] = Search(1 << 16, evaluator=ThreatEvaluator())
+      node_limits = [options.baseline_nodes, options.baseline_nodes]
+      node_limits[evaluator_side] = options.nodes
+      winner = play_match_game(searches, node_limits, opening)
+      if winner is None:
+        points[0] += 0.5
+        points[1] += 0.5
+      else:
+        points[0 if winner == evaluator_side else 1] += 1
+  print(
+    "Evaluator with " + str(options.nodes) + " nodes per move: " + str(points[0]) + " points; no evaluator with " +
+    str(options.baseline_nodes) + " nodes per move: " + str(points[1]) + " points (" + str(2 * options.games) + " games, " +
+    format(time.perf_counter() - start_time, ".1f") + "s)."
+  )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,190 @@
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from board import Board as br
+from search import Search
+
+# Process-wide cache of position evaluations, shared by every search, bot and analysis of a process.
+#
+# Evaluations are stored by canonical key, so a position and its mirror image share one entry. The cache is bounded by the
+# memory taken by its entries, rather than by their number: once the estimated size of the entries goes over "max_bytes",
+# the least recently used entries are evicted. The number of hits, misses and evictions is counted, and the cache can be saved
+# to a file and loaded back on the next run, so a restarted process keeps its evaluations.
+#
+# Cache files are made of a header and of one fixed-size record per entry, from the least to the most recently used:
+#
+#   header: magic "C4EC", format version (2 bytes), record size (2 bytes), number of records (8 bytes)
+#   record: key (8 bytes), search depth (2 bytes), score (2 bytes, signed), best column index (1 byte), padding (1 byte)
+
+cache_magic = b"C4EC"
+cache_version = 3
+
+header_format = struct.Struct("<4sHHQ")
+record_format = struct.Struct("<QHhBx")
+
+# Estimated memory taken by an entry, besides its key and evaluation: its slot in the dictionary and its link in the usage
+# order of the entries.
+entry_overhead = 100
+
+
+# Function that returns the estimated memory taken by an entry of the cache, in bytes.
+def get_entry_size(key, evaluation):
+  size = entry_overhead + sys.getsizeof(key) + sys.getsizeof(evaluation)
+  if isinstance(evaluation, tuple):
+    size += sum(sys.getsizeof(item) for item in evaluation)
+  return size
+
+
+# Class that represents a cache of evaluations, bounded by memory, with least recently used eviction.
+class EvaluationCache:
+
+  # Initializes an EvaluationCache object, holding at most "max_bytes" bytes of entries (64 MiB, by default).
+  def __init__(self, max_bytes=64 << 20):
+    self.max_bytes = max_bytes
+    self.entries = OrderedDict()
+    self.used_bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.lock = threading.Lock()
+
+  def __len__(self):
+    return len(self.entries)
+
+  # Returns the evaluation stored for a key, or None if the key is not in the cache.
+  def get(self, key):
+    with self.lock:
+      evaluation = self.entries.get(key)
+      if evaluation is None:
+        self.misses += 1
+        return None
+      self.entries.move_to_end(key)
+      self.hits += 1
+      return evaluation
+
+  # Stores the evaluation of a key, evicting the least recently used entries when the cache goes over its memory bound.
+  def put(self, key, evaluation):
+    with self.lock:
+      previous_evaluation = self.entries.pop(key, None)
+      if previous_evaluation is not None:
+        self.used_bytes -= get_entry_size(key, previous_evaluation)
+      self.entries[key] = evaluation
+      self.used_bytes += get_entry_size(key, evaluation)
+      while self.used_bytes > self.max_bytes and self.entries:
+        evicted_key, evicted_evaluation = self.entries.popitem(last=False)
+        self.used_bytes -= get_entry_size(evicted_key, evicted_evaluation)
+        self.evictions += 1
+
+  # Removes every entry and resets the counters.
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+      self.used_bytes = 0
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+
+  # Function that returns the counters of the cache as a dictionary.
+  def get_stats(self):
+    lookups = self.hits + self.misses
+    return {
+      "entries": len(self.entries),
+      "used_bytes": self.used_bytes,
+      "max_bytes": self.max_bytes,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "hit_rate": self.hits / lookups if lookups else 0.0,
+    }
+
+  # Saves every entry to a file, in their usage order. The file is written next to its final path and then renamed, so an
+  # interrupted save never leaves a partial file behind.
+  def save(self, path):
+    with self.lock:
+      items = list(self.entries.items())
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as cache_file:
+      cache_file.write(header_format.pack(cache_magic, cache_version, record_format.size, len(items)))
+      for key, (depth, score, column_index) in items:
+        cache_file.write(record_format.pack(key, depth, score, column_index))
+    os.replace(temporary_path, path)
+
+  # Loads the entries of a file saved by save(), keeping their usage order, and returns the number of entries loaded.
+  def load(self, path):
+    with open(path, "rb") as cache_file:
+      data = cache_file.read()
+    try:
+      magic, version, record_size, size = header_format.unpack_from(data, 0)
+    except struct.error as error:
+      raise ValueError(path + " is not an evaluation cache file.") from error
+    if magic != cache_magic:
+      raise ValueError(path + " is not an evaluation cache file.")
+    # Version 1 files stored the scores of searches with and without an evaluator under the same keys, and version 2 files
+    # were pickled.
+    if version != cache_version or record_size != record_format.size:
+      raise ValueError(path + " was written by another version of the evaluation cache.")
+    if len(data) != header_format.size + size * record_format.size:
+      raise ValueError(path + " is truncated.")
+    for key, depth, score, column_index in record_format.iter_unpack(memoryview(data)[header_format.size:]):
+      self.put(key, (depth, score, column_index))
+    return size
+
+
+# Process-wide cache, created by the first call of get_evaluation_cache().
+evaluation_cache = None
+
+
+# Function that returns the process-wide evaluation cache.
+def get_evaluation_cache():
+  global evaluation_cache
+  if evaluation_cache is None:
+    evaluation_cache = EvaluationCache()
+  return evaluation_cache
+
+
+# Command line interface: searches the positions of simulated games with the process-wide cache, loaded from and saved to a
+# file, and reports the cache counters. Running it twice with the same file shows the effect of a warm restart. The
+# simulator is only imported here, since every computer player imports this module.
+def main(arguments=None):
+  import argparse
+  import simulator
+  parser = argparse.ArgumentParser(description="Search simulated Connect Four positions with a persistent evaluation cache.")
+  parser.add_argument("--file", default="evaluation_cache.bin", help="file the cache is loaded from and saved to")
+  parser.add_argument("--games", type=int, default=50, help="number of simulated games whose positions are searched")
+  parser.add_argument("--plies", type=int, default=12, help="number of moves of each game whose positions are searched")
+  parser.add_argument("--depth", type=int, default=8, help="depth of the search of each position")
+  parser.add_argument("--max-bytes", type=int, default=64 << 20, help="memory bound of the cache")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the simulated games")
+  options = parser.parse_args(arguments)
+
+  cache = get_evaluation_cache()
+  cache.max_bytes = options.max_bytes
+  if os.path.exists(options.file):
+    print("Loaded " + str(cache.load(options.file)) + " entries from " + options.file + ".")
+  search = Search(cache=cache)
+  start_time = time.perf_counter()
+  positions = 0
+  for result in simulator.simulate(options.games, "greedy", "greedy", options.seed):
+    board = br()
+    for column_value in result["moves"][:options.plies]:
+      if board.last_move_wins(board.play_column(int(column_value))):
+        break
+      search.search(*Search.get_position(board), max_depth=options.depth)
+      positions += 1
+  elapsed_time = time.perf_counter() - start_time
+  cache.save(options.file)
+  stats = cache.get_stats()
+  print(
+    "Searched " + str(positions) + " positions in " + format(elapsed_time, ".2f") + "s. Cache: " + str(stats["entries"]) +
+    " entries (" + format(stats["used_bytes"] / 1024, ".0f") + " KiB), " + str(stats["hits"]) + " hits, " +
+    str(stats["misses"]) + " misses (" + format(stats["hit_rate"] * 100, ".1f") + "% hit rate), " +
+    str(stats["evictions"]) + " evictions. Saved to " + options.file + "."
+  )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+from board import Board as br
+
+# Compact binary archive of Connect Four games, with streaming writing, reading and replay.
+#
+# A game is stored as the c-column values (1 to 7) of its moves, from the first move, packed two per byte (one 4-bit nibble per
+# move, the first move of each pair in the low nibble), after one byte with its number of moves. A full 42-move game takes 22
+# bytes. An archive file is an 8-byte header followed by the game records, one after the other:
+#
+#   header: magic "C4GR", format version (2 bytes), rows (1 byte), columns (1 byte)
+#   record: number of moves (1 byte), moves (one nibble each, padded with a zero nibble to a whole byte)
+#
+# Games are written from any iterable and read back with generators, a buffer at a time, so archives of millions of games are
+# processed without ever being loaded in memory. New games can be appended to an existing archive.
+
+record_magic = b"C4GR"
+record_version = 1
+header_format = struct.Struct("<4sHBB")
+
+# The two c-column values packed in each possible byte, used to unpack the moves of a record with a single table lookup per byte.
+nibble_pairs = [bytes((byte & 15, byte >> 4)) for byte in range(256)]
+
+
+# Function that returns the record of a game, from its c-column values (a sequence of integers, or a string of digits such as
+# "4453"). A ValueError is raised for a c-column value that is not between 1 and 7, since it would not fit in its nibble.
+def encode_game(columns):
+  moves = [int(column_value) for column_value in columns]
+  if len(moves) > br.rows * br.columns:
+    raise ValueError("A game can not have more than " + str(br.rows * br.columns) + " moves.")
+  if moves and (min(moves) < 1 or max(moves) > br.columns):
+    raise ValueError("The c-column values of a game must be between 1 and " + str(br.columns) + ".")
+  moves = bytes(moves)
+  padded_moves = moves + b"\0" if len(moves) % 2 else moves
+  return bytes((len(moves),)) + bytes(low | high << 4 for low, high in zip(padded_moves[0::2], padded_moves[1::2]))
+
+
+# Function that returns the c-column values of the game stored in a record, as bytes (one integer from 1 to 7 per move).
+def decode_game(record):
+  return b"".join(map(nibble_pairs.__getitem__, record[1:]))[:record[0]]
+
+
+# Writes the header of a new archive file, or verifies the header of an existing one, leaving the file positioned at its end.
+def open_archive(archive_file):
+  archive_file.seek(0, os.SEEK_END)
+  if archive_file.tell() == 0:
+    archive_file.write(header_format.pack(record_magic, record_version, br.rows, br.columns))
+    return
+  archive_file.seek(0)
+  check_header(archive_file.read(header_format.size), archive_file.name)
+  archive_file.seek(0, os.SEEK_END)
+
+
+# Raises a ValueError if the header of a file is not the header of an archive of games of the board.
+def check_header(header, path):
+  if len(header) != header_format.size:
+    raise ValueError(path + " is not a game archive file.")
+  magic, version, rows, columns = header_format.unpack(header)
+  if magic != record_magic or version != record_version:
+    raise ValueError(path + " is not a game archive file.")
+  if rows != br.rows or columns != br.columns:
+    raise ValueError(path + " holds games of a " + str(rows) + "x" + str(columns) + " board.")
+
+
+# Writes every game of an iterable of games (each one given as its c-column values) at the end of an archive file, creating it
+# if needed, and returns the number of games written. Games are consumed one at a time, so the iterable can be a generator.
+def write_games(path, games, buffer_size=1 << 16):
+  count = 0
+  with open(path, "ab+") as archive_file:
+    open_archive(archive_file)
+    buffer = bytearray()
+    for columns in games:
+      buffer += encode_game(columns)
+      count += 1
+      if len(buffer) >= buffer_size:
+        archive_file.write(buffer)
+        buffer.clear()
+    archive_file.write(buffer)
+  return count
+
+
+# Appends a single game to an archive file, creating it if needed.
+def append_game(path, columns):
+  write_games(path, (columns,))
+
+
+# Generator that yields the c-column values of every game of an archive file, in order, as bytes (one integer from 1 to 7 per
+# move). The file is read "buffer_size" bytes at a time.
+def read_games(path, buffer_size=1 << 20):
+  with open(path, "rb") as archive_file:
+    check_header(archive_file.read(header_format.size), path)
+    buffer = b""
+    position = 0
+    while True:
+      data = archive_file.read(buffer_size)
+      if not data:
+        break
+      buffer = buffer[position:] + data
+      position = 0
+      buffer_end = len(buffer)
+      while position < buffer_end:
+        record_end = position + 1 + (buffer[position] + 1) // 2
+        if record_end > buffer_end:
+          break
+        yield decode_game(buffer[position:record_end])
+        position = record_end
+    if position < len(buffer):
+      raise ValueError(path + " ends with a truncated game record.")
+
+
+# Function that replays the moves of a game on a new Board instance, and returns its result: "player_1" or "player_2" for the
+# winner, "tie", or "unfinished" when the game stopped before its end. A ValueError is raised if a move is not valid, or if
+# there are moves after the end of the game.
+def replay_game(columns):
+  board = br()
+  last_ply = len(columns)
+  for ply in range(1, last_ply + 1):
+    column_value = columns[ply - 1]
+    if not 1 <= column_value <= br.columns or not board.legal_columns_mask >> (column_value - 1) & 1:
+      raise ValueError("Move " + str(ply) + " is not a valid play of the c-column value " + str(column_value) + ".")
+    cell = board.play_column(column_value)
+    if board.last_move_wins(cell):
+      result = "player_" + str(2 - ply % 2)
+    elif board.check_ties():
+      result = "tie"
+    else:
+      continue
+    if ply != last_ply:
+      raise ValueError("The game has moves after its end, at move " + str(ply) + ".")
+    return result
+  return "unfinished"
+
+
+# Generator that replays every game of an archive file, yielding a dictionary with the index, result and number of moves of
+# each game, in order. Invalid games get the "invalid" result and the reason in "error", and do not stop the replay.
+def replay_games(path, buffer_size=1 << 20):
+  game_index = 0
+  for columns in read_games(path, buffer_size):
+    game_result = {"game": game_index, "result": None, "plies": len(columns)}
+    try:
+      game_result["result"] = replay_game(columns)
+    except ValueError as error:
+      game_result["result"] = "invalid"
+      game_result["error"] = str(error)
+    yield game_result
+    game_index += 1
+
+
+# Generator that yields the moves of every game of a JSON Lines file of game results (the output of "simulator.py"), as
+# strings of c-column values.
+def read_json_games(json_file):
+  for line in json_file:
+    if line.strip():
+      yield json.loads(line)["moves"]
+
+
+# Command line interface to archive simulated games, and to replay and validate an archive.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Write and replay Connect Four game archives.")
+  subparsers = parser.add_subparsers(dest="command", required=True)
+  write_parser = subparsers.add_parser("write", help="append the games of a JSON Lines file of results to an archive")
+  write_parser.add_argument("--input", help="JSON Lines file with a \"moves\" field per game (standard input, by default)")
+  write_parser.add_argument("--output", default="games.c4g", help="path of the archive file")
+  replay_parser = subparsers.add_parser("replay", help="replay and validate every game of an archive")
+  replay_parser.add_argument("archive", help="path of the archive file")
+  replay_parser.add_argument("--results", action="store_true", help="print the result of every game as a JSON line")
+  options = parser.parse_args(arguments)
+
+  start_time = time.perf_counter()
+  if options.command == "write":
+    json_file = open(options.input) if options.input else sys.stdin
+    try:
+      count = write_games(options.output, read_json_games(json_file))
+    finally:
+      if json_file is not sys.stdin:
+        json_file.close()
+    print(
+      "Wrote " + str(count) + " games to " + options.output + " (" + str(os.path.getsize(options.output)) + " bytes) in " +
+      format(time.perf_counter() - start_time, ".2f") + "s.", file=sys.stderr
+    )
+    return 0
+
+  outcomes = {"player_1": 0, "player_2": 0, "tie": 0, "unfinished": 0, "invalid": 0}
+  count = 0
+  for game_result in replay_games(options.archive):
+    outcomes[game_result["result"]] += 1
+    count += 1
+    if options.results:
+      print(json.dumps(game_result))
+  elapsed_time = time.perf_counter() - start_time
+  print(
+    "Replayed " + str(count) + " games in " + format(elapsed_time, ".2f") + "s (" +
+    format(count / elapsed_time if elapsed_time else 0, ".0f") + " games/s, " +
+    format((os.path.getsize(options.archive) - header_format.size) / count if count else 0, ".1f") + " bytes/game). " +
+    "Player 1 wins: " + str(outcomes["player_1"]) + ", player 2 wins: " + str(outcomes["player_2"]) + ", ties: " +
+    str(outcomes["tie"]) + ", unfinished: " + str(outcomes["unfinished"]) + ", invalid: " + str(outcomes["invalid"]) + ".",
+    file=sys.stderr,
+  )
+  return 1 if outcomes["invalid"] else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
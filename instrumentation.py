@@ -0,0 +1,240 @@
+import bisect
+import json
+import sys
+import threading
+import time
+
+from board import Board as br
+
+# Opt-in instrumentation of the Board functions and of the phases of the game loop.
+#
+# A Metrics object counts the calls of every measured phase (a Board function, or a step of a game turn, such as reading the
+# move or checking for a tie) and records their cumulative time and a histogram of their duration. Nothing is measured unless
+# it is asked for: the game loop only times its phases when it is given a Metrics object, and the Board functions are only
+# wrapped with timers between instrument_board() and uninstrument_board(). Otherwise, the only cost is one plain function
+# call per phase of a turn.
+#
+# Metrics are exported as JSON or in the Prometheus text format, to a file or over HTTP ("/metrics" for the Prometheus text,
+# "/metrics.json" for the JSON). Executing "python instrumentation.py" measures simulated games, optionally under cProfile.
+#
+# The game imports this module on every run, so the HTTP server, the profiler and the simulator are only imported by the
+# functions that use them.
+
+# Upper bounds, in seconds, of the buckets of every duration histogram. Longer calls are counted in one last bucket.
+bucket_bounds = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0)
+
+# Board functions timed by instrument_board.
+board_functions = (
+  "is_valid_play", "legal_moves", "get_valid_move_cell", "register_cell", "play_column", "undo", "last_move_wins",
+  "is_winning_cell", "check_rows", "check_columns", "check_diagonals", "check_ties", "__repr__",
+)
+
+# Original Board functions replaced by instrument_board, by name.
+instrumented_functions = {}
+
+
+# Class that represents the measures of one phase: its number of calls, their cumulative and longest durations, and the
+# number of calls in each bucket of the duration histogram.
+class PhaseMetrics:
+  __slots__ = ("calls", "total_time", "max_time", "buckets")
+
+  # Initializes a PhaseMetrics object with no calls.
+  def __init__(self):
+    self.calls = 0
+    self.total_time = 0.0
+    self.max_time = 0.0
+    self.buckets = [0] * (len(bucket_bounds) + 1)
+
+  # Records a call of the given duration, in seconds.
+  def add(self, elapsed_time):
+    self.calls += 1
+    self.total_time += elapsed_time
+    if elapsed_time > self.max_time:
+      self.max_time = elapsed_time
+    self.buckets[bisect.bisect_left(bucket_bounds, elapsed_time)] += 1
+
+
+# Class that represents the measures of every phase, by phase name.
+class Metrics:
+
+  # Initializes a Metrics object with no measures.
+  def __init__(self):
+    self.phases = {}
+
+  # Records a call of a phase, of the given duration in seconds. A new phase is only added to "phases" once it holds its first
+  # call, so an export from another thread never sees a phase with no calls.
+  def add(self, phase, elapsed_time):
+    phase_metrics = self.phases.get(phase)
+    if phase_metrics is None:
+      phase_metrics = PhaseMetrics()
+      phase_metrics.add(elapsed_time)
+      self.phases[phase] = phase_metrics
+      return
+    phase_metrics.add(elapsed_time)
+
+  # Calls a function with the given arguments, records its duration for a phase, and returns its result.
+  def measure(self, phase, function, *arguments):
+    start_time = time.perf_counter()
+    try:
+      return function(*arguments)
+    finally:
+      self.add(phase, time.perf_counter() - start_time)
+
+  # Function that returns the measures of every phase as a dictionary, ready to be exported as JSON. Durations are in seconds.
+  # Exports may run in the thread of the HTTP server while the game adds phases, so they iterate over a copy of the phases.
+  def to_dict(self):
+    return {
+      phase: {
+        "calls": phase_metrics.calls,
+        "total_time": phase_metrics.total_time,
+        "mean_time": phase_metrics.total_time / phase_metrics.calls,
+        "max_time": phase_metrics.max_time,
+        "buckets": dict(zip([str(bound) for bound in bucket_bounds] + ["+Inf"], phase_metrics.buckets)),
+      }
+      for phase, phase_metrics in sorted(list(self.phases.items()))
+    }
+
+  # Function that returns the measures of every phase in the Prometheus text format, as one histogram of call durations
+  # labelled by phase, and the longest duration of each phase.
+  def to_prometheus(self):
+    lines = [
+      "# HELP connect_four_phase_seconds Duration of the calls of each phase.",
+      "# TYPE connect_four_phase_seconds histogram",
+    ]
+    maximum_lines = [
+      "# HELP connect_four_phase_max_seconds Longest call of each phase.",
+      "# TYPE connect_four_phase_max_seconds gauge",
+    ]
+    for phase, phase_metrics in sorted(list(self.phases.items())):
+      label = "phase=\"" + phase + "\""
+      cumulative_calls = 0
+      for bound, calls in zip(bucket_bounds, phase_metrics.buckets):
+        cumulative_calls += calls
+        lines.append("connect_four_phase_seconds_bucket{" + label + ",le=\"" + repr(bound) + "\"} " + str(cumulative_calls))
+      lines.append("connect_four_phase_seconds_bucket{" + label + ",le=\"+Inf\"} " + str(phase_metrics.calls))
+      lines.append("connect_four_phase_seconds_sum{" + label + "} " + repr(phase_metrics.total_time))
+      lines.append("connect_four_phase_seconds_count{" + label + "} " + str(phase_metrics.calls))
+      maximum_lines.append("connect_four_phase_max_seconds{" + label + "} " + repr(phase_metrics.max_time))
+    return "\n".join(lines + maximum_lines) + "\n"
+
+  # Writes the measures to a file: as JSON when its name ends with ".json", in the Prometheus text format otherwise.
+  def write(self, path):
+    with open(path, "w") as metrics_file:
+      if path.endswith(".json"):
+        json.dump(self.to_dict(), metrics_file, indent=2)
+      else:
+        metrics_file.write(self.to_prometheus())
+
+  # Serves the measures over HTTP, from a background thread, and returns the server (stopped with its shutdown() function).
+  def serve(self, host="127.0.0.1", port=9464):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    metrics = self
+
+    # Class that answers the requests of the metrics endpoint.
+    class MetricsHandler(BaseHTTPRequestHandler):
+      def do_GET(self):
+        if self.path == "/metrics":
+          body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+          body, content_type = json.dumps(metrics.to_dict()), "application/json"
+        else:
+          self.send_error(404)
+          return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body.encode())))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+      # Requests are not logged to the terminal, where the game is played.
+      def log_message(self, format, *arguments):
+        pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Function that returns a function that calls a Board function and records its duration for a phase.
+def get_timed_function(metrics, phase, function):
+  perf_counter = time.perf_counter
+
+  def timed_function(*arguments):
+    start_time = perf_counter()
+    try:
+      return function(*arguments)
+    finally:
+      metrics.add(phase, perf_counter() - start_time)
+
+  timed_function.__name__ = function.__name__
+  timed_function.__doc__ = function.__doc__
+  return timed_function
+
+
+# Replaces the given Board functions with timed versions recording their calls in "metrics", as "board.<function name>"
+# phases, for every Board instance, until uninstrument_board() is called.
+def instrument_board(metrics, functions=board_functions):
+  uninstrument_board()
+  for name in functions:
+    instrumented_functions[name] = br.__dict__[name]
+    setattr(br, name, get_timed_function(metrics, "board." + name, br.__dict__[name]))
+
+
+# Restores the original Board functions replaced by instrument_board().
+def uninstrument_board():
+  for name, function in instrumented_functions.items():
+    setattr(br, name, function)
+  instrumented_functions.clear()
+
+
+# Simulates games with the Board functions instrumented, optionally under cProfile, and returns the metrics, along with the
+# profile (None when "profile" is False).
+def measure_games(games, policy_a, policy_b, seed, profile=False):
+  import cProfile
+  import simulator
+  metrics = Metrics()
+  profiler = cProfile.Profile() if profile else None
+  instrument_board(metrics)
+  try:
+    if profiler is not None:
+      profiler.enable()
+    for game_index in range(games):
+      metrics.measure("game", simulator.play_game, game_index, policy_a, policy_b, seed)
+  finally:
+    if profiler is not None:
+      profiler.disable()
+    uninstrument_board()
+  return metrics, profiler
+
+
+# Command line interface: measures simulated games and exports their metrics.
+def main(arguments=None):
+  import argparse
+  import pstats
+  import simulator
+  parser = argparse.ArgumentParser(description="Measure the Board functions on simulated Connect Four games.")
+  parser.add_argument("--games", type=int, default=1000, help="number of games to simulate")
+  parser.add_argument("--policy-a", default="greedy", choices=sorted(simulator.policies), help="policy of player 1")
+  parser.add_argument("--policy-b", default="greedy", choices=sorted(simulator.policies), help="policy of player 2")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the games")
+  parser.add_argument("--output", help="file for the metrics: JSON if it ends with \".json\", Prometheus text otherwise")
+  parser.add_argument("--profile", help="run the games under cProfile and save the profile to this file")
+  options = parser.parse_args(arguments)
+
+  metrics, profiler = measure_games(options.games, options.policy_a, options.policy_b, options.seed, options.profile is not None)
+  if options.output:
+    metrics.write(options.output)
+  else:
+    sys.stdout.write(metrics.to_prometheus())
+  for phase, phase_metrics in sorted(metrics.phases.items(), key=lambda item: -item[1].total_time):
+    print(
+      phase + ": " + str(phase_metrics.calls) + " calls, " + format(phase_metrics.total_time, ".3f") + "s, " +
+      format(phase_metrics.total_time / phase_metrics.calls * 1e6, ".2f") + " us/call", file=sys.stderr
+    )
+  if profiler is not None:
+    profiler.dump_stats(options.profile)
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+  main()
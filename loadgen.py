@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from board import Board as br
+from server import raise_open_files_limit
+
+# Load generator of the Connect Four game server.
+#
+# It opens "idle" connections that each create a game and then stay silent, to check how many concurrent games the server
+# holds, and "active" connections that each play solo games with random moves, measuring the time between every MOVE command
+# and the MOVED message answering it. The latency percentiles and the number of moves per second are reported at the end.
+
+
+# Reads lines from the server until one starts with one of the given prefixes, and returns it.
+async def read_until(reader, prefixes):
+  while True:
+    line = await reader.readline()
+    if not line:
+      raise ConnectionError("connection closed by the server")
+    line = line.decode().strip()
+    if line.startswith(prefixes):
+      return line
+
+
+# Opens a connection that creates a game and keeps it open, without any further activity, until "release" is set. The
+# game is then requested, to verify that the server still hosts it.
+async def run_idle_client(host, port, opened, release, semaphore):
+  async with semaphore:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"NEW\n")
+    await read_until(reader, ("GAME",))
+  opened.append(writer)
+  await release.wait()
+  # The game must still be hosted once the load test is over.
+  writer.write(b"BOARD\n")
+  await read_until(reader, ("BOARD",))
+  writer.close()
+
+
+# Opens a connection that plays "games" solo games with random moves, and appends the latency of each move, in seconds, to
+# "latencies".
+async def run_active_client(host, port, games, latencies, rng):
+  reader, writer = await asyncio.open_connection(host, port)
+  for game in range(games):
+    writer.write(b"NEW SOLO\n")
+    await read_until(reader, ("GAME",))
+    # The client follows the game on its own board, to choose legal moves and to know when the game is over.
+    board = br()
+    finished = False
+    while not finished:
+      column_value = rng.choice(board.legal_moves())
+      start_time = time.perf_counter()
+      writer.write(b"MOVE " + str(column_value).encode() + b"\n")
+      message = await read_until(reader, ("MOVED", "ERR"))
+      latencies.append(time.perf_counter() - start_time)
+      if message.startswith("ERR"):
+        raise RuntimeError("The server rejected a move: " + message)
+      cell = board.play_column(column_value)
+      if board.last_move_wins(cell) or board.check_ties():
+        await read_until(reader, ("WIN", "TIE"))
+        finished = True
+  writer.write(b"QUIT\n")
+  await read_until(reader, ("BYE",))
+  writer.close()
+
+
+# Waits until a server process accepts connections on a given address, trying again every 0.1 seconds. A RuntimeError is
+# raised if the process exits, or if no connection was accepted after "timeout" seconds.
+def wait_for_server(server_process, host, port, timeout):
+  deadline = time.monotonic() + timeout
+  while True:
+    if server_process.poll() is not None:
+      raise RuntimeError("The server process exited with status " + str(server_process.returncode) + ".")
+    try:
+      socket.create_connection((host, port), timeout=1.0).close()
+      return
+    except OSError:
+      if time.monotonic() > deadline:
+        raise RuntimeError("The server did not accept connections on " + host + ":" + str(port) + " after " + str(timeout) + "s.")
+      time.sleep(0.1)
+
+
+# Function that returns the value of a given percentile (0 to 100) of a sorted list of samples.
+def get_percentile(sorted_samples, percentile):
+  return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * percentile / 100))]
+
+
+# Runs the load test: opens the idle games first, then plays the active games while the idle ones are still open.
+async def run_load(host, port, idle, active, games, seed, concurrency):
+  opened = []
+  release = asyncio.Event()
+  semaphore = asyncio.Semaphore(concurrency)
+  start_time = time.perf_counter()
+  idle_tasks = [asyncio.create_task(run_idle_client(host, port, opened, release, semaphore)) for client in range(idle)]
+  while len(opened) < idle:
+    await asyncio.sleep(0.1)
+    for task in idle_tasks:
+      if task.done() and task.exception() is not None:
+        raise task.exception()
+  print("Opened " + str(idle) + " idle games in " + format(time.perf_counter() - start_time, ".1f") + "s.")
+
+  latencies = []
+  start_time = time.perf_counter()
+  await asyncio.gather(*[
+    run_active_client(host, port, games, latencies, random.Random(str(seed) + ":" + str(client))) for client in range(active)
+  ])
+  elapsed_time = time.perf_counter() - start_time
+  release.set()
+  await asyncio.gather(*idle_tasks)
+
+  latencies.sort()
+  print(
+    "Played " + str(active * games) + " games (" + str(len(latencies)) + " moves, " +
+    format(len(latencies) / elapsed_time, ".0f") + " moves/s) alongside " + str(idle) + " idle games."
+  )
+  if latencies:
+    print(
+      "Move latency: p50 " + format(get_percentile(latencies, 50) * 1000, ".2f") + " ms, p90 " +
+      format(get_percentile(latencies, 90) * 1000, ".2f") + " ms, p99 " + format(get_percentile(latencies, 99) * 1000, ".2f") +
+      " ms, max " + format(latencies[-1] * 1000, ".2f") + " ms."
+    )
+  print("Every idle game was still hosted at the end of the test.")
+
+
+# Command line interface of the load generator.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Load test the Connect Four game server.")
+  parser.add_argument("--host", default="127.0.0.1", help="address of the server")
+  parser.add_argument("--port", type=int, default=7744, help="port of the server")
+  parser.add_argument("--idle", type=int, default=10000, help="number of idle games kept open")
+  parser.add_argument("--active", type=int, default=50, help="number of connections playing games")
+  parser.add_argument("--games", type=int, default=20, help="number of games played by each active connection")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the random moves")
+  parser.add_argument("--concurrency", type=int, default=500, help="number of idle connections opened at the same time")
+  parser.add_argument("--spawn-server", action="store_true", help="start a server process on the given port for the test")
+  parser.add_argument("--server-timeout", type=float, default=30.0, help="seconds to wait for the spawned server to start")
+  options = parser.parse_args(arguments)
+  raise_open_files_limit()
+
+  server_process = None
+  if options.spawn_server:
+    server_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    server_process = subprocess.Popen([sys.executable, server_path, "--host", options.host, "--port", str(options.port)])
+  try:
+    if server_process is not None:
+      wait_for_server(server_process, options.host, options.port, options.server_timeout)
+    asyncio.run(run_load(options.host, options.port, options.idle, options.active, options.games, options.seed, options.concurrency))
+  finally:
+    if server_process is not None:
+      server_process.terminate()
+      server_process.wait()
+
+
+if __name__ == "__main__":
+  main()
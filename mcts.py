@@ -0,0 +1,395 @@
+import math
+import random
+import time
+
+from board import Board as br
+from board import get_geometry
+from player import Player
+
+# Monte Carlo tree search of Connect Four positions, for boards of any geometry.
+#
+# Where the Search class needs to search a position to its end to prove anything, the tree search only plays random games
+# (playouts) from the positions of a tree grown one node at a time, and picks the move whose games went best. Each iteration
+# goes down the tree from the root, choosing at each node the child with the best UCT value (its average result plus an
+# exploration bonus that grows as its siblings are visited more than it is), adds one child to the first node that still has
+# untried moves, and plays a batch of playouts from it. The results are then added to every node of the path, each seen
+# from the player who made the move leading to that node: 1 per won game, 0.5 per tie.
+#
+# Playouts work on two bitboard masks ("current", with the cells of the player holding the turn, and "mask", with every filled
+# cell), laid out as the masks of the Board class for the geometry of the board, and are played in batches: every playout of a
+# batch starts from the same position, so the position is only prepared once per batch. With more than one worker, batches
+# are handed to a process pool, one batch per worker at a time; the nodes of a batch still in flight already count its
+# playouts as visits, with no result yet, so the next iterations explore other moves in the meantime.
+#
+# The tree is kept from one move to the next: the next search starts from the node of the new position, reached through the
+# moves played since the previous search, with all the playouts already made below it. Searches stop on a wall-clock budget
+# or a number of playouts, and a move can be chosen as soon as the first batch is over.
+
+
+# Function that returns True when a player mask, where a cell has just been filled, holds "connect" consecutively aligned
+# cells through that cell, given the tables of the board geometry.
+def is_winning_cell(player_mask, cell, cell_lines, alignment_shifts):
+  for line_mask, (first_shift, second_shift, other_shifts) in zip(cell_lines[cell], alignment_shifts):
+    line = player_mask & line_mask
+    line &= line >> first_shift
+    line &= line >> second_shift
+    for alignment_shift in other_shifts:
+      line &= line >> alignment_shift
+    if line:
+      return True
+  return False
+
+
+# Plays "count" random games from a position of a board of the given (rows, columns, connect) geometry, where the game is not
+# over, and returns the number of games won by the player holding the turn, and the number of tied games. The games only
+# depend on the seed, so a batch has the same results in any process.
+def run_playouts(geometry_key, current, mask, count, seed):
+  geometry = get_geometry(*geometry_key)
+  rows, columns, column_height = geometry["rows"], geometry["columns"], geometry["column_height"]
+  cell_lines, alignment_shifts = geometry["cell_lines"], geometry["alignment_shifts"]
+  total_cells = rows * columns
+  column_mask = (1 << rows) - 1
+  start_heights = [(mask >> (column_index * column_height) & column_mask).bit_length() for column_index in range(columns)]
+  start_columns = [column_index for column_index in range(columns) if start_heights[column_index] < rows]
+  start_discs = mask.bit_count()
+  random_number = random.Random(seed).random
+  wins = 0
+  ties = 0
+  for playout in range(count):
+    heights = start_heights[:]
+    legal_columns = start_columns[:]
+    player_masks = [current, current ^ mask]
+    player_index = 0
+    discs = start_discs
+    while discs < total_cells:
+      column_position = int(random_number() * len(legal_columns))
+      column_index = legal_columns[column_position]
+      cell = column_index * column_height + heights[column_index]
+      heights[column_index] += 1
+      # A full column is replaced by the last legal column, so no column is ever searched for.
+      if heights[column_index] == rows:
+        legal_columns[column_position] = legal_columns[-1]
+        legal_columns.pop()
+      player_mask = player_masks[player_index] | (1 << cell)
+      player_masks[player_index] = player_mask
+      discs += 1
+      if is_winning_cell(player_mask, cell, cell_lines, alignment_shifts):
+        break
+      player_index ^= 1
+    else:
+      ties += 1
+      continue
+    if player_index == 0:
+      wins += 1
+  return wins, ties
+
+
+# Class that represents a node of the search tree: a position, the column index of the move that led to it, the results of
+# the playouts made below it and, when the game is over, the result of that move.
+class Node:
+  __slots__ = ("parent", "column_index", "current", "mask", "children", "untried_columns", "visits", "score", "result")
+
+  # Initializes a Node object for the position given by the "current" and "mask" bitboards. "result" is None while the game
+  # goes on, 1 if the move that led to the node won the game, and 0.5 if it tied it.
+  def __init__(self, parent, column_index, current, mask, untried_columns, result=None):
+    self.parent = parent
+    self.column_index = column_index
+    self.current = current
+    self.mask = mask
+    self.children = {}
+    self.untried_columns = untried_columns
+    # Number of playouts made (or in flight) below the node, and sum of their results for the player who moved into it.
+    self.visits = 0
+    self.score = 0.0
+    self.result = result
+
+
+# Class that represents a Monte Carlo tree search engine, keeping its tree between the moves of a game.
+class MonteCarloTreeSearch:
+  # Weight of the exploration bonus of the UCT values.
+  exploration = 1.4
+
+  # Initializes a MonteCarloTreeSearch object, playing "batch_size" playouts per iteration, on "workers" processes when there
+  # is more than one. "seed" makes the searches repeatable, for a given number of iterations.
+  def __init__(self, batch_size=16, workers=1, seed=None):
+    self.batch_size = batch_size
+    self.workers = workers
+    self.rng = random.Random(seed)
+    self.executor = None
+    self.root = None
+    self.root_moves = None
+    self.geometry_key = None
+    self.geometry = None
+    # Number of playouts made by the current search.
+    self.playouts = 0
+
+  # Shuts the process pool down, if one was started.
+  def close(self):
+    if self.executor is not None:
+      self.executor.shutdown()
+      self.executor = None
+
+  # Function that returns a new node for the position reached by a move on a column index from a node, and whether that
+  # move ended the game.
+  def get_child(self, node, column_index):
+    geometry = self.geometry
+    column_height = geometry["column_height"]
+    new_mask = node.mask | (node.mask + (1 << (column_index * column_height)))
+    cell = (new_mask ^ node.mask).bit_length() - 1
+    player_mask = node.current | (1 << cell)
+    if is_winning_cell(player_mask, cell, geometry["cell_lines"], geometry["alignment_shifts"]):
+      return Node(node, column_index, node.current ^ node.mask, new_mask, [], 1)
+    if new_mask.bit_count() == geometry["rows"] * geometry["columns"]:
+      return Node(node, column_index, node.current ^ node.mask, new_mask, [], 0.5)
+    return Node(node, column_index, node.current ^ node.mask, new_mask, self.get_legal_columns(new_mask))
+
+  # Function that returns the column indexes that still accept a move in a position, in a random order.
+  def get_legal_columns(self, mask):
+    geometry = self.geometry
+    top_cell = 1 << (geometry["rows"] - 1)
+    legal_columns = [
+      column_index for column_index in range(geometry["columns"])
+      if not mask & (top_cell << (column_index * geometry["column_height"]))
+    ]
+    self.rng.shuffle(legal_columns)
+    return legal_columns
+
+  # Sets the root of the tree to the position of a Board instance, where the game is not over. When the position follows the
+  # root of the previous search, its node is kept, with every playout made below it. Returns the number of playouts kept.
+  def set_root(self, board):
+    geometry_key = (board.rows, board.columns, board.connect)
+    moves = bytes(board.move_stack)
+    if self.root is not None and geometry_key == self.geometry_key and moves[:len(self.root_moves)] == self.root_moves:
+      node = self.root
+      for cell in moves[len(self.root_moves):]:
+        node = node.children.get(cell // board.column_height)
+        if node is None:
+          break
+      if node is not None and node.result is None:
+        node.parent = None
+        self.root = node
+        self.root_moves = moves
+        return node.visits
+    self.geometry_key = geometry_key
+    self.geometry = get_geometry(*geometry_key)
+    mask = board.masks[0] | board.masks[1]
+    self.root = Node(None, None, board.masks[len(moves) & 1], mask, self.get_legal_columns(mask))
+    self.root_moves = moves
+    return 0
+
+  # Function that goes down the tree from the root, adding a child to the first node with untried moves, and returns the
+  # node where the next batch of "count" playouts is made. Every node of the path counts those playouts as visits.
+  def select(self, count):
+    node = self.root
+    node.visits += count
+    exploration = MonteCarloTreeSearch.exploration
+    while node.result is None:
+      if node.untried_columns:
+        child = self.get_child(node, node.untried_columns.pop())
+        node.children[child.column_index] = child
+        node = child
+        node.visits += count
+        break
+      log_visits = math.log(node.visits)
+      best_value = -1.0
+      best_child = None
+      for child in node.children.values():
+        value = child.score / child.visits + exploration * math.sqrt(log_visits / child.visits)
+        if value > best_value:
+          best_value = value
+          best_child = child
+      node = best_child
+      node.visits += count
+    return node
+
+  # Adds the results of a batch of "count" playouts made from a node ("wins" and "ties" of the player holding the turn at that
+  # node) to the node and to every node above it.
+  def backpropagate(self, node, count, wins, ties):
+    # Seen from the player who moved into the node, a win of the player holding the turn is a loss.
+    score = count - wins - 0.5 * ties
+    while node is not None:
+      node.score += score
+      score = count - score
+      node = node.parent
+
+  # Function that returns the node of the next batch of playouts. When the game is over at that node, the result of the game
+  # is added at once, as the result of every playout of the batch, and None is returned.
+  def select_batch(self):
+    node = self.select(self.batch_size)
+    if node.result is None:
+      return node
+    self.backpropagate(node, self.batch_size, 0, self.batch_size if node.result == 0.5 else 0)
+    return None
+
+  # Runs one iteration, with its batch of playouts run on this process.
+  def run_iteration(self):
+    node = self.select_batch()
+    if node is not None:
+      wins, ties = run_playouts(self.geometry_key, node.current, node.mask, self.batch_size, self.rng.getrandbits(64))
+      self.backpropagate(node, self.batch_size, wins, ties)
+      self.playouts += self.batch_size
+
+  # Runs iterations until "is_over" returns True, with their batches of playouts run on the process pool, keeping one batch in
+  # flight per worker.
+  def run_parallel_iterations(self, is_over):
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    if self.executor is None:
+      self.executor = ProcessPoolExecutor(self.workers)
+    pending = {}
+    while True:
+      while len(pending) < self.workers and not (self.root.visits and is_over()):
+        node = self.select_batch()
+        if node is not None:
+          future = self.executor.submit(
+            run_playouts, self.geometry_key, node.current, node.mask, self.batch_size, self.rng.getrandbits(64)
+          )
+          pending[future] = node
+      if not pending:
+        return
+      for future in wait(pending, return_when=FIRST_COMPLETED)[0]:
+        wins, ties = future.result()
+        self.backpropagate(pending.pop(future), self.batch_size, wins, ties)
+        self.playouts += self.batch_size
+
+  # Function that returns a column index where the player holding the turn at a node wins at once, or None.
+  def get_winning_column(self, node):
+    geometry = self.geometry
+    for column_index in self.get_legal_columns(node.mask):
+      cell = (node.mask + (1 << (column_index * geometry["column_height"])) & ~node.mask).bit_length() - 1
+      if is_winning_cell(node.current | (1 << cell), cell, geometry["cell_lines"], geometry["alignment_shifts"]):
+        return column_index
+    return None
+
+  # Searches the best column of the position of a Board instance, where the game is not over, until the time budget (in
+  # seconds) runs out or "playout_limit" playouts are made. A move that wins at once is played without any search; otherwise,
+  # at least one iteration is always run. Positions where the game is over count as playouts for the limit.
+  # Returns a dictionary with the best column (0 for the leftmost column), the share of the playouts through it that it won
+  # (ties counting as half a win), the number of playouts made by this search and kept from the previous ones, the elapsed
+  # time and the number of playouts per second.
+  def search(self, board, time_budget=1.0, playout_limit=None):
+    start_time = time.perf_counter()
+    reused_playouts = self.set_root(board)
+    self.playouts = 0
+    winning_column = self.get_winning_column(self.root)
+    if winning_column is not None:
+      return {
+        "column": winning_column,
+        "win_rate": 1.0,
+        "playouts": 0,
+        "reused_playouts": reused_playouts,
+        "time": time.perf_counter() - start_time,
+        "playouts_per_second": 0.0,
+      }
+    deadline = start_time + time_budget if time_budget is not None else None
+    visit_limit = reused_playouts + playout_limit if playout_limit is not None else None
+
+    def is_over():
+      if visit_limit is not None and self.root.visits >= visit_limit:
+        return True
+      return deadline is not None and time.perf_counter() >= deadline
+
+    if self.workers > 1:
+      self.run_parallel_iterations(is_over)
+    else:
+      self.run_iteration()
+      while not is_over():
+        self.run_iteration()
+    elapsed_time = time.perf_counter() - start_time
+    # The move played is the most visited one.
+    best_child = max(self.root.children.values(), key=lambda child: child.visits)
+    return {
+      "column": best_child.column_index,
+      "win_rate": best_child.score / best_child.visits,
+      "playouts": self.playouts,
+      "reused_playouts": reused_playouts,
+      "time": elapsed_time,
+      "playouts_per_second": self.playouts / elapsed_time if elapsed_time > 0 else 0.0,
+    }
+
+
+# Class that represents a computer player choosing its moves with a Monte Carlo tree search, on boards of any geometry. It
+# takes turns like any other Player instance, and keeps its search tree from one of its moves to the next.
+class MCTSPlayer(Player):
+  __slots__ = ("time_budget", "playout_limit", "search", "last_search")
+  is_computer = True
+
+  # Instantiates a Monte Carlo tree search player object, with the symbol it plays with. Each move is searched for at most
+  # "time_budget" seconds and, optionally, at most "playout_limit" playouts, in batches of "batch_size" playouts run on
+  # "workers" processes.
+  def __init__(self, id_count, symbol, time_budget=1.0, playout_limit=None, batch_size=16, workers=1, seed=None):
+    Player.__init__(self, id_count, symbol)
+    self.time_budget = time_budget
+    self.playout_limit = playout_limit
+    self.search = MonteCarloTreeSearch(batch_size, workers, seed)
+    self.last_search = None
+
+  # Returns the c-column value of the move chosen for the current board, as a player would type it.
+  def get_move(self, board):
+    self.last_search = self.search.search(board, self.time_budget, self.playout_limit)
+    column_value = str(self.last_search["column"] + 1)
+    print(
+      "Player " + str(self.id) + " plays column " + column_value + " (" + str(self.last_search["playouts"]) + " playouts, " +
+      str(self.last_search["reused_playouts"]) + " kept from the previous move, " +
+      format(self.last_search["playouts_per_second"], ".0f") + " playouts/s)."
+    )
+    return column_value
+
+
+# Command line interface: plays games between a Monte Carlo tree search player and a simulator policy, on a board of any
+# geometry, each side playing both colors, and reports the points of the tree search (1 per win, 0.5 per tie) and its speed.
+def main(arguments=None):
+  import argparse
+  import contextlib
+  import io
+  import simulator
+  parser = argparse.ArgumentParser(description="Play Monte Carlo tree search games against a simulator policy.")
+  parser.add_argument("--rows", type=int, default=6, help="number of rows of the board")
+  parser.add_argument("--columns", type=int, default=7, help="number of columns of the board")
+  parser.add_argument("--connect", type=int, default=4, help="number of symbols to align")
+  parser.add_argument("--games", type=int, default=4, help="number of games (half of them with each color)")
+  parser.add_argument("--budget", type=float, default=0.2, help="time budget per move, in seconds")
+  parser.add_argument("--batch", type=int, default=16, help="number of playouts per batch")
+  parser.add_argument("--workers", type=int, default=1, help="number of processes running the playouts")
+  parser.add_argument("--opponent", default="greedy", choices=sorted(simulator.policies), help="policy of the opponent")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the games")
+  options = parser.parse_args(arguments)
+
+  br(options.rows, options.columns, options.connect)
+  opponent = simulator.get_policy(options.opponent)
+  rng = random.Random(options.seed)
+  points = 0.0
+  playouts = 0
+  reused_playouts = 0
+  search_time = 0.0
+  for game_index in range(options.games):
+    player_index = game_index % 2
+    player = MCTSPlayer(player_index + 1, "X", options.budget, None, options.batch, options.workers, rng.getrandbits(64))
+    board = br(options.rows, options.columns, options.connect)
+    while True:
+      current_index = len(board.move_stack) & 1
+      if current_index == player_index:
+        # The move announcements of the player are not shown.
+        with contextlib.redirect_stdout(io.StringIO()):
+          column_value = int(player.get_move(board))
+        playouts += player.last_search["playouts"]
+        reused_playouts += player.last_search["reused_playouts"]
+        search_time += player.last_search["time"]
+      else:
+        column_value = opponent(board, current_index, rng)
+      cell = board.play_column(column_value)
+      if board.last_move_wins(cell):
+        points += 1 if current_index == player_index else 0
+        break
+      if board.check_ties():
+        points += 0.5
+        break
+    player.search.close()
+  print(
+    "Tree search on a " + str(options.rows) + "x" + str(options.columns) + " board (connect " + str(options.connect) + "): " +
+    str(points) + " points out of " + str(options.games) + " against the " + options.opponent + " policy, " +
+    format(playouts / search_time, ",.0f") + " playouts/s, " + str(reused_playouts) + " playouts kept between moves."
+  )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,162 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+
+from board import Board as br
+from search import Search
+
+# Opening book of Connect Four: a file with the best column and score of the positions of the first moves of a game.
+#
+# The book is built offline, by searching every position reachable within a given number of moves (plies). Positions are
+# identified by their canonical key (Board.get_canonical_key()), so a position and its mirror image share one record, and
+# the best column is stored as seen on the canonical side. The file is a 16-byte header followed by fixed-size records
+# sorted by key:
+#
+#   header: magic "C4BK", format version (2 bytes), record size (2 bytes), number of records (8 bytes)
+#   record: canonical key (8 bytes), score (2 bytes, signed), best column index (1 byte, 0 for the leftmost column), padding
+#
+# At runtime, the book is opened with mmap and searched with a binary search on the records, so opening it costs nothing
+# however large it is, and the pages read are shared by every process using the same book file.
+
+book_magic = b"C4BK"
+book_version = 1
+header_format = struct.Struct("<4sHHQ")
+record_format = struct.Struct("<QhBx")
+
+
+# Class that represents an opening book file, opened for lookups.
+class OpeningBook:
+
+  # Opens the opening book file at "path".
+  def __init__(self, path):
+    self.file = open(path, "rb")
+    self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, record_size, self.size = header_format.unpack_from(self.data, 0)
+    if magic != book_magic or version != book_version or record_size != record_format.size:
+      self.close()
+      raise ValueError(path + " is not an opening book file.")
+
+  # Closes the book file.
+  def close(self):
+    self.data.close()
+    self.file.close()
+
+  # Returns the (score, column index) record stored for a canonical key, or None if the key is not in the book.
+  def get_record(self, key):
+    low = 0
+    high = self.size
+    while low < high:
+      middle = (low + high) // 2
+      offset = header_format.size + middle * record_format.size
+      record_key = struct.unpack_from("<Q", self.data, offset)[0]
+      if record_key < key:
+        low = middle + 1
+      elif record_key > key:
+        high = middle
+      else:
+        return record_format.unpack_from(self.data, offset)[1:]
+    return None
+
+  # Returns the (c-column value, score) of the best move of the position of a Board instance, seen from the player holding
+  # the turn, or None if the position is not in the book.
+  def lookup(self, board):
+    record = self.get_record(board.get_canonical_key())
+    if record is None:
+      return None
+    score, column_index = record
+    if board.is_canonical_mirrored():
+      column_index = br.columns - 1 - column_index
+    return column_index + 1, score
+
+  # Returns the c-column value of the best move for the position of a Board instance, as a player would type it, or None if
+  # the position is not in the book.
+  def get_move(self, board):
+    book_move = self.lookup(board)
+    if book_move is None:
+      return None
+    return str(book_move[0])
+
+
+# Function that searches every position reachable from the current position of a board within "plies" moves, excluding
+# positions where the game is already over, and returns a dictionary from their canonical key to their (score, column index)
+# record. Each position is searched with the given node limit. The board is explored with play_column() and undo(), and is
+# left as it was found.
+def solve_positions(board, plies, node_limit, search, records=None, progress=None):
+  if records is None:
+    records = {}
+  key = board.get_canonical_key()
+  if key not in records:
+    current, mask = Search.get_position(board)
+    result = search.search(current, mask, node_limit=node_limit)
+    column_index = result["column"]
+    if board.is_canonical_mirrored():
+      column_index = br.columns - 1 - column_index
+    records[key] = (result["score"], column_index)
+    if progress is not None:
+      progress(len(records))
+  if plies > 0:
+    for column_value in board.legal_moves():
+      cell = board.play_column(column_value)
+      if not board.last_move_wins(cell) and not board.check_ties():
+        solve_positions(board, plies - 1, node_limit, search, records, progress)
+      board.undo()
+  return records
+
+
+# Writes a dictionary of records to an opening book file, sorted by key.
+def write_book(path, records):
+  with open(path, "wb") as book_file:
+    book_file.write(header_format.pack(book_magic, book_version, record_format.size, len(records)))
+    for key in sorted(records):
+      score, column_index = records[key]
+      book_file.write(record_format.pack(key, score, column_index))
+
+
+# Shows the number of positions searched so far while a book is being built.
+def print_progress(count):
+  if count % 100 == 0:
+    print("\r" + str(count) + " positions searched", end="", file=sys.stderr)
+
+
+# Command line interface to build an opening book, or to look a position up in one.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Build or query a Connect Four opening book.")
+  subparsers = parser.add_subparsers(dest="command", required=True)
+  build_parser = subparsers.add_parser("build", help="search the opening positions and write the book")
+  build_parser.add_argument("--plies", type=int, default=4, help="number of moves from the start of the game to cover")
+  build_parser.add_argument("--nodes", type=int, default=20000, help="node limit of the search of each position")
+  build_parser.add_argument("--output", default="opening_book.bin", help="path of the book file")
+  lookup_parser = subparsers.add_parser("lookup", help="print the book move of a position")
+  lookup_parser.add_argument("--book", default="opening_book.bin", help="path of the book file")
+  lookup_parser.add_argument("moves", nargs="?", default="", help='c-column values played since the start, for i.e.: "4453"')
+  options = parser.parse_args(arguments)
+
+  if options.command == "build":
+    start_time = time.perf_counter()
+    board = br()
+    records = solve_positions(board, options.plies, options.nodes, Search(), progress=print_progress)
+    write_book(options.output, records)
+    print(
+      "\rWrote " + str(len(records)) + " positions to " + options.output + " in " +
+      format(time.perf_counter() - start_time, ".1f") + "s.", file=sys.stderr
+    )
+  else:
+    board = br()
+    for column_value in options.moves:
+      try:
+        board.play_column(int(column_value))
+      except ValueError:
+        lookup_parser.error('"' + column_value + '" is not a legal c-column value in the position of the previous moves.')
+    book = OpeningBook(options.book)
+    book_move = book.lookup(board)
+    book.close()
+    if book_move is None:
+      print("Position not in the book.")
+    else:
+      print("Best column: " + str(book_move[0]) + " (score " + str(book_move[1]) + ").")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,319 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from board import Board as br
+from search import Search, SearchInterrupted
+from transposition_table import TranspositionTable
+
+# Parallel search of Connect Four positions, splitting the moves of the root position across the CPU cores.
+#
+# Every worker process runs the negamax search of the Search class on a subtree of the root position. The workers and the
+# main process share a single transposition table, kept in a multiprocessing.shared_memory block, so the positions searched
+# by one worker are reused by all the others. The same block holds the best score found so far at the root ("alpha"), which
+# the workers read when they start a subtree, and one flag per root column, set when that root column is refuted, so the
+# remaining subtrees of a refuted column are skipped. Only the main process writes the shared alpha and the flags.
+#
+# Each depth of the iterative deepening searches the first (best known) root column on its own, then every other root column
+# at the same time, with the alpha of the first one ("young brothers wait"). With a split depth of 2, the replies to each root
+# column are searched as separate subtrees, so more work is spread across the workers.
+#
+#   Shared memory block: transposition table (16 bytes per slot), alpha (signed 64-bit), one refuted flag byte per column
+
+
+# Function that returns the shared alpha (a memoryview of one signed 64-bit number) and the refuted flags (a memoryview of
+# one byte per column) kept after the transposition table in a shared memory buffer.
+def get_shared_bounds(buffer, table_size):
+  table_bytes = TranspositionTable.get_buffer_size(table_size)
+  alpha = memoryview(buffer)[table_bytes:table_bytes + 8].cast("q")
+  refuted = memoryview(buffer)[table_bytes + 8:table_bytes + 8 + br.columns]
+  return alpha, refuted
+
+
+# Search engine, shared bounds and shared memory block of a worker process, set by init_worker.
+worker_search = None
+worker_alpha = None
+worker_refuted = None
+worker_memory = None
+
+
+# Initializes a worker process: attaches it to the shared memory block and creates its Search object on the shared table.
+def init_worker(memory_name, table_size):
+  global worker_search, worker_alpha, worker_refuted, worker_memory
+  worker_memory = shared_memory.SharedMemory(name=memory_name)
+  worker_search = Search(table=TranspositionTable(table_size, worker_memory.buf))
+  worker_alpha, worker_refuted = get_shared_bounds(worker_memory.buf, table_size)
+
+
+# Searches a subtree of the root position in a worker process, and returns its score from the point of view of the root
+# player, along with the number of nodes searched. The subtree is one move below the root when "odd_ply" is true, and two
+# moves below it otherwise. The score is None when the root column of the subtree was refuted before the search started,
+# or when the search was interrupted by the deadline or the node limit, in which case "interrupted" is true.
+def search_subtree(current, mask, depth, odd_ply, root_column, generation, deadline, node_limit):
+  if worker_refuted[root_column]:
+    return None, 0, False
+  search = worker_search
+  search.table.generation = generation
+  search.nodes = 0
+  search.node_limit = node_limit
+  search.deadline = deadline
+  alpha = worker_alpha[0]
+  beta = Search.win_score
+  try:
+    if odd_ply:
+      score = -search.negamax(current, mask, depth, -beta, -alpha)
+    else:
+      score = search.negamax(current, mask, depth, alpha, beta)
+  except SearchInterrupted:
+    return None, search.nodes, True
+  return score, search.nodes, False
+
+
+# Class that represents a parallel search engine, with its pool of worker processes and its shared transposition table.
+class ParallelSearch:
+
+  # Initializes a ParallelSearch object with "workers" processes (one per CPU core, by default), a shared transposition
+  # table of "table_size" slots, and the number of moves below the root where the tree is split (1 or 2).
+  def __init__(self, workers=None, table_size=1 << 20, split_depth=1):
+    if split_depth not in (1, 2):
+      raise ValueError("The split depth must be 1 or 2.")
+    self.workers = workers or os.cpu_count() or 1
+    self.table_size = table_size
+    self.split_depth = split_depth
+    self.memory = shared_memory.SharedMemory(
+      create=True, size=TranspositionTable.get_buffer_size(table_size) + 8 + br.columns
+    )
+    self.table = TranspositionTable(table_size, self.memory.buf)
+    self.alpha, self.refuted = get_shared_bounds(self.memory.buf, table_size)
+    self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.memory.name, table_size))
+    self.nodes = 0
+
+  # Stops the worker processes and releases the shared memory block.
+  def close(self):
+    self.executor.shutdown()
+    # Every view of the block must be released before it is closed.
+    self.table = None
+    self.alpha.release()
+    self.refuted.release()
+    self.memory.close()
+    self.memory.unlink()
+
+  # Function that returns the subtrees searched for each root column at a given depth, as a list of (root column, known
+  # value, subtrees) tuples. Each subtree is a (current, mask, depth, odd ply, reply column) tuple. A root column whose value
+  # is known without any search (a full board, or an immediate win of the opponent) has no subtrees, and its (score, reply
+  # column) value instead of None.
+  def get_subtrees(self, current, mask, root_columns, depth):
+    opponent = current ^ mask
+    discs = mask.bit_count()
+    root_subtrees = []
+    for column_index in root_columns:
+      child_mask = mask | (mask + Search.bottom_cells[column_index])
+      if self.split_depth == 1 or depth < 2:
+        root_subtrees.append((column_index, None, [(opponent, child_mask, depth - 1, True, None)]))
+        continue
+      if discs + 1 == Search.total_cells:
+        root_subtrees.append((column_index, (0, None), []))
+        continue
+      replies = [reply for reply in Search.move_order if not child_mask & Search.top_cells[reply]]
+      winning_replies = [reply for reply in replies if Search.is_winning_move(opponent, child_mask, reply)]
+      if winning_replies:
+        root_subtrees.append((column_index, (-(Search.win_score - discs - 2), winning_replies[0]), []))
+        continue
+      grandchild = opponent ^ child_mask
+      root_subtrees.append((column_index, None, [
+        (grandchild, child_mask | (child_mask + Search.bottom_cells[reply]), depth - 2, False, reply) for reply in replies
+      ]))
+    return root_subtrees
+
+  # Searches every root column of a position to a given depth, and returns the best column, its score and the best reply
+  # to it (None when the tree is split one move below the root), or None if the search was interrupted.
+  def search_depth(self, current, mask, root_columns, depth, deadline, node_limit):
+    self.alpha[0] = -Search.win_score
+    for column_index in root_columns:
+      self.refuted[column_index] = 0
+    root_subtrees = self.get_subtrees(current, mask, root_columns, depth)
+    best = None
+    # The first root column is searched alone, so the other ones start with its score as their alpha.
+    for group in (root_subtrees[:1], root_subtrees[1:]):
+      pending = {}
+      values = {}
+      for column_index, known_value, subtrees in group:
+        values[column_index] = [known_value] if known_value is not None else []
+        for subtree_current, subtree_mask, subtree_depth, odd_ply, reply in subtrees:
+          future = self.executor.submit(
+            search_subtree, subtree_current, subtree_mask, subtree_depth, odd_ply, column_index, self.table.generation,
+            deadline, node_limit
+          )
+          pending[future] = (column_index, reply)
+      remaining = {column_index: 0 for column_index, known_value, subtrees in group}
+      for column_index, reply in pending.values():
+        remaining[column_index] += 1
+
+      finished_columns = [column_index for column_index in remaining if remaining[column_index] == 0]
+      while True:
+        for column_index in finished_columns:
+          # A root column is worth the lowest score of its replies.
+          if not self.refuted[column_index] and values[column_index]:
+            score, reply = min(values[column_index], key=lambda value: value[0])
+            if best is None or score > best[1]:
+              best = (column_index, score, reply)
+              self.alpha[0] = score
+        if not pending:
+          break
+        done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+        finished_columns = []
+        for future in done:
+          column_index, reply = pending.pop(future)
+          score, nodes, interrupted = future.result()
+          self.nodes += nodes
+          if interrupted:
+            # The depth can not be completed: the remaining subtrees are skipped.
+            for other_future in pending:
+              other_future.cancel()
+            for other_column in root_columns:
+              self.refuted[other_column] = 1
+            wait(pending)
+            for other_future in pending:
+              if not other_future.cancelled():
+                self.nodes += other_future.result()[1]
+            return None
+          if score is not None:
+            values[column_index].append((score, reply))
+            if best is not None and score <= best[1]:
+              self.refuted[column_index] = 1
+          remaining[column_index] -= 1
+          if remaining[column_index] == 0:
+            finished_columns.append(column_index)
+    return best
+
+  # Function that returns the principal variation of a searched position (its best column, followed by the best column of
+  # each following position stored in the shared transposition table), as a list of column indexes.
+  def get_principal_variation(self, current, mask, best_column, best_reply, depth):
+    variation = []
+    columns = [best_column] if best_reply is None else [best_column, best_reply]
+    while len(variation) < depth:
+      column_index = columns.pop(0) if columns else None
+      if column_index is None:
+        entry = self.table.get(Search.get_key(current, mask))
+        if entry is None or entry[3] is None:
+          break
+        column_index = entry[3]
+      if mask & Search.top_cells[column_index]:
+        break
+      variation.append(column_index)
+      if Search.is_winning_move(current, mask, column_index):
+        break
+      current, mask = current ^ mask, mask | (mask + Search.bottom_cells[column_index])
+    return variation
+
+  # Searches the best column of a position, with iterative deepening, like Search.search, but with the subtrees of each depth
+  # searched by the worker processes. The node limit applies to each subtree search.
+  # Returns a dictionary with the best column (0 for the leftmost column), its score, its principal variation, the depth of
+  # the last completed search, the number of nodes searched, the elapsed time and the number of nodes searched per second.
+  def search(self, current, mask, time_budget=None, node_limit=None, max_depth=None):
+    start_time = time.perf_counter()
+    self.nodes = 0
+    self.table.new_search()
+
+    root_columns = [column_index for column_index in Search.move_order if not mask & Search.top_cells[column_index]]
+    winning_columns = [column_index for column_index in root_columns if Search.is_winning_move(current, mask, column_index)]
+    empty_cells = Search.total_cells - mask.bit_count()
+    if max_depth is None or max_depth > empty_cells:
+      max_depth = empty_cells
+    best_column = winning_columns[0] if winning_columns else None
+    best_score = Search.win_score - mask.bit_count() - 1 if winning_columns else 0
+    best_reply = None
+    completed_depth = 1 if winning_columns else 0
+    deadline = None
+    limit = None
+    for depth in range(1, max_depth + 1 if not winning_columns else 1):
+      best = self.search_depth(current, mask, root_columns, depth, deadline, limit)
+      if best is None:
+        break
+      best_column, best_score, best_reply = best
+      completed_depth = depth
+      # The best column of this depth is searched first at the next one.
+      root_columns.remove(best_column)
+      root_columns.insert(0, best_column)
+      # Once the first depth is completed, the limits apply.
+      limit = node_limit
+      deadline = start_time + time_budget if time_budget is not None else None
+      if abs(best_score) >= Search.win_score - Search.total_cells:
+        break
+
+    elapsed_time = time.perf_counter() - start_time
+    return {
+      "column": best_column,
+      "score": best_score,
+      "principal_variation": self.get_principal_variation(current, mask, best_column, best_reply, completed_depth),
+      "depth": completed_depth,
+      "nodes": self.nodes,
+      "time": elapsed_time,
+      "nodes_per_second": self.nodes / elapsed_time if elapsed_time else 0.0,
+    }
+
+
+# Positions of the speedup benchmark (c-column values of the moves played from the empty board).
+benchmark_positions = (
+  "4453",
+  "44444",
+  "3452",
+  "443322",
+  "74375157",
+  "4366634457",
+)
+
+
+# Function that returns the "current" and "mask" bitboards of the position reached after a string of c-column values.
+def get_benchmark_position(moves):
+  board = br()
+  for column_value in moves:
+    board.play_column(int(column_value))
+  return Search.get_position(board)
+
+
+# Command line interface of the speedup benchmark: every benchmark position is searched to the same depth by the serial
+# Search class and by the parallel search, each starting from an empty table.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Measure the speedup of the parallel Connect Four search.")
+  parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+  parser.add_argument("--depth", type=int, default=12, help="depth of the search of each position")
+  parser.add_argument("--split-depth", type=int, default=1, choices=(1, 2), help="number of moves below the root split")
+  parser.add_argument("--table-size", type=int, default=1 << 20, help="number of slots of the transposition tables")
+  options = parser.parse_args(arguments)
+
+  parallel_search = ParallelSearch(options.workers, options.table_size, options.split_depth)
+  serial_time = 0.0
+  parallel_time = 0.0
+  agreements = 0
+  try:
+    for moves in benchmark_positions:
+      current, mask = get_benchmark_position(moves)
+      serial_result = Search(options.table_size).search(current, mask, max_depth=options.depth)
+      parallel_search.table.clear()
+      parallel_result = parallel_search.search(current, mask, max_depth=options.depth)
+      serial_time += serial_result["time"]
+      parallel_time += parallel_result["time"]
+      agreements += serial_result["score"] == parallel_result["score"]
+      print(
+        moves + ": serial " + format(serial_result["time"], ".2f") + "s (" + str(serial_result["nodes"]) + " nodes, score " +
+        str(serial_result["score"]) + "), parallel " + format(parallel_result["time"], ".2f") + "s (" +
+        str(parallel_result["nodes"]) + " nodes, score " + str(parallel_result["score"]) + "), principal variation " +
+        "".join(str(column_index + 1) for column_index in parallel_result["principal_variation"]) + "."
+      )
+  finally:
+    parallel_search.close()
+  print(
+    "Searched " + str(len(benchmark_positions)) + " positions to depth " + str(options.depth) + " with " +
+    str(options.workers) + " workers: serial " + format(serial_time, ".2f") + "s, parallel " + format(parallel_time, ".2f") +
+    "s, speedup " + format(serial_time / parallel_time if parallel_time else 0.0, ".2f") + "x, same score for " +
+    str(agreements) + " of " + str(len(benchmark_positions)) + " positions."
+  )
+  return 0 if agreements == len(benchmark_positions) else 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import time
+
+from board import Board as br
+
+# Game-tree node counter ("perft") of Connect Four, for benchmarks and as a checksum of the Board rules.
+#
+# Every legal move is played from a position, to a given depth, with play_column() and undo(). At each depth, the positions
+# reached are counted, along with the positions where the last move won the game (last_move_wins()) and the positions tied
+# (check_ties()): games are not played past a win or a tie, so those positions have no moves below them. Each depth also gets
+# a checksum, the sum of the Zobrist hashes of its positions (modulo 2 ** 64), which depends on every position reached and
+# not only on their number.
+#
+# The counts only depend on the rules, so any change of the Board class that gives other counts from the same position
+# changes the game; the time taken gives the speed of the Board functions of the game loop, in positions per second.
+#
+#   Positions of the standard board, from the empty board: 7, 49, 343, 2401, 16807, 117649, 823536 (13032 of them won), ...
+
+checksum_mask = (1 << 64) - 1
+
+
+# Adds the positions reached from the position of a board, to "depth" more moves, to the counts of each depth, as lists of
+# [positions, wins, ties, checksum]: "counts[0]" for the positions one move away, "counts[1]" for those two moves away, ...
+def count_positions(board, depth, counts, level=0):
+  level_counts = counts[level]
+  for column_value in board.legal_moves():
+    cell = board.play_column(column_value)
+    level_counts[0] += 1
+    level_counts[3] = (level_counts[3] + board.get_hash()) & checksum_mask
+    if board.last_move_wins(cell):
+      level_counts[1] += 1
+    elif board.check_ties():
+      level_counts[2] += 1
+    elif depth > 1:
+      count_positions(board, depth - 1, counts, level + 1)
+    board.undo()
+
+
+# Function that counts the positions reached from the position of a board, where the game is not over, for each depth from
+# 1 to "depth", in a single walk of the game tree, and returns a dictionary with a list of the counts of each depth (as
+# dictionaries with the depth, positions, wins, ties and checksum), the total number of positions reached, the elapsed time
+# and the number of positions reached per second. The board is left as it was.
+def perft(board, depth):
+  counts = [[0, 0, 0, 0] for level in range(depth)]
+  start_time = time.perf_counter()
+  count_positions(board, depth, counts)
+  elapsed_time = time.perf_counter() - start_time
+  total_positions = sum(level_counts[0] for level_counts in counts)
+  return {
+    "depths": [
+      {"depth": level + 1, "positions": positions, "wins": wins, "ties": ties, "checksum": checksum}
+      for level, (positions, wins, ties, checksum) in enumerate(counts)
+    ],
+    "positions": total_positions,
+    "time": elapsed_time,
+    "positions_per_second": total_positions / elapsed_time if elapsed_time > 0 else 0.0,
+  }
+
+
+# Command line interface: prints the counts of each depth, from the empty board or from the position after a list of moves,
+# and the number of positions reached per second.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Count the Connect Four positions reached at each depth from a position.")
+  parser.add_argument("--depth", type=int, default=6, help="number of moves played from the position")
+  parser.add_argument("--rows", type=int, default=6, help="number of rows of the board")
+  parser.add_argument("--columns", type=int, default=7, help="number of columns of the board")
+  parser.add_argument("--connect", type=int, default=4, help="number of symbols to align")
+  parser.add_argument("moves", nargs="?", default="", help='c-column values played since the start, for i.e.: "4453"')
+  options = parser.parse_args(arguments)
+
+  board = br(options.rows, options.columns, options.connect)
+  # Boards of 10 or more columns separate the c-column values with spaces.
+  column_values = options.moves.split() if options.columns >= 10 else list(options.moves)
+  for column_value in column_values:
+    try:
+      cell = board.play_column(int(column_value))
+    except ValueError:
+      parser.error('"' + column_value + '" is not a legal c-column value in the position of the previous moves.')
+    if board.last_move_wins(cell) or board.check_ties():
+      print("The game is over.")
+      return
+  result = perft(board, options.depth)
+  print(format("depth", ">5") + format("positions", ">14") + format("wins", ">12") + format("ties", ">10") + format("checksum", ">18"))
+  for depth_counts in result["depths"]:
+    print(
+      format(depth_counts["depth"], ">5") + format(depth_counts["positions"], ">14,") + format(depth_counts["wins"], ">12,") +
+      format(depth_counts["ties"], ">10,") + format(depth_counts["checksum"], ">18x")
+    )
+  print(
+    format(result["positions"], ",") + " positions in " + format(result["time"], ".2f") + "s (" +
+    format(result["positions_per_second"], ",.0f") + " positions/s)."
+  )
+
+
+if __name__ == "__main__":
+  main()
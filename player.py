@@ -1,14 +1,17 @@
 # Class that represents a player in a Connect Four game.
 class Player:
+  # Every Player instance only holds these attributes, with no per-instance dictionary.
+  __slots__ = ("id", "symbol", "moves")
+  # Computer players (AIPlayer and MCTSPlayer) set it to True, so the game plays the opening book moves for them.
+  is_computer = False
 
-  # Instantiates a player object.
-  def __init__(self, id_count):
+  # Instantiates a player object, with the symbol it plays with.
+  def __init__(self, id_count, symbol):
     self.id = id_count
-    self.symbol = input("Player " + str(self.id) + " choose your symbol.\n")
-    if self.symbol == "exit":
-      raise TypeError("Program stopped.")
-      # For convenience purposes, the moves of each of the players will be stored separately.
-    self.moves = []
+    self.symbol = symbol
+    # For convenience purposes, the moves of each of the players will be stored separately, as the cell indexes of the
+    # board (from 0 to 47), one byte per move.
+    self.moves = bytearray()
 
   # Returns the id of a player instance.
   def get_player_id(self):
@@ -18,11 +21,15 @@ class Player:
   def get_player_symbol(self):
     return self.symbol
 
-  # Returns a list containing the history of a player's moves, for a particular Board instance.
+  # Returns the history of a player's moves, for a particular Board instance, as a bytearray of cell indexes. It can be
+  # given as is to the Board checks.
   def get_player_moves(self):
     return self.moves
 
-  # Adds a valid move to the list containing the history of a player's moves, for a particular Board instance.
-  def add_valid_move(self, valid_move):
-    valid_coordinates = "(" + valid_move[1] + ", " + valid_move[4] + ")"
-    self.moves.append(valid_coordinates)
+  # Asks the player for the c-column value of his next move, for the given Board instance.
+  def get_move(self, board):
+    return input("Player " + str(self.id) + " make your move.\n")
+
+  # Adds the cell index of a valid move to the history of a player's moves, for a particular Board instance.
+  def add_valid_move(self, cell):
+    self.moves.append(cell)
@@ -0,0 +1,147 @@
+import sys
+import time
+
+from board import Board as br
+
+# Terminal renderer of Connect Four boards, for games, spectator feeds and replays of long game streams.
+#
+# A full frame is the same text as "Board.__repr__", but it is built from a template of the whole board, prepared once per
+# board geometry, filled with the symbols of every cell in a single "format" call. Three modes are available:
+#
+#   full   every frame is the whole board
+#   diff   the first frame clears the terminal and draws the whole board at its top; each following frame only moves the
+#          cursor to the cells that changed since the previous frame (with ANSI escape sequences) and writes their symbols
+#   none   nothing is written, for headless runs
+#
+# The diff mode draws the whole board again whenever a symbol is not a single character, since cells would then not keep
+# their place on the screen.
+
+modes = ("full", "diff", "none")
+
+
+# Class that represents a renderer writing boards to a text stream, in one of the modes.
+class Renderer:
+
+  # Initializes a Renderer object, writing to "stream" (the standard output, by default) in the given mode.
+  def __init__(self, mode="full", stream=None):
+    if mode not in modes:
+      raise ValueError("Unknown render mode " + repr(mode) + ". Available modes: " + ", ".join(modes) + ".")
+    self.mode = mode
+    self.stream = stream
+    # Template and cell indexes (in the order of the template fields) of each board geometry.
+    self.templates = {}
+    # Masks, symbols and geometry of the last frame drawn in diff mode (None before the first one).
+    self.last_frame = None
+
+  # Function that returns the template of the boards of a geometry, with one "{}" field per cell, and the cell indexes of
+  # those fields, from the top row to the bottom row and from left to right.
+  def get_template(self, board):
+    geometry = (board.rows, board.columns)
+    template = self.templates.get(geometry)
+    if template is None:
+      row_template = "| " + "[{}] " * board.columns + "|"
+      cells = [board.get_cell_index(i, j) for i in range(1, board.rows + 1) for j in range(1, board.columns + 1)]
+      template = self.templates[geometry] = ("\n".join([row_template] * board.rows), cells)
+    return template
+
+  # Function that returns the whole board as text, as returned by "Board.__repr__".
+  def render(self, board):
+    template, cells = self.get_template(board)
+    first_mask, second_mask = board.masks
+    symbols = board.symbols + [" ", " "]
+    first_symbol, second_symbol = symbols[0], symbols[1]
+    return template.format(*[
+      first_symbol if first_mask >> cell & 1 else second_symbol if second_mask >> cell & 1 else " " for cell in cells
+    ])
+
+  # Function that returns the ANSI escape sequences that update the cells changed since the previous frame, followed by a
+  # move of the cursor to the line below the board.
+  def render_diff(self, board):
+    first_mask, second_mask = board.masks
+    last_first_mask, last_second_mask = self.last_frame[0], self.last_frame[1]
+    changed_cells = (first_mask ^ last_first_mask) | (second_mask ^ last_second_mask)
+    updates = []
+    while changed_cells:
+      cell_bit = changed_cells & -changed_cells
+      changed_cells ^= cell_bit
+      cell = cell_bit.bit_length() - 1
+      row_value, column_value = board.get_cell_coordinates(cell)
+      symbol = board.symbols[0] if first_mask & cell_bit else board.symbols[1] if second_mask & cell_bit else " "
+      updates.append("\x1b[" + str(row_value) + ";" + str(4 * column_value) + "H" + symbol)
+    updates.append("\x1b[" + str(board.rows + 1) + ";1H\x1b[J")
+    return "".join(updates)
+
+  # Writes a frame of the board to the stream, according to the mode of the renderer.
+  def draw(self, board):
+    if self.mode == "none":
+      return
+    stream = self.stream if self.stream is not None else sys.stdout
+    if self.mode == "full":
+      stream.write(self.render(board) + "\n")
+      return
+    symbols = tuple(board.symbols)
+    geometry = (board.rows, board.columns)
+    if self.last_frame is None or self.last_frame[2] != symbols[:len(self.last_frame[2])] or \
+        self.last_frame[3] != geometry or any(len(symbol) != 1 for symbol in symbols):
+      stream.write("\x1b[2J\x1b[H" + self.render(board) + "\n")
+    else:
+      stream.write(self.render_diff(board))
+    stream.flush()
+    self.last_frame = (board.masks[0], board.masks[1], symbols, geometry)
+
+
+# Function that returns the boards of a replay stream: the board after every move of "games" simulated games, as a list of
+# (game index, column value) moves, to be played on a new board at the start of each game.
+def get_replay_stream(games, seed):
+  import simulator
+  moves = []
+  for result in simulator.simulate(games, "greedy", "greedy", seed):
+    moves.extend((result["game"], int(column_value)) for column_value in result["moves"])
+  return moves
+
+
+# Replays a stream of moves, drawing the board after every move with a given function, and returns the elapsed time.
+def replay(moves, draw):
+  board = None
+  current_game = None
+  start_time = time.perf_counter()
+  for game_index, column_value in moves:
+    if game_index != current_game:
+      board = br()
+      board.get_player_index("X")
+      board.get_player_index("O")
+      current_game = game_index
+    board.play_column(column_value)
+    draw(board)
+  return time.perf_counter() - start_time
+
+
+# Command line interface of the renderer benchmark: replays simulated games, drawing the board after every move with
+# "Board.__repr__" and with each mode of the renderer, to an in-memory stream, and reports the moves replayed per second.
+def main(arguments=None):
+  import argparse
+  import io
+  parser = argparse.ArgumentParser(description="Measure the speed of the Connect Four board renderer on replayed games.")
+  parser.add_argument("--games", type=int, default=1000, help="number of simulated games replayed")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the simulated games")
+  options = parser.parse_args(arguments)
+
+  moves = get_replay_stream(options.games, options.seed)
+  stream = io.StringIO()
+  drawers = [("Board.__repr__", lambda board: stream.write(repr(board) + "\n"))]
+  for mode in modes:
+    drawers.append(("Renderer " + mode, Renderer(mode, stream).draw))
+  results = []
+  for name, draw in drawers:
+    stream.seek(0)
+    stream.truncate()
+    results.append((name, replay(moves, draw), stream.tell()))
+  for name, replay_time, written in results:
+    print(
+      name + ": " + format(len(moves) / replay_time, ",.0f") + " moves/s, " + format(written / len(moves), ".1f") +
+      " characters/move, " + format(results[0][1] / replay_time, ".1f") + "x the speed of Board.__repr__."
+    )
+
+
+if __name__ == "__main__":
+  main()
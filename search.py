@@ -0,0 +1,281 @@
+import time
+
+from board import Board as br
+from transposition_table import TranspositionTable
+
+# Negamax search of Connect Four positions, with alpha-beta pruning, center-first move ordering, iterative deepening and a
+# transposition table.
+#
+# The search works directly on two bitboard masks, using the same layout as the Board class: "current", with the cells of
+# the player holding the turn, and "mask", with every filled cell. Playing a column only takes a couple of integer
+# operations, so the search never copies or modifies a Board instance. The key of a position (current + mask + bottom row)
+# is unique for each position, so it is used as the transposition table key.
+#
+# Scores are seen from the player holding the turn: a win is scored "win_score" minus the number of discs on the board
+# when the game is won (quicker wins are better), a loss is the symmetric value, and positions whose outcome is beyond the
+# search depth are scored 0.
+
+
+# Exception raised inside the search when its time budget or node limit runs out.
+class SearchInterrupted(Exception):
+  pass
+
+
+# Class that represents a search engine, keeping its transposition table between searches.
+class Search:
+  win_score = 1000
+
+  # Bitboard masks of the bottom cell, top cell and all cells of each column, and of the bottom row of the board.
+  bottom_cells = [1 << (column_index * br.column_height) for column_index in range(br.columns)]
+  top_cells = [1 << (column_index * br.column_height + br.rows - 1) for column_index in range(br.columns)]
+  column_cells = [((1 << br.rows) - 1) << (column_index * br.column_height) for column_index in range(br.columns)]
+  bottom_row = sum(bottom_cells)
+  column_key_mask = (1 << br.column_height) - 1
+  total_cells = br.rows * br.columns
+
+  # Column indexes (0 for the leftmost column), ordered from the center of the board to its edges. Central columns take
+  # part in more alignments, so they are tried first and produce alpha-beta cutoffs sooner.
+  move_order = sorted(range(br.columns), key=lambda column_index: abs(2 * column_index - br.columns + 1))
+
+  # Initializes a Search object with a transposition table of "table_size" slots, or with a given TranspositionTable object.
+  # The table of "table_size" slots is only allocated when it is first used (by the first search), so creating a Search object
+  # (for i.e.: along with a computer player that may never play) costs nothing.
+  # When a "cache" (EvaluationCache instance) is given, the results of the searches are kept in it, and reused by any later
+  # search of the same position, or of its mirror image, that does not need a deeper search. When an "evaluator"
+  # (ThreatEvaluator instance) is given, it follows every move of the search, and scores the positions that are not searched
+  # any deeper; the keys of the cache then include the key of the evaluator, so the searches with and without an evaluator
+  # (or with evaluators of other weights) sharing a cache never use each other's scores.
+  def __init__(self, table_size=1 << 20, table=None, cache=None, evaluator=None):
+    if table is not None:
+      self.table = table
+    self.table_size = table_size
+    self.cache = cache
+    self.evaluator = evaluator
+    self.cache_key = evaluator.get_cache_key() if evaluator is not None else 0
+    self.nodes = 0
+    self.node_limit = None
+    self.deadline = None
+
+  # Allocates the transposition table on its first use. Attributes that are already set are never looked up here, so the
+  # searches access the table without any extra cost.
+  def __getattr__(self, name):
+    if name != "table":
+      raise AttributeError("'Search' object has no attribute '" + name + "'")
+    self.table = TranspositionTable(self.table_size)
+    return self.table
+
+  # Function that returns the "current" and "mask" bitboards of a Board instance, for the player holding the turn.
+  @staticmethod
+  def get_position(board):
+    mask = board.masks[0] | board.masks[1]
+    return board.masks[mask.bit_count() % 2], mask
+
+  # Function that returns the unique key of a position.
+  @staticmethod
+  def get_key(current, mask):
+    return current + mask + Search.bottom_row
+
+  # Function that returns the canonical key of a position: the lowest of its key and of the key of its left-right mirror
+  # image, along with True when it is the key of the mirror image.
+  @staticmethod
+  def get_canonical_key(current, mask):
+    key = Search.get_key(current, mask)
+    mirror_key = 0
+    for column_index in range(br.columns):
+      column_key = key >> (column_index * br.column_height) & Search.column_key_mask
+      mirror_key |= column_key << ((br.columns - 1 - column_index) * br.column_height)
+    return (key, False) if key <= mirror_key else (mirror_key, True)
+
+  # Function that verifies if the player holding the turn wins the game by playing a given column.
+  @staticmethod
+  def is_winning_move(current, mask, column_index):
+    new_current = current | ((mask + Search.bottom_cells[column_index]) & Search.column_cells[column_index])
+    return br.has_alignment(new_current)
+
+  # Score of a position that is not searched any deeper. Without an evaluator, every such position is even.
+  def evaluate(self, current, mask):
+    if self.evaluator is None:
+      return 0
+    return self.evaluator.evaluate(mask.bit_count() & 1)
+
+  # Negamax search of a position up to a given depth, returning its score within the (alpha, beta) window.
+  def negamax(self, current, mask, depth, alpha, beta):
+    self.nodes += 1
+    if (self.nodes & 1023) == 0:
+      self.check_limits()
+
+    discs = mask.bit_count()
+    if discs == Search.total_cells:
+      return 0
+    legal_columns = [column_index for column_index in Search.move_order if not mask & Search.top_cells[column_index]]
+
+    # A player who can complete an alignment does so immediately.
+    for column_index in legal_columns:
+      if Search.is_winning_move(current, mask, column_index):
+        return Search.win_score - discs - 1
+    if depth == 0:
+      return self.evaluate(current, mask)
+
+    # The opponent can not win sooner than with his next move.
+    max_score = Search.win_score - discs - 2
+    if beta > max_score:
+      beta = max_score
+      if alpha >= beta:
+        return beta
+
+    key = Search.get_key(current, mask)
+    original_alpha = alpha
+    best_column = None
+    entry = self.table.get(key)
+    if entry is not None:
+      entry_depth, entry_score, bound_type, best_column = entry
+      if entry_depth >= depth:
+        if bound_type == TranspositionTable.exact:
+          return entry_score
+        if bound_type == TranspositionTable.lower_bound and entry_score > alpha:
+          alpha = entry_score
+        elif bound_type == TranspositionTable.upper_bound and entry_score < beta:
+          beta = entry_score
+        if alpha >= beta:
+          return entry_score
+      # The best column of a previous search of the same position is tried first.
+      if best_column in legal_columns:
+        legal_columns.remove(best_column)
+        legal_columns.insert(0, best_column)
+
+    best_score = -Search.win_score
+    opponent = current ^ mask
+    evaluator = self.evaluator
+    for column_index in legal_columns:
+      if evaluator is None:
+        score = -self.negamax(opponent, mask | (mask + Search.bottom_cells[column_index]), depth - 1, -beta, -alpha)
+      else:
+        cell = ((mask + Search.bottom_cells[column_index]) & Search.column_cells[column_index]).bit_length() - 1
+        evaluator.play(cell, discs & 1)
+        score = -self.negamax(opponent, mask | (mask + Search.bottom_cells[column_index]), depth - 1, -beta, -alpha)
+        evaluator.undo(cell, discs & 1)
+      if score > best_score:
+        best_score = score
+        best_column = column_index
+        if score > alpha:
+          alpha = score
+          if alpha >= beta:
+            break
+
+    if best_score <= original_alpha:
+      bound_type = TranspositionTable.upper_bound
+    elif best_score >= beta:
+      bound_type = TranspositionTable.lower_bound
+    else:
+      bound_type = TranspositionTable.exact
+    self.table.store(key, depth, best_score, bound_type, best_column)
+    return best_score
+
+  # Raises SearchInterrupted when the time budget or the node limit of the current search runs out.
+  def check_limits(self):
+    if self.node_limit is not None and self.nodes >= self.node_limit:
+      raise SearchInterrupted()
+    if self.deadline is not None and time.perf_counter() >= self.deadline:
+      raise SearchInterrupted()
+
+  # Searches the best column of a position, with iterative deepening: the position is searched to depth 1, 2, 3, ... until
+  # the outcome of the game is proven, the maximum depth is reached or the time budget (in seconds) or the node limit runs
+  # out. The search to depth 1 is always completed, so a legal column is always returned.
+  # Returns a dictionary with the best column (0 for the leftmost column), its score, the depth of the last completed
+  # search, the number of nodes searched, the elapsed time, the number of nodes searched per second, and whether the result
+  # comes from the evaluation cache. A cached result is used when its outcome is proven or when it was searched at least as
+  # deep as "max_depth".
+  def search(self, current, mask, time_budget=None, node_limit=None, max_depth=None):
+    start_time = time.perf_counter()
+    self.nodes = 0
+    self.node_limit = None
+    self.deadline = None
+    self.table.new_search()
+
+    empty_cells = Search.total_cells - mask.bit_count()
+    if max_depth is None or max_depth > empty_cells:
+      max_depth = empty_cells
+    cached_evaluation = None
+    if self.cache is not None:
+      canonical_key, mirrored = Search.get_canonical_key(current, mask)
+      canonical_key ^= self.cache_key
+      cached_evaluation = self.cache.get(canonical_key)
+      if cached_evaluation is not None:
+        cached_depth, cached_score, cached_column = cached_evaluation
+        if (time_budget is None and node_limit is None and cached_depth >= max_depth) or \
+            abs(cached_score) >= Search.win_score - Search.total_cells:
+          elapsed_time = time.perf_counter() - start_time
+          return {
+            "column": br.columns - 1 - cached_column if mirrored else cached_column,
+            "score": cached_score,
+            "depth": cached_depth,
+            "nodes": 0,
+            "time": elapsed_time,
+            "nodes_per_second": 0.0,
+            "cached": True,
+          }
+    if self.evaluator is not None:
+      if mask.bit_count() & 1:
+        self.evaluator.set_position(current ^ mask, current)
+      else:
+        self.evaluator.set_position(current, current ^ mask)
+    best_column = None
+    best_score = 0
+    completed_depth = 0
+    for depth in range(1, max_depth + 1):
+      try:
+        column_index, score = self.search_root(current, mask, depth)
+      except SearchInterrupted:
+        break
+      best_column, best_score, completed_depth = column_index, score, depth
+      # Once the first depth is completed, the limits apply.
+      self.node_limit = node_limit
+      self.deadline = start_time + time_budget if time_budget is not None else None
+      if abs(score) >= Search.win_score - Search.total_cells:
+        break
+
+    # The cache keeps the deepest result of each position, with its column as seen on the canonical side.
+    if self.cache is not None and (cached_evaluation is None or completed_depth > cached_evaluation[0]):
+      self.cache.put(canonical_key, (completed_depth, best_score, br.columns - 1 - best_column if mirrored else best_column))
+    elapsed_time = time.perf_counter() - start_time
+    return {
+      "column": best_column,
+      "score": best_score,
+      "depth": completed_depth,
+      "nodes": self.nodes,
+      "time": elapsed_time,
+      "nodes_per_second": self.nodes / elapsed_time if elapsed_time else 0.0,
+      "cached": False,
+    }
+
+  # Searches every legal column of the root position to a given depth and returns the best column and its score.
+  def search_root(self, current, mask, depth):
+    legal_columns = [column_index for column_index in Search.move_order if not mask & Search.top_cells[column_index]]
+    for column_index in legal_columns:
+      if Search.is_winning_move(current, mask, column_index):
+        return column_index, Search.win_score - mask.bit_count() - 1
+    entry = self.table.get(Search.get_key(current, mask))
+    if entry is not None and entry[3] in legal_columns:
+      legal_columns.remove(entry[3])
+      legal_columns.insert(0, entry[3])
+
+    alpha = -Search.win_score
+    beta = Search.win_score
+    best_column = legal_columns[0]
+    opponent = current ^ mask
+    discs = mask.bit_count()
+    evaluator = self.evaluator
+    for column_index in legal_columns:
+      self.nodes += 1
+      if evaluator is None:
+        score = -self.negamax(opponent, mask | (mask + Search.bottom_cells[column_index]), depth - 1, -beta, -alpha)
+      else:
+        cell = ((mask + Search.bottom_cells[column_index]) & Search.column_cells[column_index]).bit_length() - 1
+        evaluator.play(cell, discs & 1)
+        score = -self.negamax(opponent, mask | (mask + Search.bottom_cells[column_index]), depth - 1, -beta, -alpha)
+        evaluator.undo(cell, discs & 1)
+      if score > alpha:
+        alpha = score
+        best_column = column_index
+    self.table.store(Search.get_key(current, mask), depth, alpha, TranspositionTable.exact, best_column)
+    return best_column, alpha
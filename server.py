@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import itertools
+import time
+
+from board import Board as br
+
+# Connect Four game server, hosting many games at once in a single process, using asyncio and TCP connections.
+#
+# Every game has its own Board instance and players, kept in a Game object owned by the server, so any number of games can
+# be played side by side. Clients send one command per line and receive one message per line:
+#
+#   Commands (client to server):
+#     NEW           creates a game and joins it as player 1; player 2 joins it with JOIN
+#     NEW SOLO      creates a game where the client plays the moves of both players
+#     JOIN <id>     joins an existing game as player 2
+#     MOVE <c>      plays the c-column value (1 to 7) for the player holding the turn
+#     BOARD         requests the current board
+#     QUIT          leaves the game and closes the connection
+#
+#   Messages (server to client):
+#     GAME <id> <p>      the client plays as player p (1 or 2; 0 for solo games) in game <id>
+#     START              both players have joined the game (sent to both players)
+#     MOVED <p> <c>      player p played the c-column value (sent to both players)
+#     WIN <p> / TIE      the game is over (sent to both players)
+#     BOARD <rows>       the board, row by row from the top, separated by "/": "." for empty, "1" or "2" for the players
+#     LEFT               the opponent left the game, which is over
+#     EVICTED            the game was closed after being idle for too long
+#     BYE                answer to QUIT
+#     ERR <message>      the command was rejected
+#
+# Games where nothing happens for "idle_timeout" seconds are evicted, so abandoned games do not pile up on the server.
+
+
+# Maximum number of digits of a game id sent by a client; longer ids cannot match any game.
+max_game_id_digits = 18
+
+
+# Function that returns the number given as the only argument of a command, or None if there is not exactly one argument or
+# if it is not a number of at most "max_digits" digits. The length is verified before the conversion, since int() rejects
+# numbers of more than 4300 digits with a ValueError. isdecimal() only accepts the digits that int() can read: isdigit()
+# would also accept superscripts such as "²".
+def get_number(arguments, max_digits):
+  if len(arguments) != 1 or not arguments[0].isdecimal() or len(arguments[0]) > max_digits:
+    return None
+  return int(arguments[0])
+
+
+# Class that represents a game hosted by the server.
+class Game:
+  # Slots keep the per-game memory low when many games are hosted.
+  __slots__ = ("id", "board", "connections", "solo", "finished", "last_activity")
+
+  # Initializes a Game object.
+  def __init__(self, game_id, solo):
+    self.id = game_id
+    self.board = br()
+    self.connections = [None, None]
+    self.solo = solo
+    self.finished = False
+    self.last_activity = time.monotonic()
+
+  # Sends a message to every player of the game.
+  def broadcast(self, message):
+    for connection in set(self.connections):
+      if connection is not None:
+        connection.send(message)
+
+  # Function that returns the board as sent in a BOARD message.
+  def get_board_message(self):
+    rows = []
+    for row_value in range(1, br.rows + 1):
+      row = ""
+      for column_value in range(1, br.columns + 1):
+        cell = self.board.get_cell_index(row_value, column_value)
+        if self.board.masks[0] >> cell & 1:
+          row += "1"
+        elif self.board.masks[1] >> cell & 1:
+          row += "2"
+        else:
+          row += "."
+      rows.append(row)
+    return "BOARD " + "/".join(rows)
+
+
+# Class that represents a client connection, and the game it takes part in.
+class Connection:
+  __slots__ = ("writer", "game", "player_index")
+
+  # Initializes a Connection object.
+  def __init__(self, writer):
+    self.writer = writer
+    self.game = None
+    self.player_index = None
+
+  # Sends a message to the client.
+  def send(self, message):
+    if not self.writer.is_closing():
+      self.writer.write(message.encode() + b"\n")
+
+
+# Class that represents the game server.
+class GameServer:
+
+  # Initializes a GameServer object. Games idle for more than "idle_timeout" seconds are evicted, by a verification run
+  # every "eviction_interval" seconds.
+  def __init__(self, idle_timeout=300.0, eviction_interval=5.0):
+    self.games = {}
+    self.game_ids = itertools.count(1)
+    self.idle_timeout = idle_timeout
+    self.eviction_interval = eviction_interval
+    self.moves_played = 0
+    self.games_evicted = 0
+
+  # Handles a client connection, until the client closes it or sends QUIT.
+  async def handle_connection(self, reader, writer):
+    connection = Connection(writer)
+    try:
+      while True:
+        # A line longer than the stream limit is rejected, and so is a command that cannot be run, without closing the
+        # connection.
+        try:
+          line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+          connection.send("ERR line too long")
+          await writer.drain()
+          continue
+        if not line:
+          break
+        words = line.decode(errors="replace").split()
+        if not words:
+          continue
+        if words[0].upper() == "QUIT":
+          connection.send("BYE")
+          break
+        try:
+          self.handle_command(connection, words[0].upper(), words[1:])
+        except ValueError:
+          connection.send("ERR invalid command")
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+      pass
+    finally:
+      self.leave_game(connection)
+      writer.close()
+
+  # Runs a command of a client.
+  def handle_command(self, connection, command, arguments):
+    # A client whose game is over can start or join a new one.
+    if command in ("NEW", "JOIN") and connection.game is not None and connection.game.finished:
+      self.leave_game(connection)
+
+    if command == "NEW":
+      if connection.game is not None:
+        connection.send("ERR already in a game")
+        return
+      solo = len(arguments) == 1 and arguments[0].upper() == "SOLO"
+      game = Game(next(self.game_ids), solo)
+      self.games[game.id] = game
+      game.connections[0] = connection
+      if solo:
+        game.connections[1] = connection
+      connection.game = game
+      connection.player_index = 0
+      connection.send("GAME " + str(game.id) + " " + ("0" if solo else "1"))
+
+    elif command == "JOIN":
+      game_id = get_number(arguments, max_game_id_digits)
+      game = self.games.get(game_id) if game_id is not None else None
+      if connection.game is not None:
+        connection.send("ERR already in a game")
+      elif game is None or game.finished:
+        connection.send("ERR no such game")
+      elif game.connections[1] is not None:
+        connection.send("ERR game is full")
+      else:
+        game.connections[1] = connection
+        game.last_activity = time.monotonic()
+        connection.game = game
+        connection.player_index = 1
+        connection.send("GAME " + str(game.id) + " 2")
+        game.broadcast("START")
+
+    elif command == "MOVE":
+      self.play_move(connection, arguments)
+
+    elif command == "BOARD":
+      if connection.game is None:
+        connection.send("ERR not in a game")
+      else:
+        connection.send(connection.game.get_board_message())
+
+    else:
+      connection.send("ERR unknown command")
+
+  # Plays a move of a client in its game.
+  def play_move(self, connection, arguments):
+    game = connection.game
+    if game is None:
+      connection.send("ERR not in a game")
+      return
+    board = game.board
+    player_index = len(board.move_stack) & 1
+    if game.finished:
+      connection.send("ERR game is over")
+    elif game.connections[1] is None:
+      connection.send("ERR waiting for player 2")
+    elif not game.solo and connection.player_index != player_index:
+      connection.send("ERR not your turn")
+    elif not 1 <= (get_number(arguments, len(str(br.columns))) or 0) <= br.columns:
+      connection.send("ERR the column must be a number between 1 and " + str(br.columns))
+    elif not board.legal_columns_mask >> (int(arguments[0]) - 1) & 1:
+      connection.send("ERR the column is full")
+    else:
+      cell = board.play_column(int(arguments[0]))
+      game.last_activity = time.monotonic()
+      self.moves_played += 1
+      game.broadcast("MOVED " + str(player_index + 1) + " " + str(int(arguments[0])))
+      if board.last_move_wins(cell):
+        game.finished = True
+        game.broadcast("WIN " + str(player_index + 1))
+      elif board.check_ties():
+        game.finished = True
+        game.broadcast("TIE")
+
+  # Removes a connection from its game. The game is closed, and the opponent, if any, is told about it.
+  def leave_game(self, connection):
+    game = connection.game
+    if game is None:
+      return
+    connection.game = None
+    for player_index in range(2):
+      if game.connections[player_index] is connection:
+        game.connections[player_index] = None
+    opponent = game.connections[0] or game.connections[1]
+    if opponent is not None:
+      if not game.finished:
+        opponent.send("LEFT")
+      game.finished = True
+    else:
+      self.games.pop(game.id, None)
+
+  # Evicts every game idle for more than the idle timeout, telling its players and closing their connections.
+  def evict_idle_games(self):
+    oldest_activity = time.monotonic() - self.idle_timeout
+    idle_games = [game for game in self.games.values() if game.last_activity < oldest_activity]
+    for game in idle_games:
+      for connection in set(game.connections):
+        if connection is not None:
+          connection.send("EVICTED")
+          connection.game = None
+          connection.writer.close()
+      del self.games[game.id]
+    self.games_evicted += len(idle_games)
+
+  # Runs the eviction of idle games periodically.
+  async def run_eviction(self):
+    while True:
+      await asyncio.sleep(self.eviction_interval)
+      self.evict_idle_games()
+
+  # Starts the server on a given host and port, and serves clients until it is cancelled.
+  async def serve(self, host, port, backlog=4096):
+    server = await asyncio.start_server(self.handle_connection, host, port, backlog=backlog)
+    eviction_task = asyncio.create_task(self.run_eviction())
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      eviction_task.cancel()
+
+
+# Raises the limit of open files of the process to its maximum, since every client connection uses one.
+def raise_open_files_limit():
+  try:
+    import resource
+  except ImportError:
+    return
+  soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+  if soft_limit < hard_limit:
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+
+
+# Command line interface of the game server.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Host Connect Four games over TCP.")
+  parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+  parser.add_argument("--port", type=int, default=7744, help="port to listen on")
+  parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds after which an idle game is evicted")
+  options = parser.parse_args(arguments)
+  raise_open_files_limit()
+  game_server = GameServer(options.idle_timeout)
+  print("Serving Connect Four games on " + options.host + ":" + str(options.port) + ".")
+  try:
+    asyncio.run(game_server.serve(options.host, options.port))
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,188 @@
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board as br
+
+# Headless Connect Four simulator. Games are played between two move policies, with no terminal interaction, so that large
+# batches of self-play or regression games can be run across several processes.
+#
+# A policy is a function that receives a Board instance, the index of the player holding the turn (0 for player 1, 1 for
+# player 2) and a random.Random instance, and returns the c-column value (1 to 7) of its move. Policies can be given either as
+# one of the names in "policies" or as functions, as long as those functions can be pickled when more than one worker is used.
+
+# Symbols used for player 1 and player 2 in simulated games.
+player_symbols = ("X", "O")
+
+
+# Function that returns the c-column values that still accept a move.
+def get_legal_columns(board):
+  return board.legal_moves()
+
+
+# Function that verifies if a move of a player on a given c-column would complete an alignment.
+def is_winning_column(board, player_index, column_value):
+  return board.is_winning_cell(board.get_valid_move_cell(column_value), player_index)
+
+
+# Policy that plays a random legal column.
+def random_policy(board, player_index, rng):
+  return rng.choice(get_legal_columns(board))
+
+
+# Policy that plays the legal column closest to the center of the board, choosing randomly between equally close columns.
+def center_policy(board, player_index, rng):
+  legal_columns = get_legal_columns(board)
+  center_column = (board.columns + 1) // 2
+  closest_distance = min(abs(column_value - center_column) for column_value in legal_columns)
+  return rng.choice([column_value for column_value in legal_columns if abs(column_value - center_column) == closest_distance])
+
+
+# Policy that completes an alignment whenever it can, otherwise blocks an immediate alignment of the opponent, and otherwise
+# plays a random legal column.
+def greedy_policy(board, player_index, rng):
+  legal_columns = get_legal_columns(board)
+  for current_player_index in (player_index, 1 - player_index):
+    for column_value in legal_columns:
+      if is_winning_column(board, current_player_index, column_value):
+        return column_value
+  return rng.choice(legal_columns)
+
+
+policies = {
+  "random": random_policy,
+  "center": center_policy,
+  "greedy": greedy_policy,
+}
+
+
+# Function that returns a policy function, given either its name or the function itself.
+def get_policy(policy):
+  if callable(policy):
+    return policy
+  if policy not in policies:
+    raise ValueError("Unknown policy " + repr(policy) + ". Available policies: " + ", ".join(sorted(policies)) + ".")
+  return policies[policy]
+
+
+# Function that returns the name of a policy, given either its name or the function itself.
+def get_policy_name(policy):
+  return policy if isinstance(policy, str) else getattr(policy, "__name__", repr(policy))
+
+
+# Plays a full game between two policies and returns its result. Every game has its own random generator, derived from the
+# batch seed and the game index only, so a game has the same outcome no matter which process plays it. Games are played on a
+# board of the given (rows, columns, connect) geometry. A ValueError is raised if a policy plays a column that is not a legal
+# move.
+def play_game(game_index, policy_a, policy_b, seed, geometry=(6, 7, 4)):
+  rng = random.Random(str(seed) + ":" + str(game_index))
+  game_policies = (get_policy(policy_a), get_policy(policy_b))
+  board = br(*geometry)
+  player_indexes = [board.get_player_index(symbol) for symbol in player_symbols]
+  moves = []
+  winner = None
+  current_player = 0
+  while True:
+    column_value = game_policies[current_player](board, current_player, rng)
+    if column_value not in board.legal_moves():
+      raise ValueError(
+        "The policy " + get_policy_name((policy_a, policy_b)[current_player]) + " played the c-column value " +
+        repr(column_value) + ", which is not a legal move (" + ", ".join(map(str, board.legal_moves())) + ")."
+      )
+    cell = board.get_valid_move_cell(column_value)
+    board.register_cell(cell, player_indexes[current_player])
+    moves.append(column_value)
+    if board.last_move_wins(cell):
+      winner = current_player + 1
+      break
+    if board.check_ties():
+      break
+    current_player = 1 - current_player
+  return {
+    "game": game_index,
+    "winner": winner,
+    "result": "tie" if winner is None else "player_" + str(winner),
+    "plies": len(moves),
+    # Boards of 10 or more columns separate the c-column values with spaces.
+    "moves": ("" if board.columns < 10 else " ").join(str(column_value) for column_value in moves),
+  }
+
+
+# Plays a consecutive range of games. Games are handed to worker processes in ranges, to keep inter-process traffic low.
+def play_games(first_game, last_game, policy_a, policy_b, seed, geometry=(6, 7, 4)):
+  return [play_game(game_index, policy_a, policy_b, seed, geometry) for game_index in range(first_game, last_game)]
+
+
+# Simulates a batch of games between "policy_a" (player 1) and "policy_b" (player 2), yielding the result of each game, in
+# game order, as soon as it is available. With more than one worker, games are played on a process pool; the results are the
+# same for any number of workers, since they only depend on the seed. "geometry" gives the (rows, columns, connect) of the board.
+def simulate(games, policy_a, policy_b, seed, workers=1, chunk_size=64, geometry=(6, 7, 4)):
+  # Policies and the geometry are resolved here so that unknown names and invalid boards are reported before any game is played.
+  get_policy(policy_a)
+  get_policy(policy_b)
+  br(*geometry)
+  if workers <= 1:
+    for game_index in range(games):
+      yield play_game(game_index, policy_a, policy_b, seed, geometry)
+    return
+
+  chunk_starts = range(0, games, chunk_size)
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    chunk_results = executor.map(
+      play_games,
+      chunk_starts,
+      [min(chunk_start + chunk_size, games) for chunk_start in chunk_starts],
+      [policy_a] * len(chunk_starts),
+      [policy_b] * len(chunk_starts),
+      [seed] * len(chunk_starts),
+      [geometry] * len(chunk_starts),
+    )
+    for results in chunk_results:
+      yield from results
+
+
+# Command line interface: streams the result of every game as a JSON line and reports the simulation throughput.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Run headless Connect Four games between two move policies.")
+  parser.add_argument("--games", type=int, default=1000, help="number of games to simulate")
+  parser.add_argument("--policy-a", default="random", choices=sorted(policies), help="policy of player 1")
+  parser.add_argument("--policy-b", default="random", choices=sorted(policies), help="policy of player 2")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the batch")
+  parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+  parser.add_argument("--chunk-size", type=int, default=64, help="number of games handed to a worker at a time")
+  parser.add_argument("--output", help="JSON Lines file for the game results (standard output, by default)")
+  parser.add_argument("--rows", type=int, default=6, help="number of rows of the board")
+  parser.add_argument("--columns", type=int, default=7, help="number of columns of the board")
+  parser.add_argument("--connect", type=int, default=4, help="number of aligned symbols needed to win")
+  options = parser.parse_args(arguments)
+  geometry = (options.rows, options.columns, options.connect)
+
+  output = open(options.output, "w") if options.output else sys.stdout
+  outcomes = {"player_1": 0, "player_2": 0, "tie": 0}
+  start_time = time.perf_counter()
+  try:
+    results = simulate(
+      options.games, options.policy_a, options.policy_b, options.seed, options.workers, options.chunk_size, geometry
+    )
+    for result in results:
+      output.write(json.dumps(result) + "\n")
+      outcomes[result["result"]] += 1
+  finally:
+    if output is not sys.stdout:
+      output.close()
+  elapsed_time = time.perf_counter() - start_time
+
+  print(
+    "Simulated " + str(options.games) + " games in " + format(elapsed_time, ".2f") + "s (" +
+    format(options.games / elapsed_time if elapsed_time else 0, ".0f") + " games/s) with " + str(options.workers) +
+    " worker(s). Player 1 wins: " + str(outcomes["player_1"]) + ", player 2 wins: " + str(outcomes["player_2"]) +
+    ", ties: " + str(outcomes["tie"]) + ".",
+    file=sys.stderr,
+  )
+
+
+if __name__ == "__main__":
+  main()
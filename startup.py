@@ -0,0 +1,81 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Startup benchmark of the game modules, for short-lived worker processes.
+#
+# Each run starts a new Python process, which imports the game modules (connect_four, and the computer player with its
+# search), creates a board and a computer player, and plays the first move of the game with a fixed node limit. The process
+# reports the time taken by the imports and by the first move, and the whole run is timed from the start of the process to
+# its end, so interpreter startup is included. Since every run is a new process, nothing is ever imported or cached from a
+# previous run. The startup of an interpreter that does nothing is measured the same way, as a reference.
+
+# Code run by each worker process. It prints the import time and the first move time, in seconds, on its last line.
+worker_code = """
+import time
+start_time = time.perf_counter()
+import connect_four
+from ai_player import AIPlayer
+from board import Board
+import_time = time.perf_counter() - start_time
+start_time = time.perf_counter()
+AIPlayer(2, "O", None, {node_limit}).get_move(Board())
+print(import_time, time.perf_counter() - start_time)
+"""
+
+
+# Function that runs a Python process with the given code, in the directory of the game modules, and returns its elapsed
+# time, in seconds, along with the last line of its output.
+def run_process(code):
+  start_time = time.perf_counter()
+  output = subprocess.run(
+    [sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, check=True,
+    text=True
+  ).stdout
+  elapsed_time = time.perf_counter() - start_time
+  lines = output.splitlines()
+  return elapsed_time, lines[-1] if lines else ""
+
+
+# Function that measures the startup of "runs" worker processes, and returns a dictionary with the median times, in
+# milliseconds, of an empty interpreter, of the whole worker process, of its imports and of its first move.
+def measure_startup(runs, node_limit):
+  empty_times = []
+  process_times = []
+  import_times = []
+  move_times = []
+  for run in range(runs):
+    empty_times.append(run_process("pass")[0])
+    process_time, last_line = run_process(worker_code.format(node_limit=node_limit))
+    import_time, move_time = last_line.split()
+    process_times.append(process_time)
+    import_times.append(float(import_time))
+    move_times.append(float(move_time))
+  return {
+    "interpreter_ms": statistics.median(empty_times) * 1000,
+    "process_ms": statistics.median(process_times) * 1000,
+    "import_ms": statistics.median(import_times) * 1000,
+    "first_move_ms": statistics.median(move_times) * 1000,
+  }
+
+
+# Command line interface of the startup benchmark.
+def main(arguments=None):
+  parser = argparse.ArgumentParser(description="Measure the cold start of Connect Four worker processes.")
+  parser.add_argument("--runs", type=int, default=20, help="number of worker processes started")
+  parser.add_argument("--nodes", type=int, default=1000, help="node limit of the first move")
+  options = parser.parse_args(arguments)
+
+  result = measure_startup(options.runs, options.nodes)
+  print(
+    "Median of " + str(options.runs) + " processes: " + format(result["process_ms"], ".1f") + " ms from process start to the " +
+    "first move (imports " + format(result["import_ms"], ".1f") + " ms, first move " + format(result["first_move_ms"], ".1f") +
+    " ms); an empty interpreter takes " + format(result["interpreter_ms"], ".1f") + " ms."
+  )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,101 @@
+import functools
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from board import Board as br
+from endgame import EndgameSolver, Tablebase, write_tablebase
+from search import Search
+from transposition_table import TranspositionTable
+
+# Tests of the endgame solver, against a brute-force minimax of the same positions. Run them with "python -m unittest".
+
+
+# Function that returns the exact score of a position (0 for a full board), as scored by the Search class: by a plain minimax
+# over every move, to the end of the game, without any window, table or move ordering.
+@functools.lru_cache(maxsize=None)
+def get_minimax_score(current, mask):
+  discs = mask.bit_count()
+  if discs == Search.total_cells:
+    return 0
+  legal_columns = [column_index for column_index in range(br.columns) if not mask & Search.top_cells[column_index]]
+  for column_index in legal_columns:
+    if Search.is_winning_move(current, mask, column_index):
+      return Search.win_score - discs - 1
+  return max(
+    -get_minimax_score(current ^ mask, mask | (mask + Search.bottom_cells[column_index])) for column_index in legal_columns
+  )
+
+
+# Function that returns the score of a move of a position, for the player making it.
+def get_move_score(current, mask, column_index):
+  if Search.is_winning_move(current, mask, column_index):
+    return Search.win_score - mask.bit_count() - 1
+  return -get_minimax_score(current ^ mask, mask | (mask + Search.bottom_cells[column_index]))
+
+
+# Function that returns Board instances of random positions, where the game is not over, with at most "max_empty_cells" empty
+# cells.
+def get_random_boards(count, max_empty_cells, seed):
+  rng = random.Random(seed)
+  boards = []
+  while len(boards) < count:
+    board = br()
+    for move in range(Search.total_cells - rng.randint(1, max_empty_cells)):
+      cell = board.play_column(rng.choice(board.legal_moves()))
+      if board.last_move_wins(cell) or board.check_ties():
+        break
+    else:
+      boards.append(board)
+  return boards
+
+
+class EndgameSolverTest(unittest.TestCase):
+
+  def test_scores_and_columns_match_minimax(self):
+    solver = EndgameSolver(10, 1 << 16)
+    for board in get_random_boards(150, 10, 4):
+      current, mask = Search.get_position(board)
+      outcome, distance, column_index, score = solver.solve_position(current, mask)
+      self.assertEqual(score, get_minimax_score(current, mask))
+      self.assertEqual(get_move_score(current, mask, column_index), score)
+      self.assertEqual((outcome, distance), EndgameSolver.get_outcome(score, mask.bit_count()))
+
+  def test_best_column_without_stored_column(self):
+    # With no table entry ever found, the best column comes from the scores of every column.
+    solver = EndgameSolver(8, 1 << 10)
+    with mock.patch.object(TranspositionTable, "get", return_value=None):
+      for board in get_random_boards(30, 8, 5):
+        current, mask = Search.get_position(board)
+        outcome, distance, column_index, score = solver.solve_position(current, mask)
+        self.assertEqual(score, get_minimax_score(current, mask))
+        self.assertEqual(get_move_score(current, mask, column_index), score)
+
+  def test_tablebase_lookups_match_solutions(self):
+    solver = EndgameSolver(10, 1 << 16)
+    boards = get_random_boards(40, 10, 6)
+    records = {}
+    for board in boards:
+      outcome, distance, column_index, score = solver.solve_position(*Search.get_position(board))
+      if board.is_canonical_mirrored():
+        column_index = br.columns - 1 - column_index
+      records[board.get_canonical_key()] = (outcome, distance, column_index)
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, "endgame.bin")
+      write_tablebase(path, records)
+      tablebase = Tablebase(path)
+      try:
+        for board in boards:
+          solution = EndgameSolver(10, 1 << 16, tablebase).solve(board)
+          self.assertTrue(solution["tablebase"])
+          current, mask = Search.get_position(board)
+          self.assertEqual(solution["score"], get_minimax_score(current, mask))
+          self.assertEqual(get_move_score(current, mask, solution["column"] - 1), solution["score"])
+      finally:
+        tablebase.close()
+
+
+if __name__ == "__main__":
+  unittest.main()
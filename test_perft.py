@@ -0,0 +1,103 @@
+import unittest
+
+from board import Board as br
+from perft import perft
+
+# Tests of the perft counts, against a counter playing the same games on a plain grid of symbols, with none of the bitboards,
+# windows or tables of the Board class. As in the game, a position is tied as soon as no player can win it any more, before
+# the board is full. Run them with "python -m unittest".
+
+
+# Function that verifies if the symbol just played on a cell of a grid (a list of rows, from the bottom row) is part of
+# "connect" consecutively aligned symbols, by walking from that cell in both ways of each direction.
+def is_grid_win(grid, row_index, column_index, connect):
+  symbol = grid[row_index][column_index]
+  for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+    aligned_symbols = 1
+    for way in (1, -1):
+      current_row, current_column = row_index + row_step * way, column_index + column_step * way
+      while 0 <= current_row < len(grid) and 0 <= current_column < len(grid[0]) and grid[current_row][current_column] == symbol:
+        aligned_symbols += 1
+        current_row += row_step * way
+        current_column += column_step * way
+    if aligned_symbols >= connect:
+      return True
+  return False
+
+
+# Function that verifies if no player can win a grid any more: every group of "connect" consecutive cells, in any direction,
+# holds the symbols of both players.
+def is_grid_tied(grid, connect):
+  rows, columns = len(grid), len(grid[0])
+  for row_index in range(rows):
+    for column_index in range(columns):
+      for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        last_row, last_column = row_index + row_step * (connect - 1), column_index + column_step * (connect - 1)
+        if not (0 <= last_row < rows and 0 <= last_column < columns):
+          continue
+        symbols = {grid[row_index + row_step * step][column_index + column_step * step] for step in range(connect)}
+        if not {1, 2} <= symbols:
+          return False
+  return True
+
+
+# Adds the positions reached from a grid to the [positions, wins, ties] counts of each depth, as perft does.
+def count_grid_positions(grid, heights, connect, depth, counts, level=0, symbol=1):
+  rows = len(grid)
+  for column_index in range(len(heights)):
+    row_index = heights[column_index]
+    if row_index == rows:
+      continue
+    grid[row_index][column_index] = symbol
+    heights[column_index] += 1
+    counts[level][0] += 1
+    if is_grid_win(grid, row_index, column_index, connect):
+      counts[level][1] += 1
+    elif is_grid_tied(grid, connect):
+      counts[level][2] += 1
+    elif depth > 1:
+      count_grid_positions(grid, heights, connect, depth - 1, counts, level + 1, 3 - symbol)
+    grid[row_index][column_index] = 0
+    heights[column_index] -= 1
+
+
+# Function that returns the [positions, wins, ties] counts of each depth from the empty grid of a geometry.
+def get_grid_counts(rows, columns, connect, depth):
+  counts = [[0, 0, 0] for level in range(depth)]
+  count_grid_positions([[0] * columns for row in range(rows)], [0] * columns, connect, depth, counts)
+  return counts
+
+
+class PerftTest(unittest.TestCase):
+
+  # Function that returns the [positions, wins, ties] counts of each depth given by perft from the empty board of a geometry.
+  def get_perft_counts(self, rows, columns, connect, depth):
+    board = br(rows, columns, connect)
+    result = perft(board, depth)
+    self.assertEqual(len(board.move_stack), 0)
+    return [[depth_counts["positions"], depth_counts["wins"], depth_counts["ties"]] for depth_counts in result["depths"]]
+
+  def test_standard_board(self):
+    counts = self.get_perft_counts(6, 7, 4, 6)
+    self.assertEqual([depth_counts[0] for depth_counts in counts], [7, 49, 343, 2401, 16807, 117649])
+    self.assertEqual(counts, get_grid_counts(6, 7, 4, 6))
+
+  def test_other_geometries(self):
+    # Small boards, where the games reach wins and ties within the depth of the counts.
+    for rows, columns, connect, depth in ((4, 5, 3, 7), (3, 4, 3, 12), (5, 4, 4, 8), (4, 4, 2, 6)):
+      with self.subTest(rows=rows, columns=columns, connect=connect):
+        self.assertEqual(self.get_perft_counts(rows, columns, connect, depth), get_grid_counts(rows, columns, connect, depth))
+
+  def test_checksums_do_not_depend_on_the_moves_order(self):
+    board = br()
+    for column_value in (4, 4, 5, 3):
+      board.play_column(column_value)
+    first_result = perft(board, 3)
+    board = br()
+    for column_value in (5, 3, 4, 4):
+      board.play_column(column_value)
+    self.assertEqual(perft(board, 3)["depths"], first_result["depths"])
+
+
+if __name__ == "__main__":
+  unittest.main()
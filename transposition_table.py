@@ -0,0 +1,90 @@
+from array import array
+
+# Class that represents a bounded transposition table, storing the results of previous searches of positions.
+#
+# The table has a fixed number of slots. Each position key is mapped to one slot, which holds the full key (so that two
+# positions sharing a slot are never confused) and one packed entry with the search depth, score, score bound type, best
+# column and the generation (the search that stored it). When two positions compete for the same slot, the newer entry
+# replaces the older one if it comes from a more recent search or if it was searched at least as deep; entries of the
+# current search are only replaced by deeper or equally deep ones, since those saved the most work.
+#
+# The key array does not hold the keys themselves, but each key "xor" its entry. A slot is only read as a match when the
+# stored key "xor" the stored entry gives back the searched key, so a slot whose key and entry were written by two different
+# processes at the same time (in a table shared through shared memory) is never mistaken for a valid entry.
+class TranspositionTable:
+  # Types of stored scores: the exact score of the position, or a lower/upper bound of that score.
+  exact = 0
+  lower_bound = 1
+  upper_bound = 2
+
+  # Stored scores are shifted by "score_offset" so that they can be packed as unsigned numbers.
+  score_offset = 1 << 15
+  # Stored column value meaning "no best column known".
+  no_move = 15
+
+  # Initializes a TranspositionTable object with "size" slots. Keys and entries are kept in two arrays of unsigned 64-bit
+  # numbers, so the memory used by the table is fixed: 16 bytes per slot. When a "buffer" is given (for i.e.: the buffer of
+  # a multiprocessing.shared_memory.SharedMemory object, of at least get_buffer_size(size) bytes), the table is kept in that
+  # buffer instead, so every process attached to the same buffer shares the table.
+  def __init__(self, size=1 << 20, buffer=None):
+    self.size = size
+    if buffer is None:
+      self.keys = array("Q", [0]) * size
+      self.entries = array("Q", [0]) * size
+    else:
+      table_view = memoryview(buffer)[:TranspositionTable.get_buffer_size(size)].cast("Q")
+      self.keys = table_view[:size]
+      self.entries = table_view[size:]
+    self.generation = 1
+    self.hits = 0
+    self.stores = 0
+
+  # Function that returns the slot of a key. The key is multiplied by a large odd constant first: the low bits of a key only
+  # depend on the first columns of the board, so using the key itself would put most positions in a few slots of a table
+  # whose size is a power of two.
+  def get_slot(self, key):
+    return (key * 0x9E3779B97F4A7C15 >> 32) % self.size
+
+  # Function that returns the number of bytes taken by a table of "size" slots.
+  @staticmethod
+  def get_buffer_size(size):
+    return 16 * size
+
+  # Starts a new search. Entries from previous searches remain usable, but are replaced first.
+  def new_search(self):
+    self.generation = self.generation % 255 + 1
+
+  # Empties the table.
+  def clear(self):
+    zeros = array("Q", [0]) * self.size
+    self.keys[:] = zeros
+    self.entries[:] = zeros
+
+  # Returns the (depth, score, bound type, best column) entry stored for a position key, or None if that key is not stored.
+  # The best column is None when it is unknown.
+  def get(self, key):
+    slot = self.get_slot(key)
+    entry = self.entries[slot]
+    if entry == 0 or self.keys[slot] ^ entry != key:
+      return None
+    self.hits += 1
+    move = entry >> 24 & 15
+    return (entry >> 16 & 255, (entry & 65535) - TranspositionTable.score_offset, entry >> 28 & 3, None if move == TranspositionTable.no_move else move)
+
+  # Stores the result of the search of a position key, unless the slot holds a deeper entry from the current search.
+  def store(self, key, depth, score, bound_type, move):
+    slot = self.get_slot(key)
+    stored_entry = self.entries[slot]
+    if stored_entry and stored_entry >> 30 == self.generation and self.keys[slot] ^ stored_entry != key and \
+        stored_entry >> 16 & 255 > depth:
+      return
+    if move is None:
+      move = TranspositionTable.no_move
+    entry = (score + TranspositionTable.score_offset) | depth << 16 | move << 24 | bound_type << 28 | self.generation << 30
+    self.keys[slot] = key ^ entry
+    self.entries[slot] = entry
+    self.stores += 1
+
+  # Returns the number of slots in use.
+  def get_used_slots(self):
+    return self.size - self.entries.tolist().count(0)